@@ -5,11 +5,48 @@ import asyncio
 import sqlite3
 import os
 import json
-import requests
+import multiprocessing
 import random
-import aiohttp
 from datetime import datetime
 from alibaba_supplier_crawler import AlibabaSupplierCrawler
+from db_pool import get_read_connection
+from db_search import search_supplier_ids
+from db_writer import get_writer
+from async_runner import get_async_runner
+from batch_scheduler import BatchCrawlScheduler
+from crawl_frontier import CrawlFrontier
+from extraction_pipeline import ExtractionPipeline
+from extraction_sink import EXTRACTION_QUEUE_CONDITION, get_extraction_sink
+from http_client import get_http_client
+from parse_pool import get_parse_pool
+from request_pacer import get_host_pacer, paced_get
+from response_cache import CACHE_MODES, get_response_cache
+from supplier_list import SUPPLIER_LIST_COLUMNS, fetch_supplier_page
+from supplier_stats import get_supplier_count, get_supplier_stats
+
+# 数据库列表各Tab的过滤条件
+DB_LIST_TAB_FILTERS = {
+    "all": "",
+    "success": "license_extracted = 1",
+    "pending": "license_extracted = 0 AND skip_extraction = 0",
+    "recognized": "license_extracted = 1 AND ocr_recognition_status IN ('success', 'completed')",
+    "used": "is_used = 1",
+    "unused": "is_used = 0",
+    "problematic": "skip_extraction = 1",
+    "ocr_error": "ocr_recognition_status = 'error'",
+}
+
+# 各Tab对应的 supplier_stats 计数 (维度, 取值)
+DB_LIST_TAB_STATS = {
+    "all": ("all", ""),
+    "success": ("license_extracted", "1"),
+    "pending": ("extract_state", "pending"),
+    "recognized": ("extract_state", "recognized"),
+    "used": ("is_used", "1"),
+    "unused": ("is_used", "0"),
+    "problematic": ("skip_extraction", "1"),
+    "ocr_error": ("ocr_status", "error"),
+}
 
 class AlibabaCrawlerGUI:
     def __init__(self):
@@ -21,6 +58,10 @@ class AlibabaCrawlerGUI:
         # OCR识别相关变量
         self.ocr_running = False
         self.ocr_thread = None
+        # 正在进行的一键爬取调度器/分类爬取工作单元（停止按钮用）
+        self.active_scheduler = None
+        self.active_frontier = None
+        self.active_pipeline = None
         self.setup_gui()
     
     def setup_gui(self):
@@ -145,19 +186,19 @@ class AlibabaCrawlerGUI:
         if os.path.exists(db_path):
             try:
                 # 获取数据库统计信息
-                conn = sqlite3.connect(db_path)
+                conn = get_read_connection(db_path)
                 cursor = conn.cursor()
                 
                 # 检查suppliers表是否存在
                 cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='suppliers'")
                 if cursor.fetchone():
-                    cursor.execute("SELECT COUNT(*) FROM suppliers")
-                    total_count = cursor.fetchone()[0]
+                    total_count = get_supplier_count(cursor, "all")
+                    extracted_count = get_supplier_count(cursor, "license_extracted", "1")
                     
-                    cursor.execute("SELECT COUNT(*) FROM suppliers WHERE license_extracted = 1")
-                    extracted_count = cursor.fetchone()[0]
-                    
-                    status_text = f"状态: 已连接 | 总供应商: {total_count} | 已提取执照: {extracted_count} | 文件: {os.path.basename(db_path)}"
+                    writer_stats = self.get_db_writer().get_stats()
+                    status_text = (f"状态: 已连接 | 总供应商: {total_count} | 已提取执照: {extracted_count} | "
+                                   f"写入: {writer_stats['writes']} 条 ({writer_stats['writes_per_sec']}/秒, 平均每次提交 {writer_stats['avg_batch']} 条) | "
+                                   f"文件: {os.path.basename(db_path)}")
                 else:
                     status_text = f"状态: 已连接 (空数据库) | 文件: {os.path.basename(db_path)}"
                 
@@ -239,6 +280,20 @@ class AlibabaCrawlerGUI:
         self.skip_duplicates_check = ttk.Checkbutton(basic_frame, text="跳过重复数据", variable=self.skip_duplicates_var)
         self.skip_duplicates_check.grid(row=0, column=1, sticky=tk.W, pady=2, padx=(20, 0))
         
+        # 增量爬取开关：连续几页都是以前见过的供应商时停止翻页
+        self.incremental_var = tk.BooleanVar(value=False)
+        self.incremental_check = ttk.Checkbutton(basic_frame, text="增量爬取", variable=self.incremental_var)
+        self.incremental_check.grid(row=0, column=2, sticky=tk.W, pady=2, padx=(20, 0))
+        
+        # 响应缓存模式：使用缓存 / 刷新缓存（重新下载并写入）/ 不使用缓存
+        self.cache_mode_labels = {'use': '使用缓存', 'refresh': '刷新缓存', 'bypass': '不使用缓存'}
+        ttk.Label(basic_frame, text="响应缓存:").grid(row=1, column=0, sticky=tk.W, pady=2)
+        self.cache_mode_var = tk.StringVar(value=self.cache_mode_labels[get_response_cache().mode])
+        self.cache_mode_combo = ttk.Combobox(basic_frame, textvariable=self.cache_mode_var, state="readonly", width=12,
+                                             values=[self.cache_mode_labels[mode] for mode in CACHE_MODES])
+        self.cache_mode_combo.grid(row=1, column=1, sticky=tk.W, pady=2, padx=(20, 0))
+        self.cache_mode_combo.bind("<<ComboboxSelected>>", self.on_cache_mode_changed)
+        
         # 按钮区域
         button_frame = ttk.Frame(input_frame)
         button_frame.grid(row=5, column=0, columnspan=2, pady=20)
@@ -351,16 +406,10 @@ class AlibabaCrawlerGUI:
         self.thread_count_entry = ttk.Entry(settings_frame, textvariable=self.thread_count_var, width=10)
         self.thread_count_entry.grid(row=0, column=1, sticky=tk.W, pady=2, padx=(10, 0))
         
-        # 批次间隔设置
-        ttk.Label(settings_frame, text="批次间隔(秒):").grid(row=0, column=2, sticky=tk.W, pady=2, padx=(20, 0))
-        self.batch_delay_var = tk.StringVar(value="1.0")
-        self.batch_delay_entry = ttk.Entry(settings_frame, textvariable=self.batch_delay_var, width=10)
-        self.batch_delay_entry.grid(row=0, column=3, sticky=tk.W, pady=2, padx=(10, 0))
-        
-        # IP检测开关
+        # IP检测开关（请求节奏由主机节奏控制器控制，不再需要批次间隔）
         self.enable_ip_check_var = tk.BooleanVar(value=False)
         self.enable_ip_check_checkbox = ttk.Checkbutton(settings_frame, text="启用IP检测", variable=self.enable_ip_check_var)
-        self.enable_ip_check_checkbox.grid(row=0, column=4, sticky=tk.W, pady=2, padx=(20, 0))
+        self.enable_ip_check_checkbox.grid(row=0, column=2, sticky=tk.W, pady=2, padx=(20, 0))
         
         # 日志级别设置
         ttk.Label(settings_frame, text="日志级别:").grid(row=1, column=0, sticky=tk.W, pady=2)
@@ -645,14 +694,14 @@ class AlibabaCrawlerGUI:
         tab_frame.pack(fill=tk.X, pady=(0, 5))
         
         self.db_list_tab_var = tk.StringVar(value="all")
-        ttk.Radiobutton(tab_frame, text="全部", variable=self.db_list_tab_var, value="all", command=self.refresh_db_list_page).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Radiobutton(tab_frame, text="已成功", variable=self.db_list_tab_var, value="success", command=self.refresh_db_list_page).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Radiobutton(tab_frame, text="未提取", variable=self.db_list_tab_var, value="pending", command=self.refresh_db_list_page).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Radiobutton(tab_frame, text="已识别", variable=self.db_list_tab_var, value="recognized", command=self.refresh_db_list_page).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Radiobutton(tab_frame, text="已使用", variable=self.db_list_tab_var, value="used", command=self.refresh_db_list_page).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Radiobutton(tab_frame, text="未使用", variable=self.db_list_tab_var, value="unused", command=self.refresh_db_list_page).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Radiobutton(tab_frame, text="问题数据", variable=self.db_list_tab_var, value="problematic", command=self.refresh_db_list_page).pack(side=tk.LEFT, padx=(0, 10))
-        ttk.Radiobutton(tab_frame, text="识别错误", variable=self.db_list_tab_var, value="ocr_error", command=self.refresh_db_list_page).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(tab_frame, text="全部", variable=self.db_list_tab_var, value="all", command=self.on_db_list_tab_changed).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(tab_frame, text="已成功", variable=self.db_list_tab_var, value="success", command=self.on_db_list_tab_changed).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(tab_frame, text="未提取", variable=self.db_list_tab_var, value="pending", command=self.on_db_list_tab_changed).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(tab_frame, text="已识别", variable=self.db_list_tab_var, value="recognized", command=self.on_db_list_tab_changed).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(tab_frame, text="已使用", variable=self.db_list_tab_var, value="used", command=self.on_db_list_tab_changed).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(tab_frame, text="未使用", variable=self.db_list_tab_var, value="unused", command=self.on_db_list_tab_changed).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(tab_frame, text="问题数据", variable=self.db_list_tab_var, value="problematic", command=self.on_db_list_tab_changed).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Radiobutton(tab_frame, text="识别错误", variable=self.db_list_tab_var, value="ocr_error", command=self.on_db_list_tab_changed).pack(side=tk.LEFT, padx=(0, 10))
         
         # 数据库列表
         list_frame = ttk.LabelFrame(parent, text="供应商列表", padding="15")
@@ -683,6 +732,12 @@ class AlibabaCrawlerGUI:
         self.current_page = 1
         self.page_size = 100
         self.total_pages = 1
+        # 键集分页状态：当前页首行/末行的 (created_at, id)，以及下一次刷新的翻页方式
+        self.page_first_key = None
+        self.page_last_key = None
+        self.page_nav = "first"
+        # 当前生效的搜索关键词（为空时按Tab显示完整列表）
+        self.db_list_search_term = ""
         
         # 左侧分页信息
         self.pagination_info_label = ttk.Label(pagination_frame, text="")
@@ -757,6 +812,30 @@ class AlibabaCrawlerGUI:
         except tk.TclError:
             pass
     
+    def get_db_writer(self):
+        """获取当前数据库的写线程"""
+        return get_writer(self.crawler.db_path)
+    
+    def format_writer_stats(self):
+        """格式化写线程的吞吐统计，用于日志输出"""
+        stats = self.get_db_writer().get_stats()
+        sink_stats = get_extraction_sink(self.crawler.db_path).get_stats()
+        return (f"数据库写入: {stats['writes']} 条，{stats['writes_per_sec']} 条/秒，"
+                f"{stats['commits']} 次提交（平均每次 {stats['avg_batch']} 条，{stats['avg_commit_ms']}ms），失败 {stats['failed']} 条；"
+                f"提取结果: {sink_stats['results']} 条，{sink_stats['flushes']} 批（平均 {sink_stats['avg_flush_ms']}ms，"
+                f"最长 {sink_stats['max_flush_ms']}ms），待提交 {sink_stats['pending']} 条")
+    
+    def update_suppliers_by_names(self, sql, params_list):
+        """在写线程的一个事务中逐条执行更新，返回有命中的条数"""
+        def apply_updates(conn):
+            updated_count = 0
+            for params in params_list:
+                if conn.execute(sql, params).rowcount > 0:
+                    updated_count += 1
+            return updated_count
+        
+        return self.get_db_writer().run(apply_updates)
+    
     def mark_supplier_as_used(self):
         """标记选中的供应商为已使用"""
         selected_items = self.db_list_tree.selection()
@@ -765,21 +844,11 @@ class AlibabaCrawlerGUI:
             return
         
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
+            # 移除截断标记
+            names = [self.db_list_tree.item(item)['values'][1].replace('...', '') for item in selected_items]
             
-            updated_count = 0
-            for item in selected_items:
-                item_values = self.db_list_tree.item(item)['values']
-                company_name = item_values[1].replace('...', '')  # 移除截断标记
-                
-                # 根据公司名称更新使用状态
-                cursor.execute('UPDATE suppliers SET is_used = 1 WHERE company_name LIKE ?', (f'%{company_name}%',))
-                if cursor.rowcount > 0:
-                    updated_count += 1
-            
-            conn.commit()
-            conn.close()
+            # 根据公司名称更新使用状态
+            updated_count = self.update_suppliers_by_names('UPDATE suppliers SET is_used = 1 WHERE company_name LIKE ?', [(f'%{name}%',) for name in names])
             
             if updated_count > 0:
                 self.log_message(f"已标记 {updated_count} 个供应商为已使用")
@@ -799,21 +868,11 @@ class AlibabaCrawlerGUI:
             return
         
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
-            
-            updated_count = 0
-            for item in selected_items:
-                item_values = self.db_list_tree.item(item)['values']
-                company_name = item_values[1].replace('...', '')  # 移除截断标记
-                
-                # 根据公司名称更新使用状态
-                cursor.execute('UPDATE suppliers SET is_used = 0 WHERE company_name LIKE ?', (f'%{company_name}%',))
-                if cursor.rowcount > 0:
-                    updated_count += 1
+            # 移除截断标记
+            names = [self.db_list_tree.item(item)['values'][1].replace('...', '') for item in selected_items]
             
-            conn.commit()
-            conn.close()
+            # 根据公司名称更新使用状态
+            updated_count = self.update_suppliers_by_names('UPDATE suppliers SET is_used = 0 WHERE company_name LIKE ?', [(f'%{name}%',) for name in names])
             
             if updated_count > 0:
                 self.log_message(f"已标记 {updated_count} 个供应商为未使用")
@@ -825,34 +884,43 @@ class AlibabaCrawlerGUI:
             self.log_message(f"标记供应商为未使用失败: {e}")
             messagebox.showerror("错误", f"标记失败: {e}")
     
+    def on_db_list_tab_changed(self):
+        """切换Tab时回到第一页"""
+        self.go_to_first_page()
+    
     def go_to_first_page(self):
         """跳转到首页"""
         self.current_page = 1
+        self.page_nav = "first"
         self.refresh_db_list_page()
     
     def go_to_prev_page(self):
         """跳转到上一页"""
         if self.current_page > 1:
             self.current_page -= 1
+            self.page_nav = "prev"
             self.refresh_db_list_page()
     
     def go_to_next_page(self):
         """跳转到下一页"""
         if self.current_page < self.total_pages:
             self.current_page += 1
+            self.page_nav = "next"
             self.refresh_db_list_page()
     
     def go_to_last_page(self):
         """跳转到末页"""
         self.current_page = self.total_pages
+        self.page_nav = "last"
         self.refresh_db_list_page()
     
     def go_to_page(self, event=None):
-        """跳转到指定页面"""
+        """跳转到指定页面（任意页码没有锚点，从较近的一端按OFFSET定位）"""
         try:
             page = int(self.page_entry.get())
             if 1 <= page <= self.total_pages:
                 self.current_page = page
+                self.page_nav = "jump"
                 self.refresh_db_list_page()
             else:
                 messagebox.showwarning("警告", f"页码必须在1到{self.total_pages}之间")
@@ -864,13 +932,38 @@ class AlibabaCrawlerGUI:
         try:
             self.page_size = int(self.page_size_var.get())
             self.current_page = 1  # 重置到第一页
+            self.page_nav = "first"
             self.refresh_db_list_page()
         except ValueError:
             pass
     
+    def get_db_list_tab_count(self, cursor, tab_filter):
+        """获取Tab的总数（读取触发器维护的 supplier_stats，不扫描suppliers表）"""
+        dimension, value = DB_LIST_TAB_STATS.get(tab_filter, DB_LIST_TAB_STATS["all"])
+        return get_supplier_count(cursor, dimension, value)
+    
+    def fetch_db_list_page(self, cursor, filter_sql):
+        """按 (created_at, id) 键集分页查询当前页，翻页耗时与页码无关（见 supplier_list）"""
+        nav = self.page_nav
+        self.page_nav = "current"
+        rows, self.page_first_key, self.page_last_key = fetch_supplier_page(
+            cursor, filter_sql, nav, self.current_page, self.page_size,
+            self.total_count_on_page_info, self.page_first_key, self.page_last_key)
+        return rows
+    
+    def fetch_db_list_rows_by_ids(self, cursor, supplier_ids):
+        """按给定ID顺序查询列表记录（搜索结果保持相关度顺序）"""
+        if not supplier_ids:
+            return []
+        placeholders = ",".join("?" * len(supplier_ids))
+        cursor.execute(f"SELECT {SUPPLIER_LIST_COLUMNS} FROM suppliers WHERE id IN ({placeholders})", supplier_ids)
+        rows_by_id = {row[0]: row for row in cursor.fetchall()}
+        return [rows_by_id[supplier_id] for supplier_id in supplier_ids if supplier_id in rows_by_id]
+    
     def update_pagination_info(self, total_count):
         """更新分页信息"""
         self.total_pages = max(1, (total_count + self.page_size - 1) // self.page_size)
+        self.total_count_on_page_info = total_count
         
         # 确保当前页不超过总页数
         if self.current_page > self.total_pages:
@@ -897,6 +990,7 @@ class AlibabaCrawlerGUI:
         self.db_list_tab_var.set("used")
         # 重置到第一页
         self.current_page = 1
+        self.page_nav = "first"
         # 刷新列表
         self.refresh_db_list_page()
     
@@ -908,27 +1002,17 @@ class AlibabaCrawlerGUI:
             return
         
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
+            # 移除截断标记
+            names = [self.db_list_tree.item(item)['values'][1].replace('...', '') for item in selected_items]
             
-            updated_count = 0
-            for item in selected_items:
-                item_values = self.db_list_tree.item(item)['values']
-                company_name = item_values[1].replace('...', '')  # 移除截断标记
-                
-                # 重置失败次数
-                cursor.execute('''
+            # 重置失败次数
+            updated_count = self.update_suppliers_by_names('''
                     UPDATE suppliers 
                     SET extraction_failed_count = 0,
-                        last_extraction_attempt = NULL
+                        last_extraction_attempt = NULL,
+                        next_attempt_at = NULL
                     WHERE company_name = ?
-                ''', (company_name,))
-                
-                if cursor.rowcount > 0:
-                    updated_count += 1
-            
-            conn.commit()
-            conn.close()
+                ''', [(name,) for name in names])
             
             if updated_count > 0:
                 messagebox.showinfo("成功", f"已重置 {updated_count} 个供应商的失败次数")
@@ -947,28 +1031,18 @@ class AlibabaCrawlerGUI:
             return
         
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
+            # 移除截断标记
+            names = [self.db_list_tree.item(item)['values'][1].replace('...', '') for item in selected_items]
             
-            updated_count = 0
-            for item in selected_items:
-                item_values = self.db_list_tree.item(item)['values']
-                company_name = item_values[1].replace('...', '')  # 移除截断标记
-                
-                # 取消跳过标记并重置失败次数
-                cursor.execute('''
+            # 取消跳过标记并重置失败次数
+            updated_count = self.update_suppliers_by_names('''
                     UPDATE suppliers 
                     SET skip_extraction = 0,
                         extraction_failed_count = 0,
-                        last_extraction_attempt = NULL
+                        last_extraction_attempt = NULL,
+                        next_attempt_at = NULL
                     WHERE company_name = ?
-                ''', (company_name,))
-                
-                if cursor.rowcount > 0:
-                    updated_count += 1
-            
-            conn.commit()
-            conn.close()
+                ''', [(name,) for name in names])
             
             if updated_count > 0:
                 messagebox.showinfo("成功", f"已取消 {updated_count} 个供应商的跳过标记")
@@ -991,27 +1065,16 @@ class AlibabaCrawlerGUI:
             return
         
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
+            # 移除截断标记
+            names = [self.db_list_tree.item(item)['values'][1].replace('...', '') for item in selected_items]
             
-            updated_count = 0
-            for item in selected_items:
-                item_values = self.db_list_tree.item(item)['values']
-                company_name = item_values[1].replace('...', '')  # 移除截断标记
-                
-                # 标记为跳过
-                cursor.execute('''
+            # 标记为跳过
+            updated_count = self.update_suppliers_by_names('''
                     UPDATE suppliers 
                     SET skip_extraction = 1,
                         last_extraction_attempt = CURRENT_TIMESTAMP
                     WHERE company_name = ?
-                ''', (company_name,))
-                
-                if cursor.rowcount > 0:
-                    updated_count += 1
-            
-            conn.commit()
-            conn.close()
+                ''', [(name,) for name in names])
             
             if updated_count > 0:
                 messagebox.showinfo("成功", f"已标记 {updated_count} 个供应商为跳过提取")
@@ -1025,7 +1088,7 @@ class AlibabaCrawlerGUI:
     def load_active_proxy(self):
         """从数据库加载当前活跃的代理配置"""
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             cursor.execute('SELECT host, port, username, password FROM proxies WHERE is_active = 1 LIMIT 1')
             result = cursor.fetchone()
@@ -1058,7 +1121,7 @@ class AlibabaCrawlerGUI:
     def get_all_proxies(self):
         """获取所有代理配置"""
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             cursor.execute('SELECT id, name, host, port, username, password, is_active FROM proxies ORDER BY id')
             results = cursor.fetchall()
@@ -1082,22 +1145,19 @@ class AlibabaCrawlerGUI:
     
     def save_proxy_to_db(self, name, host, port, username, password, set_active=False):
         """保存代理配置到数据库"""
-        try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
-            
+        def insert_proxy(conn):
             # 如果设置为活跃，先将其他代理设为非活跃
             if set_active:
-                cursor.execute('UPDATE proxies SET is_active = 0')
+                conn.execute('UPDATE proxies SET is_active = 0')
             
             # 插入新代理
-            cursor.execute('''
+            conn.execute('''
                 INSERT INTO proxies (name, host, port, username, password, is_active)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (name, host, port, username, password, set_active))
-            
-            conn.commit()
-            conn.close()
+        
+        try:
+            self.get_db_writer().run(insert_proxy)
             return True
         except Exception as e:
             print(f"保存代理配置失败: {e}")
@@ -1105,18 +1165,15 @@ class AlibabaCrawlerGUI:
     
     def set_active_proxy(self, proxy_id):
         """设置指定代理为活跃状态"""
-        try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
-            
+        def activate_proxy(conn):
             # 将所有代理设为非活跃
-            cursor.execute('UPDATE proxies SET is_active = 0')
+            conn.execute('UPDATE proxies SET is_active = 0')
             
             # 设置指定代理为活跃
-            cursor.execute('UPDATE proxies SET is_active = 1 WHERE id = ?', (proxy_id,))
-            
-            conn.commit()
-            conn.close()
+            conn.execute('UPDATE proxies SET is_active = 1 WHERE id = ?', (proxy_id,))
+        
+        try:
+            self.get_db_writer().run(activate_proxy)
             
             # 重新加载当前代理配置
             self.proxy = self.load_active_proxy()
@@ -1129,11 +1186,7 @@ class AlibabaCrawlerGUI:
     def delete_proxy(self, proxy_id):
         """删除代理配置"""
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM proxies WHERE id = ?', (proxy_id,))
-            conn.commit()
-            conn.close()
+            self.get_db_writer().execute('DELETE FROM proxies WHERE id = ?', (proxy_id,))
             return True
         except Exception as e:
             print(f"删除代理失败: {e}")
@@ -1232,15 +1285,13 @@ class AlibabaCrawlerGUI:
         """测试当前代理连接"""
         def test():
             try:
-                import requests
-                
                 # 使用HTTP代理格式
                 proxies = {
                     'http': f"http://{self.proxy['username']}:{self.proxy['password']}@{self.proxy['host']}:{self.proxy['port']}",
                     'https': f"http://{self.proxy['username']}:{self.proxy['password']}@{self.proxy['host']}:{self.proxy['port']}"
                 }
                 
-                response = requests.get('http://httpbin.org/ip', proxies=proxies, timeout=10)
+                response = get_http_client().get('http://httpbin.org/ip', proxies=proxies, timeout=10)
                 if response.status_code == 200:
                     ip_info = response.json()
                     messagebox.showinfo("成功", f"代理连接成功\n当前IP: {ip_info.get('origin', '未知')}")
@@ -1388,74 +1439,21 @@ class AlibabaCrawlerGUI:
     def refresh_db_list(self):
         """刷新数据库列表"""
         try:
-            # 连接数据库
-            conn = sqlite3.connect(self.crawler.db_path)
+            # 连接数据库（表结构由启动时的迁移保证）
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
-            # 检查表结构，确保有必要的字段
-            try:
-                cursor.execute("PRAGMA table_info(suppliers)")
-                columns = [column[1] for column in cursor.fetchall()]
-                
-                # 如果缺少license_extracted字段，添加它
-                if 'license_extracted' not in columns:
-                    self.log_message("添加license_extracted字段到数据库...")
-                    cursor.execute('ALTER TABLE suppliers ADD COLUMN license_extracted BOOLEAN DEFAULT FALSE')
-                    conn.commit()
-                
-                # 如果缺少category_id或category_name字段，添加它们
-                if 'category_id' not in columns:
-                    self.log_message("添加category_id字段到数据库...")
-                    cursor.execute('ALTER TABLE suppliers ADD COLUMN category_id TEXT')
-                    conn.commit()
-                
-                if 'category_name' not in columns:
-                    self.log_message("添加category_name字段到数据库...")
-                    cursor.execute('ALTER TABLE suppliers ADD COLUMN category_name TEXT')
-                    conn.commit()
-                
-                # 如果缺少is_used字段，添加它
-                if 'is_used' not in columns:
-                    self.log_message("添加is_used字段到数据库...")
-                    cursor.execute('ALTER TABLE suppliers ADD COLUMN is_used BOOLEAN DEFAULT FALSE')
-                    conn.commit()
-            except Exception as e:
-                self.log_message(f"检查表结构时出错: {e}")
-            
             # 根据Tab选择查询条件
             tab_filter = self.db_list_tab_var.get()
             
             # 构建基本查询
-            base_query = "SELECT id, company_name, action_url"
-            
-            # 根据表结构添加字段
-            if 'license_extracted' in columns:
-                base_query += ", license_extracted"
-            else:
-                base_query += ", 0 as license_extracted"
-                
-            if 'category_id' in columns:
-                base_query += ", category_id"
-            else:
-                base_query += ", '' as category_id"
-                
-            if 'category_name' in columns:
-                base_query += ", category_name"
-            else:
-                base_query += ", '' as category_name"
-                
-            if 'is_used' in columns:
-                base_query += ", is_used"
-            else:
-                base_query += ", 0 as is_used"
-            
-            base_query += " FROM suppliers"
+            base_query = "SELECT id, company_name, action_url, license_extracted, category_id, category_name, is_used FROM suppliers"
             
             # 添加过滤条件
             if tab_filter == "success":
                 query = f"{base_query} WHERE license_extracted = 1 ORDER BY created_at DESC"
             elif tab_filter == "pending":
-                query = f"{base_query} WHERE license_extracted = 0 OR license_extracted IS NULL ORDER BY created_at DESC"
+                query = f"{base_query} WHERE license_extracted = 0 ORDER BY created_at DESC"
             else:
                 query = f"{base_query} ORDER BY created_at DESC"
             
@@ -1464,27 +1462,14 @@ class AlibabaCrawlerGUI:
             cursor.execute(query)
             suppliers = cursor.fetchall()
             
-            # 统计各种状态的数量（基于总数据，不是当前页）
+            # 统计各种状态的数量（基于总数据，不是当前页，读取计数表）
             try:
-                # 统计总数
-                cursor.execute("SELECT COUNT(*) FROM suppliers")
-                all_count = cursor.fetchone()[0]
-                
-                # 统计已成功数量
-                cursor.execute("SELECT COUNT(*) FROM suppliers WHERE license_extracted = 1")
-                success_count = cursor.fetchone()[0]
-                
-                # 统计未提取数量
-                cursor.execute("SELECT COUNT(*) FROM suppliers WHERE license_extracted = 0 OR license_extracted IS NULL")
-                fail_count = cursor.fetchone()[0]
-                
-                # 统计已使用数量
-                cursor.execute("SELECT COUNT(*) FROM suppliers WHERE is_used = 1")
-                used_count = cursor.fetchone()[0]
-                
-                # 统计未使用数量
-                cursor.execute("SELECT COUNT(*) FROM suppliers WHERE is_used = 0 OR is_used IS NULL")
-                unused_count = cursor.fetchone()[0]
+                stats = get_supplier_stats(cursor)
+                all_count = stats.get(("all", ""), 0)
+                success_count = stats.get(("license_extracted", "1"), 0)
+                fail_count = stats.get(("license_extracted", "0"), 0)
+                used_count = stats.get(("is_used", "1"), 0)
+                unused_count = stats.get(("is_used", "0"), 0)
                 
                 self.db_list_stats_label.config(text=f"总数: {all_count}，已成功: {success_count}，未提取: {fail_count}，已使用: {used_count}，未使用: {unused_count}")
             except Exception as e:
@@ -1508,17 +1493,13 @@ class AlibabaCrawlerGUI:
             if not result:
                 return
             
-            # 连接数据库
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
-            
-            # 清空所有表
-            cursor.execute('DELETE FROM suppliers')
-            cursor.execute('DELETE FROM licenses')
-            cursor.execute('DELETE FROM license_info')
+            def clear_tables(conn):
+                # 清空所有表
+                conn.execute('DELETE FROM suppliers')
+                conn.execute('DELETE FROM licenses')
+                conn.execute('DELETE FROM license_info')
             
-            conn.commit()
-            conn.close()
+            self.get_db_writer().run(clear_tables)
             
             # 刷新列表
             self.refresh_db_list()
@@ -1550,7 +1531,7 @@ class AlibabaCrawlerGUI:
             company_name = item_values[1]  # 店铺名称
             
             # 从数据库获取供应商的保存路径
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             cursor.execute('SELECT save_path FROM suppliers WHERE company_name = ?', (company_name,))
             result = cursor.fetchone()
@@ -1621,13 +1602,11 @@ class AlibabaCrawlerGUI:
         
         # 获取跳过重复选项
         skip_duplicates = self.skip_duplicates_var.get()
+        incremental = self.incremental_var.get()
         
         # 在新线程中运行爬虫
         def run_crawl():
             try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
                 if search_type == "keyword":
                     # 关键词搜索
                     keyword = self.keyword_entry.get().strip()
@@ -1664,7 +1643,7 @@ class AlibabaCrawlerGUI:
                                 self.root.after(0, lambda m=message, l=level: self.log_crawl_message(m, l))
                             
                             # 直接调用爬虫类的完整方法
-                            suppliers = await self.crawler.crawl_suppliers_range(keyword, start_page, end_page, proxy, skip_duplicates=skip_duplicates, log_callback=log_callback)
+                            suppliers = await self.crawler.crawl_suppliers_range(keyword, start_page, end_page, proxy, skip_duplicates=skip_duplicates, log_callback=log_callback, incremental=incremental)
                             
                             # 计算请求耗时
                             duration = (datetime.now() - start_time).total_seconds()
@@ -1692,7 +1671,7 @@ class AlibabaCrawlerGUI:
                             self.root.after(0, lambda e=error_msg: self.log_crawl_message(f"爬取失败: {e}", "ERROR"))
                             return []
                     
-                    suppliers = loop.run_until_complete(crawl_with_progress())
+                    suppliers = get_async_runner().run(crawl_with_progress())
                     
                 else:
                     # 分类搜索
@@ -1732,8 +1711,14 @@ class AlibabaCrawlerGUI:
                             def log_callback(message, level="INFO"):
                                 self.root.after(0, lambda m=message, l=level: self.log_crawl_message(m, l))
                             
+                            # 写入工作单元，上次同样的分类和页面范围未完成时从未完成的页面继续
+                            frontier = CrawlFrontier(self.crawler.db_path, 'category', [category_id], start_page, end_page)
+                            if await frontier.plan({category_id: end_page}):
+                                log_callback(f"继续上次未完成的分类爬取，已完成 {frontier.finished_count} 页", "INFO")
+                            self.active_frontier = frontier
+                            
                             # 直接调用爬虫类的完整方法
-                            suppliers = await self.crawler.crawl_suppliers_by_category(category_id, start_page, end_page, proxy, skip_duplicates=skip_duplicates, save_path=save_path, log_callback=log_callback)
+                            suppliers = await self.crawler.crawl_suppliers_by_category(category_id, start_page, end_page, proxy, skip_duplicates=skip_duplicates, save_path=save_path, log_callback=log_callback, incremental=incremental, frontier=frontier)
                             
                             # 计算请求耗时
                             duration = (datetime.now() - start_time).total_seconds()
@@ -1761,8 +1746,10 @@ class AlibabaCrawlerGUI:
                             self.root.after(0, lambda e=error_msg: self.log_crawl_message(f"爬取失败: {e}", "ERROR"))
                             return []
                     
-                    suppliers = loop.run_until_complete(crawl_category_with_progress())
+                    suppliers = get_async_runner().run(crawl_category_with_progress())
                 
+                cache_msg = get_response_cache().format_stats()
+                self.root.after(0, lambda m=cache_msg: self.log_crawl_message(m, "INFO"))
                 self.root.after(0, lambda: self.crawl_finished(suppliers))
                 
             except Exception as e:
@@ -1770,8 +1757,21 @@ class AlibabaCrawlerGUI:
         
         threading.Thread(target=run_crawl, daemon=True).start()
     
+    def on_cache_mode_changed(self, event=None):
+        """切换响应缓存模式（对之后的所有请求生效）"""
+        label = self.cache_mode_var.get()
+        for mode, mode_label in self.cache_mode_labels.items():
+            if mode_label == label:
+                get_response_cache().mode = mode
+                self.log_message(f"响应缓存模式: {label}")
+                break
+    
     def stop_crawl(self):
-        """停止爬取"""
+        """停止爬取（一键爬取和分类爬取不再请求新的页面，下次启动同样的任务时继续）"""
+        if self.active_scheduler is not None:
+            self.active_scheduler.stop()
+        if self.active_frontier is not None:
+            self.active_frontier.stop()
         self.start_crawl_btn.config(state=tk.NORMAL)
         self.stop_crawl_btn.config(state=tk.DISABLED)
         self.log_message("爬取已停止")
@@ -1818,16 +1818,6 @@ class AlibabaCrawlerGUI:
             messagebox.showerror("错误", "并发线程数必须是整数")
             return
         
-        # 获取批次间隔
-        try:
-            batch_delay = float(self.batch_delay_var.get())
-            if batch_delay < 0:
-                messagebox.showerror("错误", "批次间隔不能为负数")
-                return
-        except ValueError:
-            messagebox.showerror("错误", "批次间隔必须是数字")
-            return
-        
         # 获取IP检测设置
         enable_ip_check = self.enable_ip_check_var.get()
         
@@ -1837,31 +1827,37 @@ class AlibabaCrawlerGUI:
         # 清空日志并添加开始信息
         self.extract_log_text.delete("1.0", tk.END)
         self.log_extract_message(f"开始提取执照，保存路径: {save_path}", "INFO")
-        self.log_extract_message(f"并发线程数: {thread_count}, 批次间隔: {batch_delay}秒, IP检测: {'启用' if enable_ip_check else '禁用'}", "INFO")
+        self.log_extract_message(f"并发线程数: {thread_count}, IP检测: {'启用' if enable_ip_check else '禁用'}", "INFO")
         
         # 在新线程中运行提取
         def run_extract():
             try:
-                self.extract_licenses_with_retry(save_path, thread_count, batch_delay, enable_ip_check)
+                self.extract_licenses_with_retry(save_path, thread_count, enable_ip_check)
                 self.root.after(0, lambda: self.extract_finished())
             except Exception as e:
                 self.root.after(0, lambda: self.extract_error(str(e)))
         
         threading.Thread(target=run_extract, daemon=True).start()
     
-    def extract_licenses_with_retry(self, save_path, thread_count=5, batch_delay=1.0, enable_ip_check=True):
+    def extract_licenses_with_retry(self, save_path, thread_count=5, enable_ip_check=True):
         """提取执照（只提取未提取的供应商）"""
         # 获取所有未提取的供应商
-        conn = sqlite3.connect(self.crawler.db_path)
+        conn = get_read_connection(self.crawler.db_path)
         cursor = conn.cursor()
         try:
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT company_id, company_name, action_url 
                 FROM suppliers 
-                WHERE (license_extracted = 0 OR license_extracted IS NULL)
-                  AND (skip_extraction = 0 OR skip_extraction IS NULL)
+                WHERE {EXTRACTION_QUEUE_CONDITION}
             ''')
             suppliers = cursor.fetchall()
+            # 失败后还没到重试时间的供应商
+            waiting = cursor.execute('''
+                SELECT COUNT(*) FROM suppliers
+                WHERE license_extracted = 0 AND skip_extraction = 0 AND next_attempt_at > CURRENT_TIMESTAMP
+            ''').fetchone()[0]
+            if waiting:
+                self.log_extract_message(f"{waiting} 个供应商提取失败后等待重试，本次跳过", "INFO")
         except Exception as e:
             # 兼容旧表结构
             self.log_extract_message(f"查询失败，尝试兼容查询: {e}", "WARNING")
@@ -1879,9 +1875,6 @@ class AlibabaCrawlerGUI:
         # 使用异步并发处理
         def run_concurrent_extract():
             try:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
                 # 创建进度更新函数
                 def update_progress(current, total, detail=""):
                     progress = (current / total) * 100
@@ -1895,13 +1888,12 @@ class AlibabaCrawlerGUI:
                 async def extract_with_progress():
                     try:
                         # 获取数据库中的所有未提取供应商
-                        conn = sqlite3.connect(self.crawler.db_path)
+                        conn = get_read_connection(self.crawler.db_path)
                         cursor = conn.cursor()
-                        cursor.execute('''
+                        cursor.execute(f'''
                             SELECT company_id, company_name, action_url 
                             FROM suppliers 
-                            WHERE (license_extracted = 0 OR license_extracted IS NULL)
-                              AND (skip_extraction = 0 OR skip_extraction IS NULL)
+                            WHERE {EXTRACTION_QUEUE_CONDITION}
                             ORDER BY created_at DESC
                         ''')
                         suppliers = cursor.fetchall()
@@ -1911,81 +1903,23 @@ class AlibabaCrawlerGUI:
                             self.root.after(0, lambda: self.log_extract_message("没有未提取的供应商数据", "WARNING"))
                             return 0
                         
-                        self.root.after(0, lambda: self.log_extract_message(f"从数据库获取到 {len(suppliers)} 个未提取供应商，使用{thread_count}个并发线程处理", "INFO"))
+                        # 请求、解析、探测图片、写入分阶段并发，每个工作协程处理完一个供应商立即取下一个
+                        def log_callback(message, level="INFO"):
+                            self.root.after(0, lambda m=message, l=level: self.log_extract_message(m, l))
                         
-                        # 创建异步会话
-                        connector = aiohttp.TCPConnector(limit=thread_count * 4)  # 连接限制为线程数的4倍
-                        timeout = aiohttp.ClientTimeout(total=15)
+                        pipeline = ExtractionPipeline(
+                            self.crawler, self.proxy, check_ip=enable_ip_check, fetch_workers=thread_count,
+                            log_callback=log_callback, progress_callback=update_progress
+                        )
+                        self.active_pipeline = pipeline
+                        log_callback(f"从数据库获取到 {len(suppliers)} 个未提取供应商，流水线并发: {pipeline.workers}", "INFO")
                         
-                        processed_count = 0
-                        success_count = 0
-                        failed_count = 0
-                        successfully_extracted_ids = []  # 记录成功提取的供应商ID
-                        
-                        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                            # 将供应商分成指定数量一组
-                            batch_size = thread_count
-                            for i in range(0, len(suppliers), batch_size):
-                                batch = suppliers[i:i + batch_size]
-                                batch_num = i//batch_size + 1
-                                total_batches = (len(suppliers) + batch_size - 1)//batch_size
-                                batch_info = f"处理批次 {batch_num}/{total_batches}: {len(batch)} 个供应商"
-                                self.root.after(0, lambda m=batch_info: self.log_extract_message(m, "INFO"))
-                                
-                                # 更新进度
-                                update_progress(i, len(suppliers), f"批次 {batch_num}/{total_batches}")
-                                
-                                # 创建并发任务
-                                tasks = []
-                                for company_id, company_name, action_url in batch:
-                                    # 根据IP检测设置调用不同的方法
-                                    if enable_ip_check:
-                                        task = self.crawler.process_single_supplier(company_id, company_name, action_url, self.proxy, session)
-                                    else:
-                                        # 如果禁用IP检测，使用自定义的process_single_supplier_no_ip_check
-                                        task = self.process_single_supplier_no_ip_check(company_id, company_name, action_url, self.proxy, session)
-                                    tasks.append(task)
-                                
-                                # 并发执行，不等待所有任务完成
-                                running_tasks = []
-                                for task in tasks:
-                                    running_tasks.append(asyncio.create_task(task))
-                                
-                                # 等待当前批次的任务完成（不阻塞下一批）
-                                for idx, task in enumerate(running_tasks):
-                                    try:
-                                        result = await task
-                                        processed_count += 1
-                                        if result:
-                                            success_count += 1
-                                            # 记录成功提取的供应商ID
-                                            company_id = batch[idx][0]  # batch中的第一个元素是company_id
-                                            successfully_extracted_ids.append(company_id)
-                                            company_name = batch[idx][1]  # 获取公司名称
-                                            self.root.after(0, lambda cn=company_name: self.log_extract_message(f"✓ 成功处理: {cn} ({processed_count}/{len(suppliers)})", "SUCCESS"))
-                                        else:
-                                            failed_count += 1
-                                            company_name = batch[idx][1]  # 获取公司名称
-                                            self.root.after(0, lambda cn=company_name: self.log_extract_message(f"✗ 处理失败: {cn} ({processed_count}/{len(suppliers)}) - 可能原因: 页面无法访问或未找到执照信息", "ERROR"))
-                                    except Exception as e:
-                                        failed_count += 1
-                                        company_name = batch[idx][1] if idx < len(batch) else "未知供应商"
-                                        error_msg = str(e)
-                                        self.root.after(0, lambda cn=company_name, m=error_msg: self.log_extract_message(f"✗ 处理异常: {cn} - 错误: {m}", "ERROR"))
-                                
-                                # 更新进度
-                                current_processed = min(i + batch_size, len(suppliers))
-                                update_progress(current_processed, len(suppliers), f"批次 {batch_num}/{total_batches} 完成")
-                                
-                                # 批次间延迟（使用手动设置）
-                                if i + batch_size < len(suppliers):
-                                    self.root.after(0, lambda d=batch_delay: self.log_extract_message(f"批次间等待 {d:.1f} 秒...", "DEBUG"))
-                                    await asyncio.sleep(batch_delay)
+                        successfully_extracted_ids = await pipeline.run(suppliers)
                         
                         # 最终进度更新
-                        update_progress(len(suppliers), len(suppliers), "处理完成")
+                        update_progress(pipeline.done, len(suppliers), pipeline.format_stats())
                         
-                        done_msg = f"执照图片提取完成，成功: {success_count}，失败: {failed_count}，总计: {processed_count}"
+                        done_msg = f"执照图片提取完成: {pipeline.format_stats()}"
                         self.root.after(0, lambda m=done_msg: self.log_extract_message(m, "INFO"))
                         return successfully_extracted_ids  # 返回成功提取的供应商ID列表
                         
@@ -1995,7 +1929,7 @@ class AlibabaCrawlerGUI:
                         return 0
                 
                 # 运行带进度更新的提取
-                successfully_extracted_ids = loop.run_until_complete(extract_with_progress())
+                successfully_extracted_ids = get_async_runner().run(extract_with_progress())
                 
                 # 提取完成后，只保存本次提取的执照信息到本地文件
                 if successfully_extracted_ids:
@@ -2008,6 +1942,18 @@ class AlibabaCrawlerGUI:
                 self.root.after(0, lambda: self.extract_status_label.config(text="提取完成"))
                 done_msg = f"并发提取完成: 成功处理 {len(successfully_extracted_ids) if successfully_extracted_ids else 0} 个供应商"
                 self.root.after(0, lambda m=done_msg: self.log_extract_message(m, "SUCCESS"))
+                stats_msg = self.format_writer_stats()
+                self.root.after(0, lambda m=stats_msg: self.log_extract_message(m, "INFO"))
+                http_msg = get_http_client().format_stats()
+                self.root.after(0, lambda m=http_msg: self.log_extract_message(m, "INFO"))
+                pacer_msg = get_host_pacer().format_stats()
+                self.root.after(0, lambda m=pacer_msg: self.log_extract_message(m, "INFO"))
+                cache_msg = get_response_cache().format_stats()
+                self.root.after(0, lambda m=cache_msg: self.log_extract_message(m, "INFO"))
+                parse_pool = get_parse_pool()
+                if parse_pool is not None:
+                    pool_msg = parse_pool.format_stats()
+                    self.root.after(0, lambda m=pool_msg: self.log_extract_message(m, "INFO"))
                 
             except Exception as e:
                 error_msg = str(e)
@@ -2017,89 +1963,6 @@ class AlibabaCrawlerGUI:
         thread = threading.Thread(target=run_concurrent_extract, daemon=True)
         thread.start()
     
-    async def process_single_supplier_no_ip_check(self, company_id, company_name, action_url, proxy, session):
-        """处理单个供应商（禁用IP检测）"""
-        try:
-            self.root.after(0, lambda: self.log_extract_message(f"开始处理: {company_name}", "INFO"))
-            
-            # 创建日志回调函数
-            def log_callback(message, level="INFO"):
-                self.root.after(0, lambda: self.log_extract_message(message, level))
-            
-            # 获取供应商页面HTML（禁用IP检测）
-            html_content = await self.crawler.fetch_supplier_page(action_url, proxy, session, check_ip=False, log_callback=log_callback)
-            
-            if html_content:
-                self.root.after(0, lambda: self.log_extract_message(f"  - {company_name}: 成功获取页面", "SUCCESS"))
-                
-                # 提取执照图片
-                licenses = await self.crawler.extract_licenses_from_html(html_content)
-                
-                # 提取执照信息
-                license_info = self.crawler.extract_license_info_from_html(html_content)
-                
-                # 保存到数据库
-                conn = sqlite3.connect(self.crawler.db_path)
-                cursor = conn.cursor()
-                
-                # 先删除该供应商的旧记录
-                cursor.execute('DELETE FROM licenses WHERE supplier_id = ?', (company_id,))
-                cursor.execute('DELETE FROM license_info WHERE supplier_id = ?', (company_id,))
-                
-                # 保存执照图片
-                if licenses:
-                    for license_item in licenses:
-                        cursor.execute('''
-                            INSERT INTO licenses (supplier_id, license_name, license_url, file_id)
-                            VALUES (?, ?, ?, ?)
-                        ''', (
-                            company_id,
-                            license_item['name'],
-                            license_item['url'],
-                            license_item['fileId']
-                        ))
-                    print(f"  - {company_name}: 找到 {len(licenses)} 个执照图片")
-                
-                # 保存执照信息
-                if license_info:
-                    cursor.execute('''
-                        INSERT INTO license_info (
-                            supplier_id, registration_no, company_name, date_of_issue, 
-                            date_of_expiry, registered_capital, country_territory, 
-                            registered_address, year_established, legal_form, legal_representative
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        company_id,
-                        license_info.get('registration_no', ''),
-                        license_info.get('company_name', ''),
-                        license_info.get('date_of_issue', ''),
-                        license_info.get('date_of_expiry', ''),
-                        license_info.get('registered_capital', ''),
-                        license_info.get('country_territory', ''),
-                        license_info.get('registered_address', ''),
-                        license_info.get('year_established', ''),
-                        license_info.get('legal_form', ''),
-                        license_info.get('legal_representative', '')
-                    ))
-                    print("执照信息已保存到数据库")
-                
-                # 如果成功提取到执照信息，标记为已获取
-                if licenses or license_info:
-                    cursor.execute('UPDATE suppliers SET license_extracted = TRUE WHERE company_id = ?', (company_id,))
-                    print(f"  - {company_name}: 标记为已提取")
-                
-                conn.commit()
-                conn.close()
-                
-                return True
-            else:
-                print(f"  - {company_name}: 获取页面失败")
-                return False
-                
-        except Exception as e:
-            print(f"处理供应商时出错: {e}")
-            return False
-    
     def extract_single_license_with_save(self, company_id, company_name, action_url, proxy, save_path):
         """提取单个供应商执照并保存到文件"""
         try:
@@ -2122,16 +1985,13 @@ class AlibabaCrawlerGUI:
                     crawler = AlibabaSupplierCrawler()
                     
                     # 运行异步提取
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    result = loop.run_until_complete(
+                    result = get_async_runner().run(
                         crawler.extract_single_license(company_id, company_name, action_url, fixed_proxy)
                     )
                     
                     if result:
                         # 从数据库获取提取的执照信息
-                        conn = sqlite3.connect(crawler.db_path)
+                        conn = get_read_connection(crawler.db_path)
                         cursor = conn.cursor()
                         
                         # 获取执照图片
@@ -2171,7 +2031,7 @@ class AlibabaCrawlerGUI:
         """保存所有执照信息到本地文件"""
         try:
             # 连接数据库
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
             # 获取所有有执照信息的供应商
@@ -2224,7 +2084,7 @@ class AlibabaCrawlerGUI:
         """只保存指定供应商ID的执照信息到本地文件"""
         try:
             # 连接数据库
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
             if not supplier_ids:
@@ -2289,7 +2149,7 @@ class AlibabaCrawlerGUI:
         # 如果提供了company_id，尝试从数据库获取保存路径
         if company_id:
             try:
-                conn = sqlite3.connect(self.crawler.db_path)
+                conn = get_read_connection(self.crawler.db_path)
                 cursor = conn.cursor()
                 cursor.execute('SELECT save_path FROM suppliers WHERE company_id = ?', (company_id,))
                 result = cursor.fetchone()
@@ -2343,7 +2203,6 @@ class AlibabaCrawlerGUI:
         # 保存执照图片
         if licenses:
             try:
-                import requests
                 from PIL import Image
                 
                 for i, license_item in enumerate(licenses, 1):
@@ -2352,7 +2211,7 @@ class AlibabaCrawlerGUI:
                         license_url = license_item[0]
                         
                         # 下载图片
-                        response = requests.get(license_url, timeout=10)
+                        response = paced_get(license_url, timeout=10)
                         if response.status_code == 200:
                             # 获取原始文件扩展名
                             import urllib.parse
@@ -2374,6 +2233,8 @@ class AlibabaCrawlerGUI:
     
     def stop_extract(self):
         """停止提取"""
+        if self.active_pipeline is not None:
+            self.active_pipeline.stop()
         self.extract_all_btn.config(state=tk.NORMAL)
         self.stop_extract_btn.config(state=tk.DISABLED)
         self.log_message("提取已停止")
@@ -2650,16 +2511,13 @@ class AlibabaCrawlerGUI:
                 crawler = AlibabaSupplierCrawler()
                 
                 # 运行异步识别
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                result = loop.run_until_complete(
+                result = get_async_runner().run(
                     crawler.recognize_license_from_url(action_url, fixed_proxy)
                 )
                 
                 if result:
                     # 从数据库获取提取的执照信息
-                    conn = sqlite3.connect(crawler.db_path)
+                    conn = get_read_connection(crawler.db_path)
                     cursor = conn.cursor()
                     
                     # 获取执照图片
@@ -2701,122 +2559,28 @@ class AlibabaCrawlerGUI:
             for item in self.db_list_tree.get_children():
                 self.db_list_tree.delete(item)
             
-            # 连接数据库
-            conn = sqlite3.connect(self.crawler.db_path)
+            # 连接数据库（表结构由启动时的迁移保证）
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
-            # 检查表结构，确保有必要的字段
-            try:
-                cursor.execute("PRAGMA table_info(suppliers)")
-                columns = [column[1] for column in cursor.fetchall()]
-                
-                # 如果缺少license_extracted字段，添加它
-                if 'license_extracted' not in columns:
-                    self.log_message("添加license_extracted字段到数据库...")
-                    cursor.execute('ALTER TABLE suppliers ADD COLUMN license_extracted BOOLEAN DEFAULT FALSE')
-                    conn.commit()
-                
-                # 如果缺少category_id或category_name字段，添加它们
-                if 'category_id' not in columns:
-                    self.log_message("添加category_id字段到数据库...")
-                    cursor.execute('ALTER TABLE suppliers ADD COLUMN category_id TEXT')
-                    conn.commit()
-                
-                if 'category_name' not in columns:
-                    self.log_message("添加category_name字段到数据库...")
-                    cursor.execute('ALTER TABLE suppliers ADD COLUMN category_name TEXT')
-                    conn.commit()
-            except Exception as e:
-                self.log_message(f"检查表结构时出错: {e}")
-            
-            # 检查并添加is_used字段
-            if 'is_used' not in columns:
-                self.log_message("添加is_used字段到数据库...")
-                cursor.execute('ALTER TABLE suppliers ADD COLUMN is_used BOOLEAN DEFAULT FALSE')
-                conn.commit()
-                columns.append('is_used')
-            
-            # 检查并添加ocr_recognition_status字段
-            if 'ocr_recognition_status' not in columns:
-                self.log_message("添加ocr_recognition_status字段到数据库...")
-                cursor.execute('ALTER TABLE suppliers ADD COLUMN ocr_recognition_status TEXT DEFAULT "pending"')
-                conn.commit()
-                columns.append('ocr_recognition_status')
-            
             # 根据Tab选择查询条件
             tab_filter = self.db_list_tab_var.get()
             
-            # 构建基本查询
-            base_select = "SELECT id, company_name, action_url"
-            base_count = "SELECT COUNT(*)"
-            
-            # 根据表结构添加字段
-            if 'license_extracted' in columns:
-                base_select += ", license_extracted"
+            if self.db_list_search_term:
+                # 搜索模式：全文索引按相关度返回匹配的ID，再取当前页的记录
+                matched_ids = search_supplier_ids(conn, self.db_list_search_term, DB_LIST_TAB_FILTERS.get(tab_filter, ""))
+                self.update_pagination_info(len(matched_ids))
+                start = (self.current_page - 1) * self.page_size
+                suppliers = self.fetch_db_list_rows_by_ids(cursor, matched_ids[start:start + self.page_size])
             else:
-                base_select += ", 0 as license_extracted"
+                # 总数读取计数表，翻页不再COUNT
+                total_count = self.get_db_list_tab_count(cursor, tab_filter)
                 
-            if 'category_id' in columns:
-                base_select += ", category_id"
-            else:
-                base_select += ", '' as category_id"
-                
-            if 'category_name' in columns:
-                base_select += ", category_name"
-            else:
-                base_select += ", '' as category_name"
-                
-            if 'is_used' in columns:
-                base_select += ", is_used"
-            else:
-                base_select += ", 0 as is_used"
+                # 更新分页信息
+                self.update_pagination_info(total_count)
                 
-            if 'ocr_recognition_status' in columns:
-                base_select += ", ocr_recognition_status"
-            else:
-                base_select += ", 'pending' as ocr_recognition_status"
-            
-            base_from = " FROM suppliers"
-            
-            # 添加过滤条件
-            where_clause = ""
-            if tab_filter == "success":
-                where_clause = " WHERE license_extracted = 1"
-            elif tab_filter == "pending":
-                where_clause = " WHERE (license_extracted = 0 OR license_extracted IS NULL) AND (skip_extraction = 0 OR skip_extraction IS NULL)"
-            elif tab_filter == "recognized":
-                where_clause = " WHERE license_extracted = 1 AND (registration_no IS NOT NULL AND registration_no != '')"
-            elif tab_filter == "used":
-                where_clause = " WHERE is_used = 1"
-            elif tab_filter == "unused":
-                where_clause = " WHERE is_used = 0 OR is_used IS NULL"
-            elif tab_filter == "problematic":
-                where_clause = " WHERE skip_extraction = 1"
-            elif tab_filter == "ocr_error":
-                where_clause = " WHERE ocr_recognition_status = 'error'"
-            # else: all - 无where条件
-            
-            order_clause = " ORDER BY created_at DESC"
-            
-            # 先获取总数
-            count_query = base_count + base_from + where_clause
-            cursor.execute(count_query)
-            total_count = cursor.fetchone()[0]
-            
-            # 更新分页信息
-            self.update_pagination_info(total_count)
-            
-            # 计算分页参数
-            offset = (self.current_page - 1) * self.page_size
-            limit_clause = f" LIMIT {self.page_size} OFFSET {offset}"
-            
-            # 构建分页查询
-            query = base_select + base_from + where_clause + order_clause + limit_clause
-            
-            # 执行查询
-            self.log_message(f"执行分页查询: {query}")
-            cursor.execute(query)
-            suppliers = cursor.fetchall()
+                # 按 (created_at, id) 键集分页查询当前页
+                suppliers = self.fetch_db_list_page(cursor, DB_LIST_TAB_FILTERS.get(tab_filter, ""))
             
             # 统计数量
             total_count = len(suppliers)
@@ -2901,12 +2665,17 @@ class AlibabaCrawlerGUI:
     def search_suppliers(self):
         """搜索供应商"""
         search_term = self.search_entry.get().strip()
-        if not search_term:
+        if not search_term and not self.db_list_search_term:
             messagebox.showwarning("提示", "请输入搜索关键词")
             return
 
-        self.log_message(f"开始搜索供应商: {search_term}")
-        self.refresh_db_list_page() # 刷新列表以应用搜索条件
+        # 关键词为空时清除搜索，恢复完整列表
+        self.db_list_search_term = search_term
+        if search_term:
+            self.log_message(f"开始搜索供应商: {search_term}")
+        else:
+            self.log_message("已清除搜索条件")
+        self.go_to_first_page() # 刷新列表以应用搜索条件
 
     def recognize_selected_db_list(self):
         """识别选中的供应商执照"""
@@ -2980,16 +2749,13 @@ class AlibabaCrawlerGUI:
                     crawler = AlibabaSupplierCrawler()
                     
                     # 运行异步识别
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    result = loop.run_until_complete(
+                    result = get_async_runner().run(
                         crawler.recognize_license_from_url(action_url, fixed_proxy)
                     )
                     
                     if result:
                         # 从数据库获取提取的执照信息
-                        conn = sqlite3.connect(crawler.db_path)
+                        conn = get_read_connection(crawler.db_path)
                         cursor = conn.cursor()
                         
                         # 获取执照图片
@@ -3068,7 +2834,7 @@ class AlibabaCrawlerGUI:
         company_name = item_values[1]
 
         # 从数据库获取供应商的保存路径
-        conn = sqlite3.connect(self.crawler.db_path)
+        conn = get_read_connection(self.crawler.db_path)
         cursor = conn.cursor()
         cursor.execute('SELECT save_path FROM suppliers WHERE company_name = ?', (company_name,))
         result = cursor.fetchone()
@@ -3156,7 +2922,7 @@ class AlibabaCrawlerGUI:
 
             if save_path:
                 # 连接数据库
-                conn = sqlite3.connect(self.crawler.db_path)
+                conn = get_read_connection(self.crawler.db_path)
                 cursor = conn.cursor()
                 
                 # 获取所有供应商
@@ -3633,7 +3399,7 @@ class AlibabaCrawlerGUI:
         
         # 从数据库获取完整信息
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
             # 获取供应商基本信息
@@ -3725,15 +3491,9 @@ class AlibabaCrawlerGUI:
                 return
             
             try:
-                conn = sqlite3.connect(self.crawler.db_path)
-                cursor = conn.cursor()
-                
                 # 更新供应商信息
-                cursor.execute('UPDATE suppliers SET company_name = ?, action_url = ? WHERE company_id = ?', 
-                             (new_name, new_url, company_id))
-                
-                conn.commit()
-                conn.close()
+                self.get_db_writer().execute('UPDATE suppliers SET company_name = ?, action_url = ? WHERE company_id = ?', 
+                                             (new_name, new_url, company_id))
                 
                 messagebox.showinfo("成功", "供应商信息已更新")
                 dialog.destroy()
@@ -3773,28 +3533,24 @@ class AlibabaCrawlerGUI:
             return
         
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
-            
-            # 获取供应商ID
-            cursor.execute('SELECT company_id FROM suppliers WHERE company_name = ?', (company_name,))
-            supplier_info = cursor.fetchone()
+            def delete_supplier(conn):
+                # 获取供应商ID
+                supplier_info = conn.execute('SELECT company_id FROM suppliers WHERE company_name = ?', (company_name,)).fetchone()
+                if not supplier_info:
+                    return False
+                
+                company_id = supplier_info[0]
+                
+                # 删除相关数据
+                conn.execute('DELETE FROM licenses WHERE supplier_id = ?', (company_id,))
+                conn.execute('DELETE FROM license_info WHERE supplier_id = ?', (company_id,))
+                conn.execute('DELETE FROM suppliers WHERE company_id = ?', (company_id,))
+                return True
             
-            if not supplier_info:
+            if not self.get_db_writer().run(delete_supplier):
                 messagebox.showerror("错误", "未找到供应商信息")
-                conn.close()
                 return
             
-            company_id = supplier_info[0]
-            
-            # 删除相关数据
-            cursor.execute('DELETE FROM licenses WHERE supplier_id = ?', (company_id,))
-            cursor.execute('DELETE FROM license_info WHERE supplier_id = ?', (company_id,))
-            cursor.execute('DELETE FROM suppliers WHERE company_id = ?', (company_id,))
-            
-            conn.commit()
-            conn.close()
-            
             messagebox.showinfo("成功", f"供应商 '{company_name}' 已删除")
             self.refresh_db_list_page()  # 刷新列表
             
@@ -3826,12 +3582,13 @@ class AlibabaCrawlerGUI:
             
             self.log_extract_message("开始自动识别本地文件...", "INFO")
             
-            # 连接数据库
-            conn = sqlite3.connect(self.crawler.db_path)
+            # 连接数据库（只读查询，更新统一交给写线程）
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
             total_recognized = 0
             total_updated = 0
+            pending_updates = {}  # company_id -> save_path
             
             for scan_path in paths_to_scan:
                 self.log_extract_message(f"扫描路径: {scan_path}", "INFO")
@@ -3890,9 +3647,8 @@ class AlibabaCrawlerGUI:
                                     company_id, license_extracted = supplier_info
                                     
                                     # 如果还未标记为已提取，则更新
-                                    if not license_extracted:
-                                        cursor.execute('UPDATE suppliers SET license_extracted = TRUE, save_path = ? WHERE company_id = ?', 
-                                                     (company_path, company_id))
+                                    if not license_extracted and company_id not in pending_updates:
+                                        pending_updates[company_id] = company_path
                                         total_updated += 1
                                         self.log_extract_message(f"已更新: {company_name} (分类: {category_name})", "SUCCESS")
                                     else:
@@ -3934,9 +3690,8 @@ class AlibabaCrawlerGUI:
                                 company_id, license_extracted = supplier_info
                                 
                                 # 如果还未标记为已提取，则更新
-                                if not license_extracted:
-                                    cursor.execute('UPDATE suppliers SET license_extracted = TRUE, save_path = ? WHERE company_id = ?', 
-                                                 (root, company_id))
+                                if not license_extracted and company_id not in pending_updates:
+                                    pending_updates[company_id] = root
                                     total_updated += 1
                                     self.log_extract_message(f"已更新: {company_name}", "SUCCESS")
                                 else:
@@ -3944,9 +3699,14 @@ class AlibabaCrawlerGUI:
                             else:
                                 self.log_extract_message(f"数据库中未找到: {company_name}", "WARNING")
             
-            conn.commit()
             conn.close()
             
+            if pending_updates:
+                self.get_db_writer().executemany(
+                    'UPDATE suppliers SET license_extracted = TRUE, save_path = ? WHERE company_id = ?',
+                    [(path, company_id) for company_id, path in pending_updates.items()]
+                )
+            
             self.log_extract_message(f"自动识别完成！识别到 {total_recognized} 个已有执照文件，更新了 {total_updated} 条记录", "SUCCESS")
             
             if total_updated > 0:
@@ -4238,7 +3998,7 @@ class AlibabaCrawlerGUI:
         self.progress['value'] = 0
         
         self.log_crawl_message(f"开始一键爬取，共 {total_keywords} 个关键词，每个关键词爬取 {start_page}-{end_page} 页", "INFO")
-        self.log_crawl_message(f"并发线程数: {thread_count}，关键词间隔: {delay} 秒", "INFO")
+        self.log_crawl_message(f"并发关键词数: {thread_count}，关键词启动间隔: {delay} 秒", "INFO")
         
         # 保存缓存模式设置
         self.cache_mode = cache_mode
@@ -4257,7 +4017,7 @@ class AlibabaCrawlerGUI:
         self.batch_crawl_thread.start()
     
     def run_batch_crawl(self, keywords, start_page, end_page, thread_count, delay, cache_mode=False, cache_file=None):
-        """运行批量爬取"""
+        """运行批量爬取（thread_count个关键词在后台事件循环中并发爬取）"""
         try:
             # 获取代理设置
             proxy = None
@@ -4266,62 +4026,29 @@ class AlibabaCrawlerGUI:
             
             # 获取跳过重复选项
             skip_duplicates = self.skip_duplicates_var.get()
+            incremental = self.incremental_var.get()
             
-            total_suppliers = 0
-            current_keyword = 0
+            # 创建日志回调
+            def log_callback(message, level="INFO"):
+                self.root.after(0, lambda m=message, l=level: self.log_crawl_message(m, l))
             
-            for keyword in keywords:
-                current_keyword += 1
-                self.root.after(0, lambda k=keyword, c=current_keyword, t=len(keywords): 
-                    self.log_crawl_message(f"[{c}/{t}] 开始爬取关键词: {k}", "INFO"))
-                
-                try:
-                    # 运行异步爬虫
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    # 创建进度回调
-                    def progress_callback(current, total, message=""):
-                        progress_value = ((current_keyword - 1) * (end_page - start_page + 1) + current)
-                        self.root.after(0, lambda: self.progress.config(value=progress_value))
-                        if message:
-                            self.root.after(0, lambda m=message: self.log_crawl_message(m, "INFO"))
-                    
-                    # 创建爬虫实例
-                    crawler = AlibabaSupplierCrawler()
-                    
-                    # 设置进度回调
-                    crawler.progress_callback = progress_callback
-                    
-                    # 创建日志回调
-                    def log_callback(message, level="INFO"):
-                        self.root.after(0, lambda m=message, l=level: self.log_crawl_message(m, l))
-                    
-                    suppliers = loop.run_until_complete(
-                        crawler.crawl_suppliers_range(
-                            keyword, start_page, end_page, proxy, skip_duplicates=skip_duplicates, 
-                            log_callback=log_callback, save_to_file=cache_mode, cache_file=cache_file
-                        )
-                    )
-                    
-                    total_suppliers += len(suppliers)
-                    self.root.after(0, lambda k=keyword, count=len(suppliers): 
-                        self.log_crawl_message(f"关键词 '{k}' 爬取完成，获取 {count} 个供应商", "SUCCESS"))
-                    
-                    # 关键词间隔
-                    if current_keyword < len(keywords) and delay > 0:
-                        self.root.after(0, lambda d=delay: 
-                            self.log_crawl_message(f"等待 {d} 秒后继续下一个关键词...", "INFO"))
-                        import time
-                        time.sleep(delay)
-                        
-                except Exception as e:
-                    self.root.after(0, lambda k=keyword, err=str(e): 
-                        self.log_crawl_message(f"关键词 '{k}' 爬取失败: {err}", "ERROR"))
-                    continue
+            # 创建进度回调（已完成页数）
+            def progress_callback(pages_done, total_pages):
+                self.root.after(0, lambda value=pages_done: self.progress.config(value=value))
+            
+            scheduler = BatchCrawlScheduler(
+                self.crawler, keyword_concurrency=thread_count,
+                log_callback=log_callback, progress_callback=progress_callback
+            )
+            self.active_scheduler = scheduler
+            stats = get_async_runner().run(scheduler.run(
+                keywords, start_page, end_page, proxy, skip_duplicates=skip_duplicates,
+                save_to_file=cache_mode, cache_file=cache_file, start_interval=delay,
+                incremental=incremental
+            ))
             
             # 完成
-            self.root.after(0, lambda total=total_suppliers: 
+            self.root.after(0, lambda total=stats['suppliers']: 
                 self.batch_crawl_finished(total))
                 
         except Exception as e:
@@ -4472,10 +4199,7 @@ class AlibabaCrawlerGUI:
                         self.log_crawl_message(f"[批量入库] 处理文件 {idx}/{total}: {f}", "INFO"))
                     
                     # 使用爬虫的批量入库方法
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    saved_count = loop.run_until_complete(
+                    saved_count = get_async_runner().run(
                         self.crawler.batch_save_from_cache_file(
                             filepath,
                             skip_duplicates=True,
@@ -4560,7 +4284,7 @@ class AlibabaCrawlerGUI:
             from ocr_baidu_api import BaiduLicenseOCRAPI
             
             # 获取未使用的供应商数据
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
             # 查询未使用且有执照的供应商
@@ -4640,6 +4364,10 @@ class AlibabaCrawlerGUI:
             # 完成统计
             self.root.after(0, lambda: self.log_ocr_message(
                 f"OCR识别完成！成功: {success_count}，失败: {error_count}", "SUCCESS"))
+            stats_msg = self.format_writer_stats()
+            self.root.after(0, lambda m=stats_msg: self.log_ocr_message(m, "INFO"))
+            http_msg = get_http_client().format_stats()
+            self.root.after(0, lambda m=http_msg: self.log_ocr_message(m, "INFO"))
             
             # 更新OCR进度状态
             self.root.after(0, lambda: self.ocr_progress.configure(value=100))
@@ -4748,18 +4476,12 @@ class AlibabaCrawlerGUI:
     def update_supplier_ocr_status(self, supplier_id, status, is_used):
         """更新供应商的OCR识别状态"""
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+            self.get_db_writer().execute("""
                 UPDATE suppliers 
                 SET ocr_recognition_status = ?, is_used = ?
                 WHERE id = ?
             """, (status, 1 if is_used else 0, supplier_id))
             
-            conn.commit()
-            conn.close()
-            
         except Exception as e:
             self.root.after(0, lambda: self.log_ocr_message(f"更新供应商状态失败: {str(e)}", "ERROR"))
     
@@ -4779,12 +4501,58 @@ class AlibabaCrawlerGUI:
             
             self.root.after(0, lambda: self.log_ocr_message(f"开始批量导入 {len(cache_files)} 个OCR缓存文件到数据库", "INFO"))
             
-            conn = sqlite3.connect(self.crawler.db_path)
-            cursor = conn.cursor()
+            writer = self.get_db_writer()
             
             success_count = 0
             error_count = 0
             
+            def import_ocr_result(conn, ocr_result):
+                # 插入到数据库（已存在时原地更新，REPLACE的隐式删除不会触发全文索引的删除触发器）
+                conn.execute("""
+                    INSERT INTO company_registration (
+                        profile_id, supplier_id, registration_number, company_name, 
+                        registered_address, province, city, district, zip_code, 
+                        license_url, legal_representative, issue_date, expiration_date, created_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(supplier_id, registration_number) DO UPDATE SET
+                        profile_id = excluded.profile_id,
+                        company_name = excluded.company_name,
+                        registered_address = excluded.registered_address,
+                        province = excluded.province,
+                        city = excluded.city,
+                        district = excluded.district,
+                        zip_code = excluded.zip_code,
+                        license_url = excluded.license_url,
+                        legal_representative = excluded.legal_representative,
+                        issue_date = excluded.issue_date,
+                        expiration_date = excluded.expiration_date,
+                        created_at = excluded.created_at
+                """, (
+                    ocr_result.get('profile_id', ''),
+                    ocr_result.get('supplier_id', ''),
+                    ocr_result.get('registration_number', ''),
+                    ocr_result.get('company_name', ''),
+                    ocr_result.get('registered_address', ''),
+                    ocr_result.get('province', ''),
+                    ocr_result.get('city', ''),
+                    ocr_result.get('district', ''),
+                    ocr_result.get('zip_code', ''),
+                    ocr_result.get('license_url', ''),
+                    ocr_result.get('legal_representative', ''),
+                    ocr_result.get('issue_date', ''),
+                    ocr_result.get('expiration_date', ''),
+                    ocr_result.get('created_at', datetime.now().isoformat())
+                ))
+                
+                # 更新供应商状态为成功
+                conn.execute("""
+                    UPDATE suppliers 
+                    SET ocr_recognition_status = 'success', is_used = 1
+                    WHERE id = ?
+                """, (ocr_result.get('supplier_id'),))
+            
+            # 先全部提交给写线程（合并提交），再逐个等待结果
+            submitted = []
             for cache_file in cache_files:
                 try:
                     file_path = os.path.join(cache_dir, cache_file)
@@ -4793,49 +4561,23 @@ class AlibabaCrawlerGUI:
                     with open(file_path, 'r', encoding='utf-8') as f:
                         ocr_result = json.load(f)
                     
-                    # 插入到数据库
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO company_registration (
-                            profile_id, supplier_id, registration_number, company_name, 
-                            registered_address, province, city, district, zip_code, 
-                            license_url, legal_representative, issue_date, expiration_date, created_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        ocr_result.get('profile_id', ''),
-                        ocr_result.get('supplier_id', ''),
-                        ocr_result.get('registration_number', ''),
-                        ocr_result.get('company_name', ''),
-                        ocr_result.get('registered_address', ''),
-                        ocr_result.get('province', ''),
-                        ocr_result.get('city', ''),
-                        ocr_result.get('district', ''),
-                        ocr_result.get('zip_code', ''),
-                        ocr_result.get('license_url', ''),
-                        ocr_result.get('legal_representative', ''),
-                        ocr_result.get('issue_date', ''),
-                        ocr_result.get('expiration_date', ''),
-                        ocr_result.get('created_at', datetime.now().isoformat())
-                    ))
-                    
-                    # 更新供应商状态为成功
-                    cursor.execute("""
-                        UPDATE suppliers 
-                        SET ocr_recognition_status = 'success', is_used = 1
-                        WHERE id = ?
-                    """, (ocr_result.get('supplier_id'),))
+                    submitted.append((cache_file, file_path, writer.submit(import_ocr_result, ocr_result)))
                     
+                except Exception as e:
+                    error_count += 1
+                    self.root.after(0, lambda err=str(e), file=cache_file: self.log_ocr_message(f"导入缓存文件 {file} 失败: {err}", "ERROR"))
+            
+            for cache_file, file_path, future in submitted:
+                try:
+                    future.result()
                     success_count += 1
                     
-                    # 删除已处理的缓存文件
+                    # 删除已入库的缓存文件
                     os.remove(file_path)
                     
                 except Exception as e:
                     error_count += 1
                     self.root.after(0, lambda err=str(e), file=cache_file: self.log_ocr_message(f"导入缓存文件 {file} 失败: {err}", "ERROR"))
-                    continue
-            
-            conn.commit()
-            conn.close()
             
             self.root.after(0, lambda: self.log_ocr_message(f"✓ 批量导入完成：成功 {success_count} 个，失败 {error_count} 个", "SUCCESS"))
             
@@ -4853,7 +4595,7 @@ class AlibabaCrawlerGUI:
                 self.ocr_result_tree.delete(item)
             
             # 连接数据库
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
             # 查询识别结果
@@ -4913,7 +4655,7 @@ class AlibabaCrawlerGUI:
                 return
             
             # 连接数据库
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
             # 查询所有识别结果
@@ -4976,7 +4718,7 @@ class AlibabaCrawlerGUI:
                 from ocr.address_query import AddressQuery
                 address_query = AddressQuery()
             
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
             # 查询未解析地址的记录（省和市都为空的记录）
@@ -4990,6 +4732,7 @@ class AlibabaCrawlerGUI:
             """)
             
             records = cursor.fetchall()
+            conn.close()
             
             if not records:
                 messagebox.showinfo("提示", "没有需要解析的地址记录")
@@ -4997,6 +4740,8 @@ class AlibabaCrawlerGUI:
             
             success_count = 0
             total_count = len(records)
+            parsed_updates = []   # 解析成功的记录
+            attempted_ids = []    # 已尝试解析但失败/出错的记录
             
             self.log_message(f"开始解析 {total_count} 条地址记录...")
             
@@ -5006,12 +4751,8 @@ class AlibabaCrawlerGUI:
                     result = address_query.parse_address(registered_address)
                     
                     if result and isinstance(result, dict) and result.get('province'):
-                        # 更新数据库记录
-                        cursor.execute("""
-                            UPDATE company_registration 
-                            SET province = ?, city = ?, district = ?, zip_code = ?, address_parsed = 1
-                            WHERE id = ?
-                        """, (
+                        # 记录待更新的数据库记录
+                        parsed_updates.append((
                             result.get('province', ''),
                             result.get('city', ''),
                             result.get('district', '') or result.get('county', ''),  # 兼容两种字段名
@@ -5022,24 +4763,28 @@ class AlibabaCrawlerGUI:
                         self.log_message(f"解析成功: {registered_address} -> {result.get('province', '')}{result.get('city', '')}{result.get('district', '') or result.get('county', '')} - 邮编: {result.get('postcode', '')}")
                     else:
                         # 标记为已尝试解析但失败
-                        cursor.execute("""
-                            UPDATE company_registration 
-                            SET address_parsed = 1
-                            WHERE id = ?
-                        """, (record_id,))
+                        attempted_ids.append((record_id,))
                         self.log_message(f"解析失败: {registered_address}")
                         
                 except Exception as e:
                     self.log_message(f"解析地址出错 {registered_address}: {e}")
                     # 标记为已尝试解析但出错
-                    cursor.execute("""
-                        UPDATE company_registration 
-                        SET address_parsed = 1
-                        WHERE id = ?
-                    """, (record_id,))
-            
-            conn.commit()
-            conn.close()
+                    attempted_ids.append((record_id,))
+            
+            def save_parsed_addresses(conn):
+                conn.executemany("""
+                    UPDATE company_registration 
+                    SET province = ?, city = ?, district = ?, zip_code = ?, address_parsed = 1
+                    WHERE id = ?
+                """, parsed_updates)
+                conn.executemany("""
+                    UPDATE company_registration 
+                    SET address_parsed = 1
+                    WHERE id = ?
+                """, attempted_ids)
+            
+            # 解析结果一次性交给写线程提交
+            self.get_db_writer().run(save_parsed_addresses)
             
             # 关闭地址查询引擎（如果有close方法）
             if hasattr(address_query, 'close'):
@@ -5095,7 +4840,7 @@ class AlibabaCrawlerGUI:
     def generate_postcode_only(self):
         """专门补充邮编信息"""
         try:
-            conn = sqlite3.connect(self.crawler.db_path)
+            conn = get_read_connection(self.crawler.db_path)
             cursor = conn.cursor()
             
             # 查询已有省市信息但没有邮编的记录（district可以为空）
@@ -5110,20 +4855,20 @@ class AlibabaCrawlerGUI:
             """)
             
             records = cursor.fetchall()
+            conn.close()
             
             if not records:
                 messagebox.showinfo("提示", "没有需要补充邮编的记录")
-                conn.close()
                 return
             
             # 连接area.db数据库查询邮编
             area_db_path = os.path.join(os.path.dirname(__file__), 'ocr', 'area.db')
-            area_conn = sqlite3.connect(area_db_path)
-            area_conn.row_factory = sqlite3.Row
+            area_conn = get_read_connection(area_db_path, row_factory=sqlite3.Row)
             area_cursor = area_conn.cursor()
             
             success_count = 0
             total_count = len(records)
+            postcode_updates = []
             
             self.log_message(f"开始补充 {total_count} 条记录的邮编...")
             
@@ -5141,12 +4886,8 @@ class AlibabaCrawlerGUI:
                         address_query.close()
                     
                     if postcode:
-                        # 更新数据库记录
-                        cursor.execute("""
-                            UPDATE company_registration 
-                            SET zip_code = ?
-                            WHERE id = ?
-                        """, (postcode, record_id))
+                        # 记录待更新的数据库记录
+                        postcode_updates.append((postcode, record_id))
                         success_count += 1
                         self.log_message(f"邮编补充成功: {province}{city}{district} -> {postcode}")
                     else:
@@ -5155,10 +4896,16 @@ class AlibabaCrawlerGUI:
                 except Exception as e:
                     self.log_message(f"补充邮编出错 {province}{city}{district}: {e}")
             
-            conn.commit()
-            conn.close()
             area_conn.close()
             
+            # 邮编一次性交给写线程提交
+            if postcode_updates:
+                self.get_db_writer().executemany("""
+                    UPDATE company_registration 
+                    SET zip_code = ?
+                    WHERE id = ?
+                """, postcode_updates)
+            
             # 刷新结果列表
             self.refresh_ocr_results()
             
@@ -5173,17 +4920,14 @@ class AlibabaCrawlerGUI:
         """清空OCR识别结果"""
         if messagebox.askyesno("确认", "确定要清空所有识别结果吗？此操作不可恢复！"):
             try:
-                conn = sqlite3.connect(self.crawler.db_path)
-                cursor = conn.cursor()
-                
-                # 清空company_registration表
-                cursor.execute('DELETE FROM company_registration')
-                
-                # 重置suppliers表的OCR状态
-                cursor.execute('UPDATE suppliers SET ocr_recognition_status = "pending"')
+                def clear_results(conn):
+                    # 清空company_registration表
+                    conn.execute('DELETE FROM company_registration')
+                    
+                    # 重置suppliers表的OCR状态
+                    conn.execute('UPDATE suppliers SET ocr_recognition_status = "pending"')
                 
-                conn.commit()
-                conn.close()
+                self.get_db_writer().run(clear_results)
                 
                 # 刷新列表
                 self.refresh_ocr_results()
@@ -5201,5 +4945,7 @@ class AlibabaCrawlerGUI:
         self.root.mainloop()
 
 if __name__ == "__main__":
+    # 打包后的程序启动解析子进程时需要
+    multiprocessing.freeze_support()
     app = AlibabaCrawlerGUI()
     app.run()
\ No newline at end of file
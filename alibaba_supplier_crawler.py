@@ -1,18 +1,93 @@
 import asyncio
+import contextlib
 import json
-import sqlite3
+import multiprocessing
 import os
 import time
 import random
 import re
 from datetime import datetime
 import aiohttp
-import requests
 import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
 import urllib.parse
 from urllib.parse import urlparse
+from app_config import load_crawler_config
+from async_runner import get_async_runner
+from db_migrations import run_migrations
+from db_pool import connect, get_read_connection
+from crawl_plan import (KnownPageTracker, PageRange, load_seen_ids, page_count_from_total, parse_pagination,
+                        record_page_count, record_seen_ids)
+from db_writer import get_writer
+from extraction_pipeline import ExtractionPipeline
+from extraction_sink import EXTRACTION_QUEUE_CONDITION, get_extraction_sink, write_extraction_results
+from http_client import get_http_client
+from image_meta import load_image_meta, record_image_meta
+from license_parser import parse_license_page
+from ip_monitor import get_ip_monitor
+from page_fetcher import fetch_pages
+from parse_pool import get_parse_pool, parse_page
+from request_pacer import get_host_pacer
+from response_cache import get_response_cache
+from supplier_metrics import METRIC_COLUMNS, supplier_metric_values
+
+# suppliers表批量插入使用的字段顺序（与build_supplier_row保持一致，末尾为解析出的数值指标）
+SUPPLIER_INSERT_COLUMNS = (
+    'company_id', 'company_name', 'action_url', 'country_code', 'city', 'gold_years',
+    'verified_supplier', 'is_factory', 'review_score', 'review_count', 'company_on_time_shipping',
+    'factory_size_text', 'total_employees_text', 'transaction_count_6months',
+    'transaction_gmv_6months_text', 'gold_supplier', 'trade_assurance', 'response_time',
+    'category_id', 'category_name', 'save_path'
+) + tuple(METRIC_COLUMNS)
+
+# 不跳过重复时需要刷新的抓取字段（不覆盖提取/识别/使用状态）
+SUPPLIER_REFRESH_COLUMNS = (
+    'company_name', 'action_url', 'country_code', 'city', 'gold_years', 'verified_supplier',
+    'is_factory', 'review_score', 'review_count', 'company_on_time_shipping', 'factory_size_text',
+    'total_employees_text', 'transaction_count_6months', 'transaction_gmv_6months_text',
+    'gold_supplier', 'trade_assurance', 'response_time'
+) + tuple(METRIC_COLUMNS)
+
+
+def iter_json_array(path, chunk_size=1 << 20):
+    """流式读取JSON数组文件，逐个返回元素，不把整个文件读入内存"""
+    decoder = json.JSONDecoder()
+    # 元素之间的空白和逗号
+    separator = re.compile(r'[\s,]*')
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer:
+            return
+        if buffer[0] != '[':
+            raise ValueError(f"缓存文件不是JSON数组: {path}")
+        pos = 1
+        eof = False
+        while True:
+            pos = separator.match(buffer, pos).end()
+            if buffer.startswith(']', pos):
+                return
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 缓冲区中的元素不完整，丢弃已解析部分后继续读取
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield item
+
+
+def write_extraction_result(conn, company_id, licenses, license_info):
+    """写入单个供应商的执照提取结果（写线程命令）
+    
+    先删除旧的执照图片和执照信息，再写入新结果；有结果时标记为已提取。
+    """
+    write_extraction_results(conn, [(company_id, licenses, license_info)])
+
 
 class AlibabaSupplierCrawler:
     def __init__(self):
@@ -88,222 +163,42 @@ class AlibabaSupplierCrawler:
             return None
     
     async def batch_save_from_cache_file(self, cache_file, skip_duplicates=True, log_callback=None):
-        """从缓存文件批量保存到数据库（优化版本）"""
+        """从缓存文件批量保存到数据库
+        
+        流式解析缓存文件，在写线程的一个事务中 executemany 写入临时表，
+        再用一条 INSERT ... SELECT ... WHERE NOT EXISTS 合并到 suppliers。
+        skip_duplicates=False 时对已存在的供应商刷新抓取字段。返回新增数量。
+        """
         try:
             if not os.path.exists(cache_file):
                 if log_callback:
                     log_callback(f"⚠️ 缓存文件不存在: {cache_file}", "WARNING")
                 return 0
             
-            # 读取缓存数据
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                suppliers_data = json.load(f)
-            
-            if not suppliers_data:
-                if log_callback:
-                    log_callback("📭 缓存文件为空，无数据需要入库")
-                return 0
-            
             if log_callback:
-                log_callback(f"📦 开始批量入库，共 {len(suppliers_data)} 个供应商数据")
-            
-            # 性能优化：一次性加载所有已存在的company_id到内存
-            existing_company_ids = set()
-            if skip_duplicates:
-                if log_callback:
-                    log_callback("🔍 正在加载已存在的供应商ID到内存...")
-                
-                conn = sqlite3.connect(self.db_path, timeout=10.0)
-                cursor = conn.cursor()
-                cursor.execute('SELECT company_id FROM suppliers')
-                for row in cursor.fetchall():
-                    existing_company_ids.add(row[0])
-                conn.close()
-                
-                if log_callback:
-                    log_callback(f"✅ 已加载 {len(existing_company_ids)} 个已存在的供应商ID")
-            
-            # 过滤出需要保存的新供应商
-            new_suppliers = []
-            skipped_count = 0
+                log_callback(f"📦 开始批量入库: {cache_file}")
             
-            for supplier in suppliers_data:
-                if skip_duplicates and supplier['company_id'] in existing_company_ids:
-                    skipped_count += 1
-                    if log_callback and skipped_count <= 10:  # 只显示前10个重复的
-                        log_callback(f"  ✓ 跳过重复供应商: {supplier['company_name']} (ID: {supplier['company_id']})")
-                else:
-                    # 生成保存路径
-                    save_path = self.generate_save_path(supplier)
-                    supplier['save_path'] = save_path
-                    new_suppliers.append(supplier)
-                    # 更新内存中的ID集合，避免同一批次内的重复
-                    existing_company_ids.add(supplier['company_id'])
-            
-            if log_callback:
-                log_callback(f"📊 过滤完成：新增 {len(new_suppliers)} 个，跳过重复 {skipped_count} 个")
+            started = time.time()
+            rows = (self.build_supplier_row(supplier) for supplier in self._iter_cache_suppliers(cache_file))
+            read_count, saved_count, updated_count = await get_writer(self.db_path).run_async(
+                self._bulk_load_supplier_rows, rows, skip_duplicates
+            )
+            elapsed = max(time.time() - started, 1e-6)
             
-            # 批量插入新供应商
-            saved_count = 0
-            if new_suppliers:
+            if read_count == 0:
                 if log_callback:
-                    log_callback(f"💾 开始批量插入 {len(new_suppliers)} 个新供应商...")
-                
-                # 分批处理，避免长时间锁定数据库
-                batch_size = 50  # 每批50个供应商
-                total_batches = (len(new_suppliers) + batch_size - 1) // batch_size
-                
-                batch_num = 0
-                while batch_num < total_batches:
-                    start_idx = batch_num * batch_size
-                    end_idx = min(start_idx + batch_size, len(new_suppliers))
-                    batch_suppliers = new_suppliers[start_idx:end_idx]
-                    
-                    if log_callback:
-                        log_callback(f"🔄 开始处理批次 {batch_num + 1}/{total_batches}，包含 {len(batch_suppliers)} 个供应商")
-                    
-                    # 每批使用独立的数据库连接和事务
-                    conn = None
-                    retry_count = 0
-                    max_retries = 3
-                    batch_success = False
-                    
-                    while retry_count < max_retries and not batch_success:
-                        try:
-                            if retry_count > 0 and log_callback:
-                                log_callback(f"🔄 批次 {batch_num + 1} 第 {retry_count + 1} 次尝试")
-                            
-                            if log_callback:
-                                log_callback(f"🔗 正在连接数据库...")
-                            
-                            conn = sqlite3.connect(self.db_path, timeout=60.0)  # 增加超时时间
-                            conn.execute('PRAGMA journal_mode=DELETE')  # 改为DELETE模式避免WAL锁定
-                            conn.execute('PRAGMA synchronous=OFF')  # 关闭同步以提高性能
-                            conn.execute('PRAGMA busy_timeout=60000')  # 60秒超时
-                            conn.execute('PRAGMA cache_size=10000')  # 增加缓存
-                            cursor = conn.cursor()
-                            
-                            if log_callback:
-                                log_callback(f"✅ 数据库连接成功，开始事务")
-                            
-                            # 使用普通事务而不是IMMEDIATE，减少锁定
-                            conn.execute('BEGIN')
-                            
-                            if log_callback:
-                                log_callback(f"📝 开始插入批次 {batch_num + 1} 的 {len(batch_suppliers)} 个供应商")
-                            
-                            batch_saved = 0
-                            for i, supplier in enumerate(batch_suppliers):
-                                try:
-                                    cursor.execute('''
-                                        INSERT INTO suppliers (company_id, company_name, action_url, country_code, 
-                                                           city, gold_years, verified_supplier, is_factory, 
-                                                           review_score, review_count, company_on_time_shipping,
-                                                           factory_size_text, total_employees_text, transaction_count_6months,
-                                                           transaction_gmv_6months_text, gold_supplier, trade_assurance, response_time,
-                                                           category_id, category_name, save_path)
-                                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                                    ''', (
-                                        supplier['company_id'],
-                                        supplier['company_name'],
-                                        supplier['action_url'],
-                                        supplier['country_code'],
-                                        supplier['city'],
-                                        supplier['gold_years'],
-                                        supplier['verified_supplier'],
-                                        supplier['is_factory'],
-                                        supplier['review_score'],
-                                        supplier['review_count'],
-                                        supplier.get('company_on_time_shipping', ''),
-                                        supplier.get('factory_size_text', ''),
-                                        supplier.get('total_employees_text', ''),
-                                        supplier.get('transaction_count_6months', ''),
-                                        supplier.get('transaction_gmv_6months_text', ''),
-                                        supplier.get('gold_supplier', False),
-                                        supplier.get('trade_assurance', False),
-                                        supplier.get('response_time', ''),
-                                        supplier.get('category_id', ''),
-                                        supplier.get('category_name', ''),
-                                        supplier['save_path']
-                                    ))
-                                    batch_saved += 1
-                                    saved_count += 1
-                                    
-                                    # 每10个显示一次进度
-                                    if (i + 1) % 10 == 0 and log_callback:
-                                        log_callback(f"  📊 批次 {batch_num + 1} 进度: {i + 1}/{len(batch_suppliers)} 已插入")
-                                
-                                except Exception as e:
-                                    if log_callback:
-                                        log_callback(f"⚠️ 插入供应商失败 {supplier.get('company_name', 'Unknown')}: {str(e)}", "WARNING")
-                                    continue
-                            
-                            # 提交当前批次
-                            conn.commit()
-                            batch_success = True
-                            
-                            if log_callback:
-                                log_callback(f"✅ 批次 {batch_num + 1}/{total_batches} 成功完成: 保存 {batch_saved} 个供应商")
-                            
-                            # 短暂休息，让其他操作有机会访问数据库
-                            await asyncio.sleep(0.1)
-                            
-                        except sqlite3.OperationalError as e:
-                            if conn:
-                                try:
-                                    conn.rollback()
-                                    if log_callback:
-                                        log_callback(f"🔄 批次 {batch_num + 1} 事务已回滚")
-                                except Exception as rollback_e:
-                                    if log_callback:
-                                        log_callback(f"⚠️ 回滚失败: {str(rollback_e)}", "WARNING")
-                            
-                            if "database is locked" in str(e):
-                                retry_count += 1
-                                if log_callback:
-                                    log_callback(f"⚠️ 数据库锁定，批次 {batch_num + 1} 第 {retry_count} 次重试 (最多 {max_retries} 次)", "WARNING")
-                                if retry_count < max_retries:
-                                    await asyncio.sleep(retry_count * 2.0)  # 递增延迟
-                                else:
-                                    if log_callback:
-                                        log_callback(f"❌ 批次 {batch_num + 1} 重试次数已达上限，跳过该批次", "ERROR")
-                            else:
-                                if log_callback:
-                                    log_callback(f"❌ 批次 {batch_num + 1} 数据库操作错误: {str(e)}", "ERROR")
-                                break  # 非锁定错误，跳出重试循环
-                        except Exception as e:
-                            if conn:
-                                try:
-                                    conn.rollback()
-                                    if log_callback:
-                                        log_callback(f"🔄 批次 {batch_num + 1} 事务已回滚")
-                                except Exception as rollback_e:
-                                    if log_callback:
-                                        log_callback(f"⚠️ 回滚失败: {str(rollback_e)}", "WARNING")
-                            
-                            if log_callback:
-                                log_callback(f"❌ 批次 {batch_num + 1} 未知错误: {str(e)}", "ERROR")
-                            break  # 其他错误，跳出重试循环
-                        finally:
-                            if conn:
-                                try:
-                                    conn.close()
-                                except Exception as close_e:
-                                    if log_callback:
-                                        log_callback(f"⚠️ 关闭数据库连接失败: {str(close_e)}", "WARNING")
-                    
-                    if not batch_success:
-                        if log_callback:
-                            log_callback(f"❌ 批次 {batch_num + 1} 最终失败，已跳过该批次", "ERROR")
-                    
-                    batch_num += 1
+                    log_callback("📭 缓存文件为空，无数据需要入库")
+                return 0
             
             # 入库完成后清空缓存文件
             with open(cache_file, 'w', encoding='utf-8') as f:
                 json.dump([], f)
             
             if log_callback:
-                log_callback(f"✅ 批量入库完成！新增: {saved_count} 个，跳过重复: {skipped_count} 个", "SUCCESS")
+                skipped_count = read_count - saved_count - updated_count
+                log_callback(f"✅ 批量入库完成！读取: {read_count} 个，新增: {saved_count} 个，"
+                             f"更新: {updated_count} 个，跳过重复: {skipped_count} 个，"
+                             f"耗时 {elapsed:.2f} 秒 ({read_count / elapsed:.0f} 条/秒)", "SUCCESS")
             
             return saved_count
             
@@ -314,177 +209,66 @@ class AlibabaSupplierCrawler:
             else:
                 print(error_msg)
             return 0
-        
+    
+    def _iter_cache_suppliers(self, cache_file):
+        """逐个读取缓存文件中有company_id的供应商，并补上保存路径"""
+        for supplier in iter_json_array(cache_file):
+            if not supplier.get('company_id'):
+                continue
+            supplier['save_path'] = self.generate_save_path(supplier)
+            yield supplier
+    
+    @staticmethod
+    def _bulk_load_supplier_rows(conn, rows, skip_duplicates):
+        """写线程命令：供应商行经临时表合并到suppliers，返回 (读取数量, 新增数量, 更新数量)"""
+        columns_sql = ', '.join(SUPPLIER_INSERT_COLUMNS)
+        placeholders = ', '.join(['?'] * len(SUPPLIER_INSERT_COLUMNS))
+        
+        # 临时表只存在于写线程的连接上；同一文件内重复的company_id保留第一条
+        conn.execute(f'CREATE TEMP TABLE IF NOT EXISTS supplier_staging ({columns_sql}, UNIQUE (company_id))')
+        conn.execute('DELETE FROM temp.supplier_staging')
+        try:
+            read_count = 0
+            
+            def counted(source):
+                nonlocal read_count
+                for row in source:
+                    read_count += 1
+                    yield row
+            
+            conn.executemany(f'INSERT OR IGNORE INTO temp.supplier_staging ({columns_sql}) VALUES ({placeholders})', counted(rows))
+            
+            updated_count = 0
+            if not skip_duplicates:
+                update_sql = ', '.join(f'{column} = st.{column}' for column in SUPPLIER_REFRESH_COLUMNS)
+                updated_count = conn.execute(f'''
+                    UPDATE suppliers SET {update_sql}
+                    FROM temp.supplier_staging AS st
+                    WHERE suppliers.company_id = st.company_id
+                ''').rowcount
+            
+            saved_count = conn.execute(f'''
+                INSERT INTO suppliers ({columns_sql})
+                SELECT {columns_sql} FROM temp.supplier_staging AS st
+                WHERE NOT EXISTS (SELECT 1 FROM suppliers s WHERE s.company_id = st.company_id)
+                ORDER BY st.rowid
+            ''').rowcount
+            return read_count, saved_count, updated_count
+        finally:
+            conn.execute('DELETE FROM temp.supplier_staging')
+    
     def change_database_path(self, new_db_path):
         """更改数据库路径并重新初始化"""
         self.db_path = new_db_path
         self.init_database()
         
     def init_database(self):
-        """初始化数据库"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 创建供应商表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS suppliers (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                company_id TEXT,
-                company_name TEXT,
-                action_url TEXT,
-                country_code TEXT,
-                city TEXT,
-                gold_years TEXT,
-                verified_supplier BOOLEAN,
-                is_factory BOOLEAN,
-                review_score TEXT,
-                review_count INTEGER,
-                company_on_time_shipping TEXT,
-                factory_size_text TEXT,
-                total_employees_text TEXT,
-                transaction_count_6months TEXT,
-                transaction_gmv_6months_text TEXT,
-                gold_supplier BOOLEAN,
-                trade_assurance BOOLEAN,
-                response_time TEXT,
-                category_id TEXT,
-                category_name TEXT,
-                save_path TEXT,
-                license_extracted BOOLEAN DEFAULT FALSE,
-                is_used BOOLEAN DEFAULT FALSE,
-                extraction_failed_count INTEGER DEFAULT 0,
-                skip_extraction BOOLEAN DEFAULT FALSE,
-                last_extraction_attempt TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 创建执照图片表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS licenses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                supplier_id INTEGER,
-                license_name TEXT,
-                license_url TEXT,
-                file_id TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (supplier_id) REFERENCES suppliers (id)
-            )
-        ''')
-        
-        # 创建执照信息表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS license_info (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                supplier_id INTEGER,
-                registration_no TEXT,
-                company_name TEXT,
-                date_of_issue TEXT,
-                date_of_expiry TEXT,
-                registered_capital TEXT,
-                country_territory TEXT,
-                registered_address TEXT,
-                year_established TEXT,
-                legal_form TEXT,
-                legal_representative TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (supplier_id) REFERENCES suppliers (id)
-            )
-        ''')
-        
-        # 创建公司注册信息表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS company_registration (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                profile_id VARCHAR(100) NOT NULL,
-                supplier_id VARCHAR(100) NOT NULL,
-                registration_number VARCHAR(50) NOT NULL,
-                company_name VARCHAR(200) NOT NULL,
-                registered_address TEXT,
-                province VARCHAR(50),
-                city VARCHAR(50),
-                district VARCHAR(50),
-                zip_code VARCHAR(10),
-                address_parsed BOOLEAN DEFAULT FALSE,
-                license_url TEXT,
-                legal_representative VARCHAR(100),
-                issue_date DATE,
-                expiration_date DATE,
-                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(supplier_id, registration_number)
-            )
-        ''')
-        
-        # 为company_registration表创建索引
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_supplier_id ON company_registration(supplier_id)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_registration_number ON company_registration(registration_number)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_company_name ON company_registration(company_name)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_province_city ON company_registration(province, city)')
-        
-        # 创建触发器，自动更新updated_at字段
-        cursor.execute('''
-            CREATE TRIGGER IF NOT EXISTS update_company_registration_timestamp 
-                AFTER UPDATE ON company_registration
-                FOR EACH ROW
-            BEGIN
-                UPDATE company_registration 
-                SET updated_at = CURRENT_TIMESTAMP 
-                WHERE id = NEW.id;
-            END
-        ''')
-        
-        # 创建代理配置表
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS proxies (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                host TEXT NOT NULL,
-                port INTEGER NOT NULL,
-                username TEXT,
-                password TEXT,
-                is_active BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # 插入默认代理配置（如果表为空）
-        cursor.execute('SELECT COUNT(*) FROM proxies')
-        if cursor.fetchone()[0] == 0:
-            cursor.execute('''
-                INSERT INTO proxies (name, host, port, username, password, is_active)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', ('默认代理', '127.0.0.1', 7890, 't15395136610470', 'Aa123456', True))
-        
-        # 检查并添加is_used字段（兼容现有数据库）
-        cursor.execute("PRAGMA table_info(suppliers)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'is_used' not in columns:
-            cursor.execute('ALTER TABLE suppliers ADD COLUMN is_used BOOLEAN DEFAULT FALSE')
-            print("已添加is_used字段到suppliers表")
-        
-        # 检查并添加ocr_recognition_status字段（兼容现有数据库）
-        if 'ocr_recognition_status' not in columns:
-            cursor.execute('ALTER TABLE suppliers ADD COLUMN ocr_recognition_status TEXT DEFAULT "pending"')
-            print("已添加ocr_recognition_status字段到suppliers表")
-            # 创建索引以提高查询效率
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_ocr_recognition_status ON suppliers(ocr_recognition_status)')
-            print("已为ocr_recognition_status字段创建索引")
-        
-        # 检查并添加address_parsed字段到company_registration表
-        cursor.execute("PRAGMA table_info(company_registration)")
-        registration_columns = [column[1] for column in cursor.fetchall()]
-        if registration_columns and 'address_parsed' not in registration_columns:
-            cursor.execute('ALTER TABLE company_registration ADD COLUMN address_parsed BOOLEAN DEFAULT FALSE')
-            print("已添加address_parsed字段到company_registration表")
-        
-        # 检查并添加license_url字段到company_registration表
-        if registration_columns and 'license_url' not in registration_columns:
-            cursor.execute('ALTER TABLE company_registration ADD COLUMN license_url TEXT')
-            print("已添加license_url字段到company_registration表")
-        
-        conn.commit()
-        conn.close()
+        """初始化数据库（执行尚未执行的版本化迁移）"""
+        conn = connect(self.db_path, isolation_level=None)
+        try:
+            run_migrations(conn)
+        finally:
+            conn.close()
         print("数据库初始化完成")
     
     def load_categories(self):
@@ -610,11 +394,34 @@ class AlibabaSupplierCrawler:
             print(f"代理解析失败: {e}")
             return None
     
-    async def fetch_with_proxy(self, url, proxy=None, session=None, is_html=False, check_ip=True, max_retries=3, log_callback=None):
-        """使用代理获取数据（带重试机制）"""
+    def build_proxy_url(self, proxy):
+        """把代理字典转换为 aiohttp 使用的代理URL，无代理时返回 None"""
+        if not proxy:
+            return None
+        return f"http://{proxy['username']}:{proxy['password']}@{proxy['host']}:{proxy['port']}"
+    
+    async def fetch_with_proxy(self, url, proxy=None, session=None, is_html=False, check_ip=True, max_retries=3, log_callback=None, pacer=None,
+                               cache_mode=None):
+        """使用代理获取数据（带重试机制）
+        
+        每次请求前从主机节奏控制器领取令牌，响应状态和耗时反馈给它调整速率；
+        未传入 pacer 时使用全局共享的 get_host_pacer()。
+        成功的接口响应写入磁盘缓存（get_response_cache），读取时按 response_cache_api_ttl 判断过期；
+        HTML页面不在这里写入，由调用方解析出执照信息后调用 cache_supplier_page。
+        cache_mode 为 use/refresh/bypass，未指定时使用缓存配置的模式；命中缓存时不发请求。
+        """
+        cache = get_response_cache()
+        ttl = None if is_html else load_crawler_config()['response_cache_api_ttl']
+        cached = await cache.get_async(url, ttl=ttl, mode=cache_mode)
+        if cached is not None:
+            try:
+                return cached.decode('utf-8') if is_html else json.loads(cached)
+            except ValueError as e:
+                self.log(f"缓存内容无法解析，重新请求: {e}", "WARNING", log_callback)
+        
         # 检查IP变化（可选）
         if check_ip:
-            await self.check_ip_change(proxy)
+            self.check_ip_change(proxy)
         
         if is_html:
             # HTML页面的请求头 - 使用随机移动端UA
@@ -774,109 +581,65 @@ class AlibabaSupplierCrawler:
                 'Sec-Fetch-Site': 'same-site'
             }
         
+        # 未传入session时使用当前事件循环的共享会话，协程内不做任何同步请求
+        session = session or get_http_client().session()
+        pacer = pacer or get_host_pacer()
+        proxy_url = self.build_proxy_url(proxy)
+        
         # 重试机制
         for attempt in range(max_retries):
+            retry_after = None
+            await pacer.wait(url)
+            started = time.monotonic()
             try:
-                if session:
-                    # 使用aiohttp异步请求
-                    if proxy:
-                        # 使用HTTP代理格式
-                        proxy_url = f"http://{proxy['username']}:{proxy['password']}@{proxy['host']}:{proxy['port']}"
-                        async with session.get(url, headers=headers, proxy=proxy_url) as response:
-                            if response.status == 200:
-                                if is_html:
-                                    return await response.text()
-                                else:
-                                    return await response.json()
-                            else:
-                                self.log(f"请求失败，状态码: {response.status} (尝试 {attempt + 1}/{max_retries})", "ERROR", log_callback)
-                    else:
-                        async with session.get(url, headers=headers) as response:
-                            if response.status == 200:
-                                if is_html:
-                                    return await response.text()
-                                else:
-                                    return await response.json()
-                            else:
-                                self.log(f"请求失败，状态码: {response.status} (尝试 {attempt + 1}/{max_retries})", "ERROR", log_callback)
-                else:
-                    # 使用requests同步请求
-                    proxies = None
-                    if proxy:
-                        # 使用HTTP代理格式
-                        proxies = {
-                            'http': f"http://{proxy['username']}:{proxy['password']}@{proxy['host']}:{proxy['port']}",
-                            'https': f"http://{proxy['username']}:{proxy['password']}@{proxy['host']}:{proxy['port']}"
-                        }
-                    response = requests.get(url, headers=headers, proxies=proxies, timeout=30)
-                    if response.status_code == 200:
+                async with session.get(url, headers=headers, proxy=proxy_url) as response:
+                    if response.status == 200:
                         if is_html:
-                            return response.text
+                            result = await response.text()
                         else:
-                            return response.json()
+                            result = await response.json()
+                            body = await response.read()
+                        pacer.record(url, response.status, time.monotonic() - started)
+                        if not is_html and self.is_cacheable_response(result):
+                            await cache.put_async(url, body, mode=cache_mode)
+                        return result
                     else:
-                        self.log(f"请求失败，状态码: {response.status_code} (尝试 {attempt + 1}/{max_retries})", "ERROR", log_callback)
-                
-                # 如果不是最后一次尝试，等待后重试
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 2  # 递增等待时间：2秒、4秒、6秒
-                    self.log(f"等待 {wait_time} 秒后重试...", "INFO", log_callback)
-                    await asyncio.sleep(wait_time)
+                        retry_after = response.headers.get('Retry-After')
+                        pacer.record(url, response.status, time.monotonic() - started, retry_after=retry_after)
+                        self.log(f"请求失败，状态码: {response.status} (尝试 {attempt + 1}/{max_retries})", "ERROR", log_callback)
                     
             except Exception as e:
+                pacer.record(url, latency=time.monotonic() - started, error=True)
                 self.log(f"请求出错 (尝试 {attempt + 1}/{max_retries}): {e}", "ERROR", log_callback)
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 2
-                    self.log(f"等待 {wait_time} 秒后重试...", "INFO", log_callback)
-                    await asyncio.sleep(wait_time)
+            
+            # 如果不是最后一次尝试，按退避时间等待后重试
+            if attempt < max_retries - 1:
+                wait_time = pacer.retry_delay(attempt, retry_after)
+                self.log(f"等待 {wait_time} 秒后重试...", "INFO", log_callback)
+                await asyncio.sleep(wait_time)
         
         self.log(f"请求失败，已达到最大重试次数 ({max_retries})", "ERROR", log_callback)
         return None
     
-    async def check_ip_change(self, proxy=None):
-        """检查IP变化"""
+    @staticmethod
+    def is_cacheable_response(result):
+        """接口返回业务错误（success 为 false 或 code 不是 200）时不写入缓存"""
+        if isinstance(result, dict):
+            if result.get('success') is False:
+                return False
+            if 'code' in result and result.get('code') != 200:
+                return False
+        return bool(result)
+    
+    def check_ip_change(self, proxy=None):
+        """读取后台检测的出口IP（需在事件循环中调用，不发请求；IP变化由后台检测任务输出）"""
         if not proxy:
-            return
-        
-        # 重试机制
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # 获取当前IP（使用最快的icanhazip.com）
-                ip_check_url = "https://icanhazip.com"
-                proxies = None
-                if proxy:
-                    # 使用HTTP代理格式
-                    proxies = {
-                        'http': f"http://{proxy['username']}:{proxy['password']}@{proxy['host']}:{proxy['port']}",
-                        'https': f"http://{proxy['username']}:{proxy['password']}@{proxy['host']}:{proxy['port']}"
-                    }
-                
-                response = requests.get(ip_check_url, proxies=proxies, timeout=10)
-                if response.status_code == 200:
-                    current_ip = response.text.strip()  # 直接获取IP文本
-                    print(f"当前IP: {current_ip}")
-                    
-                    # 检查IP是否变化
-                    if hasattr(self, 'last_ip'):
-                        if current_ip != self.last_ip:
-                            print(f"IP已变化: {self.last_ip} -> {current_ip}")
-                        else:
-                            print(f"IP未变化: {current_ip}")
-                    else:
-                        print(f"首次获取IP: {current_ip}")
-                    
-                    self.last_ip = current_ip
-                    return  # 成功获取IP，退出重试
-                else:
-                    print(f"IP检查失败，状态码: {response.status_code}")
-                    
-            except Exception as e:
-                print(f"检查IP变化时出错 (尝试 {attempt + 1}/{max_retries}): {e}")
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(2)  # 等待2秒后重试
+            return None
         
-        print("IP检查失败，已达到最大重试次数")
+        current_ip = get_ip_monitor(self.build_proxy_url(proxy)).get_ip()
+        if current_ip:
+            self.last_ip = current_ip
+        return current_ip
     
     def build_search_url(self, keyword, page=1):
         """构建搜索URL"""
@@ -912,16 +675,23 @@ class AlibabaSupplierCrawler:
         """爬取供应商数据（兼容旧版本）"""
         return await self.crawl_suppliers_range(keyword, 1, pages, proxy, extract_licenses)
     
-    async def crawl_suppliers_range(self, keyword, start_page=1, end_page=1, proxy=None, extract_licenses=False, skip_duplicates=True, log_callback=None, save_to_file=False, cache_file=None):
-        """爬取指定页面范围的供应商数据"""
+    async def crawl_suppliers_range(self, keyword, start_page=1, end_page=1, proxy=None, extract_licenses=False, skip_duplicates=True, log_callback=None, save_to_file=False, cache_file=None, max_in_flight=None,
+                                    session=None, pacer=None, request_semaphore=None, page_callback=None, incremental=False,
+                                    frontier=None, raise_errors=False):
+        """爬取指定页面范围的供应商数据（多个页面并发请求，按完成顺序入库）
+        
+        批量爬取时由调度器传入共享的 session 和 request_semaphore（全局并发上限），
+        每处理完一页调用 page_callback(page, 供应商数量)；未传入 pacer 时请求节奏由全局 get_host_pacer() 控制。
+        incremental=True 时连续 incremental_stop_pages 页都是该关键词以前见过的供应商就停止翻页。
+        传入 frontier（CrawlFrontier）时跳过上次已完成的页面，每页请求前领取、处理后标记完成或失败。
+        raise_errors=True 时出错（或请求的页面全部失败）向上抛出异常，不返回空列表（调度器据此统计失败的关键词）。
+        """
         try:
             all_suppliers = []
             total_saved = 0
             total_skipped = 0
-            
-            # 创建异步会话
-            connector = aiohttp.TCPConnector(limit=10)
-            timeout = aiohttp.ClientTimeout(total=30)
+            pages_ok = 0
+            pages_failed = 0
             
             # 日志输出函数
             def log(message, level="INFO"):
@@ -935,75 +705,111 @@ class AlibabaSupplierCrawler:
                 log(f"📁 数据将保存到文件: {cache_file}")
             log("=" * 60)
             
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                for page in range(start_page, end_page + 1):
-                    log(f"📄 正在爬取第 {page} 页 ({page}/{end_page})...")
-                    
+            crawler_config = load_crawler_config()
+            
+            # 未传入session时使用全局共享会话（不在这里关闭）
+            session = session or get_http_client().session()
+            # 第一页响应后按结果总数收缩范围，遇到空页后不再请求后续页面
+            page_range = PageRange(start_page, end_page, frontier.finished_pages(keyword) if frontier else None)
+            if page_range.skip:
+                log(f"⏭️ 继续上次未完成的爬取，跳过已完成的 {len(page_range.skip)} 页")
+            page_count_recorded = False
+            known_pages = self.create_known_page_tracker('keyword', keyword, log) if incremental else None
+            
+            async def fetch_page(page):
+                async with request_semaphore or contextlib.nullcontext():
+                    if page > page_range.last_page:
+                        return None
+                    if frontier is not None and not await frontier.claim(keyword, page):
+                        # 已停止：不再请求后续页面，未完成的页面下次继续
+                        page_range.stop_before(page)
+                        return None
                     # 构建搜索URL
                     search_url = self.build_search_url(keyword, page)
+                    log(f"📄 正在爬取第 {page} 页 ({page}/{page_range.last_page})...")
                     log(f"🔗 请求URL: {search_url}")
                     
-                    try:
-                        # 使用代理请求
-                        data = await self.fetch_with_proxy(search_url, proxy, session, log_callback=log_callback)
+                    # 使用代理请求
+                    return await self.fetch_with_proxy(search_url, proxy, session, log_callback=log_callback, pacer=pacer)
+            
+            async for page, data, error in fetch_pages(page_range, fetch_page, max_in_flight or crawler_config['page_concurrency']):
+                if page > page_range.last_page:
+                    # 范围收缩前已经发出的页面，超出真实页数的结果不再处理
+                    continue
+                page_supplier_count = 0
+                page_error = None
+                try:
+                    if error is not None:
+                        raise error
+                    
+                    if data and data.get('success') and 'model' in data and 'offers' in data['model']:
+                        suppliers = self.extract_suppliers_from_api(data['model']['offers'])
+                        page_supplier_count = len(suppliers)
+                        log(f"📦 第 {page} 页获取到 {len(suppliers)} 个供应商")
                         
-                        if data.get('success') and 'model' in data and 'offers' in data['model']:
-                            suppliers = self.extract_suppliers_from_api(data['model']['offers'])
-                            log(f"📦 第 {page} 页获取到 {len(suppliers)} 个供应商")
+                        if suppliers:
+                            # 为每个供应商添加关键词信息
+                            for supplier in suppliers:
+                                supplier['keyword'] = keyword
+                                supplier['crawl_time'] = datetime.now().isoformat()
                             
-                            if suppliers:
-                                # 为每个供应商添加关键词信息
-                                for supplier in suppliers:
-                                    supplier['keyword'] = keyword
-                                    supplier['crawl_time'] = datetime.now().isoformat()
-                                
-                                if save_to_file:
-                                    # 保存到文件
-                                    await self.save_suppliers_to_cache_file(suppliers, cache_file, log_callback=log)
-                                    log(f"📁 第 {page} 页数据已保存到缓存文件")
-                                else:
-                                    # 实时保存到数据库
-                                    log(f"💾 开始保存第 {page} 页的供应商数据...")
-                                    page_saved = 0
-                                    page_skipped = 0
-                                    
-                                    for i, supplier in enumerate(suppliers, 1):
-                                        result = await self.save_single_supplier(supplier, skip_duplicates)
-                                        if result:
-                                            page_saved += 1
-                                            total_saved += 1
-                                        else:
-                                            page_skipped += 1
-                                            total_skipped += 1
-                                        
-                                        # 显示进度
-                                        log(f"  📊 进度: {i}/{len(suppliers)} - 新增: {page_saved}, 重复: {page_skipped}")
-                                    
-                                    log(f"✅ 第 {page} 页保存完成: 新增 {page_saved} 个，跳过 {page_skipped} 个重复", "SUCCESS")
+                            if save_to_file:
+                                # 保存到文件
+                                await self.save_suppliers_to_cache_file(suppliers, cache_file, log_callback=log)
+                                log(f"📁 第 {page} 页数据已保存到缓存文件")
+                            else:
+                                # 实时保存到数据库（整页单事务入库）
+                                log(f"💾 开始保存第 {page} 页的供应商数据...")
+                                page_saved, page_skipped = await self.save_suppliers_page(suppliers, skip_duplicates)
+                                total_saved += page_saved
+                                total_skipped += page_skipped
                                 
-                                all_suppliers.extend(suppliers)
-                            
-                            # 打印API响应的分页信息（简化版）
-                            if 'model' in data and 'pagination' in data['model']:
-                                pagination = data['model']['pagination']
-                                if 'totalCount' in pagination:
-                                    log(f"📈 总供应商数: {pagination.get('totalCount', 'N/A')}")
+                                log(f"✅ 第 {page} 页保存完成: 新增 {page_saved} 个，跳过 {page_skipped} 个重复", "SUCCESS")
                             
+                            all_suppliers.extend(suppliers)
+                            await self.record_seen_page('keyword', keyword, page, suppliers, page_range, known_pages, log)
                         else:
-                            log(f"❌ 第 {page} 页API返回错误", "ERROR")
-                            if data:
-                                log(f"   错误详情: {data.get('message', '未知错误')}", "ERROR")
-                    
-                    except Exception as e:
-                        log(f"❌ 爬取第 {page} 页时出错: {e}", "ERROR")
-                        continue
-                    
-                    # 页面间延迟
-                    if page < end_page:
-                        delay = random.uniform(0, 0)
-                        log(f"⏱️  等待 {delay:.1f} 秒后继续下一页...")
-                        await asyncio.sleep(delay)
+                            page_range.stop_before(page)
+                            log(f"📭 第 {page} 页没有供应商，不再请求后续页面")
+                        
+                        # 按分页信息中的总数收缩页面范围，并记录页数供后续爬取规划
+                        totals = parse_pagination(data['model'].get('pagination'))
+                        if totals and not page_count_recorded:
+                            page_count_recorded = True
+                            total_count, page_size = totals
+                            page_count = page_count_from_total(total_count, page_size)
+                            log(f"📈 总供应商数: {total_count}，共 {page_count} 页")
+                            if page_range.clamp(page_count):
+                                log(f"📉 页面范围调整为: {start_page}-{page_range.last_page}")
+                            await record_page_count(self.db_path, 'keyword', keyword, total_count, page_size)
+                        
+                    else:
+                        page_error = data.get('message', '未知错误') if data else '无响应'
+                        log(f"❌ 第 {page} 页API返回错误", "ERROR")
+                        if data:
+                            log(f"   错误详情: {data.get('message', '未知错误')}", "ERROR")
+                
+                except Exception as e:
+                    page_error = e
+                    log(f"❌ 爬取第 {page} 页时出错: {e}", "ERROR")
+                finally:
+                    if page_error is None:
+                        pages_ok += 1
+                    else:
+                        pages_failed += 1
+                    if frontier is not None:
+                        await self.finish_frontier_unit(frontier, keyword, page, page_error)
+                    if page_callback:
+                        page_callback(page, page_supplier_count)
+            
+            if frontier is not None:
+                await frontier.finish(keyword, page_range.last_page)
+                if frontier.stopped:
+                    log("⏸️ 爬取已停止，未完成的页面下次启动同样的任务时继续", "WARNING")
             
+            if raise_errors and pages_failed and not pages_ok:
+                raise RuntimeError(f"请求的 {pages_failed} 页全部失败")
+        
             # Excel文件更新已移除
             
             # 总结
@@ -1014,20 +820,23 @@ class AlibabaSupplierCrawler:
             # 如果需要提取执照图片
             if extract_licenses and all_suppliers:
                 log("🔍 开始提取供应商执照图片...")
-                # 创建新的session用于获取HTML页面
-                connector = aiohttp.TCPConnector(limit=10)
-                timeout = aiohttp.ClientTimeout(total=30)
-                async with aiohttp.ClientSession(connector=connector, timeout=timeout) as html_session:
-                    await self.extract_all_licenses(all_suppliers, proxy, html_session, log_callback)
+                await self.extract_all_licenses(all_suppliers, proxy, session, log_callback)
             
             return all_suppliers
             
         except Exception as e:
             log(f"❌ 爬取过程中出错: {e}", "ERROR")
+            if raise_errors:
+                raise
             return []
     
-    async def crawl_suppliers_by_category(self, category_id, start_page=1, end_page=1, proxy=None, extract_licenses=False, skip_duplicates=True, save_path=None, log_callback=None):
-        """按分类爬取供应商"""
+    async def crawl_suppliers_by_category(self, category_id, start_page=1, end_page=1, proxy=None, extract_licenses=False, skip_duplicates=True, save_path=None, log_callback=None, max_in_flight=None, incremental=False,
+                                          frontier=None):
+        """按分类爬取供应商（多个页面并发请求，按完成顺序入库）
+        
+        incremental=True 时连续 incremental_stop_pages 页都是该分类以前见过的供应商就停止翻页。
+        传入 frontier（CrawlFrontier）时跳过上次已完成的页面，每页请求前领取、处理后标记完成或失败。
+        """
         # 日志输出函数
         def log(message, level="INFO"):
             if log_callback:
@@ -1047,74 +856,92 @@ class AlibabaSupplierCrawler:
         log(f"🚀 开始爬取分类: {category_name} (ID: {category_id})，页面范围: {start_page}-{end_page}")
         log("=" * 60)
         
-        # 为每个供应商添加分类信息
-        connector = aiohttp.TCPConnector(limit=10)
-        timeout = aiohttp.ClientTimeout(total=30)
-        
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            for page in range(start_page, end_page + 1):
-                log(f"📄 正在爬取第 {page} 页 ({page}/{end_page})...")
-                
-                # 构建搜索URL
-                search_url = self.build_category_search_url(category_id, page)
-                log(f"🔗 请求URL: {search_url}")
+        crawler_config = load_crawler_config()
+        session = get_http_client().session()
+        # 第一页响应后按结果总数收缩范围，遇到空页后不再请求后续页面
+        page_range = PageRange(start_page, end_page, frontier.finished_pages(category_id) if frontier else None)
+        if page_range.skip:
+            log(f"⏭️ 继续上次未完成的爬取，跳过已完成的 {len(page_range.skip)} 页")
+        page_count_recorded = False
+        known_pages = self.create_known_page_tracker('category', category_id, log) if incremental else None
+        
+        async def fetch_page(page):
+            if page > page_range.last_page:
+                return None
+            if frontier is not None and not await frontier.claim(category_id, page):
+                # 已停止：不再请求后续页面，未完成的页面下次继续
+                page_range.stop_before(page)
+                return None
+            # 构建搜索URL
+            search_url = self.build_category_search_url(category_id, page)
+            log(f"📄 正在爬取第 {page} 页 ({page}/{page_range.last_page})...")
+            log(f"🔗 请求URL: {search_url}")
+            
+            # 请求数据
+            return await self.fetch_with_proxy(search_url, proxy, session, log_callback=log_callback)
+        
+        async for page, data, error in fetch_pages(page_range, fetch_page, max_in_flight or crawler_config['page_concurrency']):
+            if page > page_range.last_page:
+                # 范围收缩前已经发出的页面，超出真实页数的结果不再处理
+                continue
+            page_error = None
+            try:
+                if error is not None:
+                    raise error
                 
-                try:
-                    # 请求数据
-                    data = await self.fetch_with_proxy(search_url, proxy, session, log_callback=log_callback)
+                if data and data.get('code') == 200 and 'data' in data and 'list' in data['data']:
+                    suppliers = self.extract_suppliers_from_category_api(data['data']['list'])
+                    log(f"📦 第 {page} 页获取到 {len(suppliers)} 个供应商")
                     
-                    if data and data.get('code') == 200 and 'data' in data and 'list' in data['data']:
-                        suppliers = self.extract_suppliers_from_category_api(data['data']['list'])
-                        log(f"📦 第 {page} 页获取到 {len(suppliers)} 个供应商")
-                        
-                        # 为每个供应商添加分类信息
-                        for supplier in suppliers:
-                            supplier['category_id'] = category_id
-                            supplier['category_name'] = category_name
-                            supplier['save_path'] = save_path
-                        
-                        # 实时保存每个供应商
-                        if suppliers:
-                            log(f"💾 开始保存第 {page} 页的供应商数据...")
-                            page_saved = 0
-                            page_skipped = 0
-                            
-                            for i, supplier in enumerate(suppliers, 1):
-                                result = await self.save_single_supplier(supplier, skip_duplicates)
-                                if result:
-                                    page_saved += 1
-                                    total_saved += 1
-                                else:
-                                    page_skipped += 1
-                                    total_skipped += 1
-                                
-                                # 显示进度
-                                log(f"  📊 进度: {i}/{len(suppliers)} - 新增: {page_saved}, 重复: {page_skipped}")
-                            
-                            log(f"✅ 第 {page} 页保存完成: 新增 {page_saved} 个，跳过 {page_skipped} 个重复", "SUCCESS")
-                            all_suppliers.extend(suppliers)
-                        
-                        # 打印分页信息（简化版）
-                        if 'page' in data['data']:
-                            page_info = data['data']['page']
-                            if 'totalCount' in page_info:
-                                log(f"📈 总供应商数: {page_info.get('totalCount', 'N/A')}")
+                    # 为每个供应商添加分类信息
+                    for supplier in suppliers:
+                        supplier['category_id'] = category_id
+                        supplier['category_name'] = category_name
+                        supplier['save_path'] = save_path
+                    
+                    # 实时保存每个供应商
+                    if suppliers:
+                        log(f"💾 开始保存第 {page} 页的供应商数据...")
+                        page_saved, page_skipped = await self.save_suppliers_page(suppliers, skip_duplicates)
+                        total_saved += page_saved
+                        total_skipped += page_skipped
                         
+                        log(f"✅ 第 {page} 页保存完成: 新增 {page_saved} 个，跳过 {page_skipped} 个重复", "SUCCESS")
+                        all_suppliers.extend(suppliers)
+                        await self.record_seen_page('category', category_id, page, suppliers, page_range, known_pages, log)
                     else:
-                        log(f"❌ 第 {page} 页API返回错误", "ERROR")
-                        if data:
-                            log(f"   错误详情: {data.get('message', '未知错误')}", "ERROR")
-                
-                except Exception as e:
-                    log(f"❌ 爬取第 {page} 页时出错: {e}", "ERROR")
-                    continue
-                
-                # 延迟
-                if page < end_page:
-                    delay = random.uniform(0, 0)
-                    log(f"⏱️  等待 {delay:.1f} 秒后继续下一页...")
-                    await asyncio.sleep(delay)
+                        page_range.stop_before(page)
+                        log(f"📭 第 {page} 页没有供应商，不再请求后续页面")
+                    
+                    # 按分页信息中的总数收缩页面范围，并记录页数供后续爬取规划
+                    totals = parse_pagination(data['data'].get('page'))
+                    if totals and not page_count_recorded:
+                        page_count_recorded = True
+                        total_count, page_size = totals
+                        page_count = page_count_from_total(total_count, page_size)
+                        log(f"📈 总供应商数: {total_count}，共 {page_count} 页")
+                        if page_range.clamp(page_count):
+                            log(f"📉 页面范围调整为: {start_page}-{page_range.last_page}")
+                        await record_page_count(self.db_path, 'category', category_id, total_count, page_size)
+                    
+                else:
+                    page_error = data.get('message', '未知错误') if data else '无响应'
+                    log(f"❌ 第 {page} 页API返回错误", "ERROR")
+                    if data:
+                        log(f"   错误详情: {data.get('message', '未知错误')}", "ERROR")
+            
+            except Exception as e:
+                page_error = e
+                log(f"❌ 爬取第 {page} 页时出错: {e}", "ERROR")
+            finally:
+                if frontier is not None:
+                    await self.finish_frontier_unit(frontier, category_id, page, page_error)
         
+        if frontier is not None:
+            await frontier.finish(category_id, page_range.last_page)
+            if frontier.stopped:
+                log("⏸️ 爬取已停止，未完成的页面下次启动同样的任务时继续", "WARNING")
+    
         # Excel文件更新已移除
         
         # 总结
@@ -1129,55 +956,76 @@ class AlibabaSupplierCrawler:
         
         return all_suppliers
     
+    async def finish_frontier_unit(self, frontier, target, page, page_error):
+        """标记一页处理完成或失败（写入失败只影响续爬，不中断爬取）"""
+        try:
+            if page_error is None:
+                await frontier.complete(target, page)
+            else:
+                await frontier.fail(target, page, page_error)
+        except Exception as e:
+            print(f"更新爬取进度失败: {e}")
+    
+    def create_known_page_tracker(self, target_type, target, log):
+        """增量爬取：读取该关键词/分类以前见到的供应商，创建已知页面判断器"""
+        conn = get_read_connection(self.db_path)
+        try:
+            seen_ids = load_seen_ids(conn, target_type, target)
+        finally:
+            conn.close()
+        stop_pages = load_crawler_config()['incremental_stop_pages']
+        log(f"🔁 增量爬取: 已记录 {len(seen_ids)} 个见过的供应商，连续 {stop_pages} 页都是已知供应商时停止翻页")
+        return KnownPageTracker(seen_ids, stop_pages)
+    
+    async def record_seen_page(self, target_type, target, page, suppliers, page_range, known_pages, log):
+        """记录本页见到的供应商；增量爬取时判断是否可以停止翻页"""
+        company_ids = [supplier['company_id'] for supplier in suppliers]
+        if known_pages is not None:
+            new_count, stop_page = known_pages.add_page(page, company_ids)
+            if stop_page is not None and stop_page <= page_range.last_page:
+                page_range.stop_before(stop_page)
+                log(f"⏹️ 连续 {known_pages.stop_pages} 页都是已知供应商，停止翻页（第 {stop_page} 页及之后不再请求）")
+            elif new_count:
+                log(f"🆕 第 {page} 页有 {new_count} 个新供应商")
+        await record_seen_ids(self.db_path, target_type, target, company_ids)
+    
     async def save_single_supplier_to_category(self, company_id, company_name, licenses, license_info, category_id, category_name):
-        """保存单个供应商到对应分类目录"""
+        """保存单个供应商到对应分类目录，并更新数据库中的save_path"""
+        supplier_dir = await self.save_supplier_files(company_id, company_name, licenses, license_info, category_id, category_name)
+        if supplier_dir:
+            await self.update_save_path(company_id, supplier_dir)
+        return supplier_dir
+    
+    async def save_supplier_files(self, company_id, company_name, licenses, license_info, category_id, category_name):
+        """下载执照图片并写入分类目录（不更新数据库），返回供应商目录
+        
+        图片按主机节奏下载，目录和文件在线程中写入，不阻塞事件循环。
+        """
         try:
-            # 创建保存目录
+            # 创建分类目录和供应商目录
             save_path = "./license_files"
             category_dir = os.path.join(save_path, f"{category_id}_{category_name}")
-            os.makedirs(category_dir, exist_ok=True)
-            
-            # 创建供应商目录
             safe_name = company_name.replace('/', '_').replace('\\', '_').replace(':', '_')[:50]
             supplier_dir = os.path.join(category_dir, safe_name)
-            os.makedirs(supplier_dir, exist_ok=True)
+            await asyncio.to_thread(os.makedirs, supplier_dir, exist_ok=True)
             
             # 保存执照信息
             if license_info:
-                info_file = os.path.join(supplier_dir, "执照信息.txt")
-                with open(info_file, 'w', encoding='utf-8') as f:
-                    f.write(f"供应商: {company_name}\n")
-                    f.write(f"公司ID: {company_id}\n")
-                    f.write(f"分类: {category_name}\n")
-                    f.write("=" * 50 + "\n")
-                    for field_name, field_value in license_info.items():
-                        f.write(f"{field_name}: {field_value}\n")
+                lines = [f"供应商: {company_name}\n", f"公司ID: {company_id}\n", f"分类: {category_name}\n", "=" * 50 + "\n"]
+                lines.extend(f"{field_name}: {field_value}\n" for field_name, field_value in license_info.items())
+                await asyncio.to_thread(self._write_file, os.path.join(supplier_dir, "执照信息.txt"), ''.join(lines))
             
             # 下载执照图片
             if licenses:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    for i, license_item in enumerate(licenses):
-                        try:
-                            async with session.get(license_item['url']) as response:
-                                if response.status == 200:
-                                    content = await response.read()
-                                    file_ext = license_item['url'].split('.')[-1] if '.' in license_item['url'] else 'jpg'
-                                    img_file = os.path.join(supplier_dir, f"执照图片_{i+1}.{file_ext}")
-                                    with open(img_file, 'wb') as f:
-                                        f.write(content)
-                        except Exception as e:
-                            print(f"下载图片失败: {license_item['url']} - {e}")
-            
-            # 更新数据库中的save_path字段
-            try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute('UPDATE suppliers SET save_path = ? WHERE company_id = ?', (supplier_dir, company_id))
-                conn.commit()
-                conn.close()
-            except Exception as db_e:
-                print(f"更新数据库save_path失败: {db_e}")
+                for i, license_item in enumerate(licenses):
+                    try:
+                        content = await self.download_image(license_item['url'])
+                        if content is not None:
+                            file_ext = license_item['url'].split('.')[-1] if '.' in license_item['url'] else 'jpg'
+                            img_file = os.path.join(supplier_dir, f"执照图片_{i+1}.{file_ext}")
+                            await asyncio.to_thread(self._write_file, img_file, content)
+                    except Exception as e:
+                        print(f"下载图片失败: {license_item['url']} - {e}")
             
             print(f"  - {company_name}: 已保存到分类目录: {supplier_dir}")
             return supplier_dir
@@ -1186,6 +1034,33 @@ class AlibabaSupplierCrawler:
             print(f"保存供应商文件失败: {company_name} - {e}")
             return None
     
+    async def update_save_path(self, company_id, supplier_dir):
+        """更新数据库中的save_path字段"""
+        try:
+            await get_writer(self.db_path).execute_async(
+                'UPDATE suppliers SET save_path = ? WHERE company_id = ?', (supplier_dir, company_id))
+        except Exception as db_e:
+            print(f"更新数据库save_path失败: {db_e}")
+    
+    def get_supplier_category(self, company_id):
+        """读取供应商的 (category_id, category_name)，没有记录时返回 None"""
+        conn = get_read_connection(self.db_path)
+        try:
+            return conn.execute(
+                'SELECT category_id, category_name FROM suppliers WHERE company_id = ?', (company_id,)).fetchone()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _write_file(path, data):
+        """写入文本或二进制文件（在线程中调用）"""
+        if isinstance(data, str):
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        else:
+            with open(path, 'wb') as f:
+                f.write(data)
+    
     def generate_save_path(self, supplier):
         """生成统一的保存路径"""
         base_path = "./license_files"
@@ -1235,20 +1110,17 @@ class AlibabaSupplierCrawler:
             
             # 下载执照图片
             if licenses:
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    for i, license_item in enumerate(licenses):
-                        try:
-                            async with session.get(license_item['url']) as response:
-                                if response.status == 200:
-                                    content = await response.read()
-                                    file_ext = license_item['url'].split('.')[-1] if '.' in license_item['url'] else 'jpg'
-                                    img_file = os.path.join(supplier_dir, f"执照图片_{i+1}.{file_ext}")
-                                    with open(img_file, 'wb') as f:
-                                        f.write(content)
-                        except Exception as e:
-                            print(f"下载图片失败: {license_item['url']} - {e}")
-            
+                for i, license_item in enumerate(licenses):
+                    try:
+                        content = await self.download_image(license_item['url'])
+                        if content is not None:
+                            file_ext = license_item['url'].split('.')[-1] if '.' in license_item['url'] else 'jpg'
+                            img_file = os.path.join(supplier_dir, f"执照图片_{i+1}.{file_ext}")
+                            with open(img_file, 'wb') as f:
+                                f.write(content)
+                    except Exception as e:
+                        print(f"下载图片失败: {license_item['url']} - {e}")
+        
             print(f"  - {company_name}: 已保存到关键词目录: {supplier_dir}")
             return supplier_dir
             
@@ -1266,112 +1138,112 @@ class AlibabaSupplierCrawler:
         print(f"开始保存分类: {category_name} 的供应商数据")
         
         # 从数据库获取该分类的供应商
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT company_id, company_name, action_url, country_code, city, 
-                   gold_years, verified_supplier, is_factory, review_score, review_count,
-                   company_on_time_shipping, factory_size_text, total_employees_text,
-                   transaction_count_6months, transaction_gmv_6months_text, gold_supplier,
-                   trade_assurance, response_time, save_path
-            FROM suppliers 
-            WHERE category_id = ?
-            ORDER BY created_at DESC
-        ''', (category_id,))
+        conn = get_read_connection(self.db_path)
+        # 循环中还要查询每个供应商的执照，连接用完后才归还连接池
+        try:
+            cursor = conn.cursor()
         
-        suppliers = cursor.fetchall()
-        conn.close()
+            cursor.execute('''
+                SELECT company_id, company_name, action_url, country_code, city, 
+                       gold_years, verified_supplier, is_factory, review_score, review_count,
+                       company_on_time_shipping, factory_size_text, total_employees_text,
+                       transaction_count_6months, transaction_gmv_6months_text, gold_supplier,
+                       trade_assurance, response_time, save_path
+                FROM suppliers 
+                WHERE category_id = ?
+                ORDER BY created_at DESC
+            ''', (category_id,))
         
-        if not suppliers:
-            print(f"分类 {category_name} 没有供应商数据")
-            return
+            suppliers = cursor.fetchall()
         
-        # 创建保存目录
-        if not save_path:
-            save_path = "./license_files"
+            if not suppliers:
+                print(f"分类 {category_name} 没有供应商数据")
+                return
         
-        category_dir = os.path.join(save_path, f"{category_id}_{category_name}")
-        os.makedirs(category_dir, exist_ok=True)
+            # 创建保存目录
+            if not save_path:
+                save_path = "./license_files"
         
-        # 保存Excel文件
-        import pandas as pd
+            category_dir = os.path.join(save_path, f"{category_id}_{category_name}")
+            os.makedirs(category_dir, exist_ok=True)
         
-        # 转换为DataFrame
-        df_data = []
-        for supplier in suppliers:
-            df_data.append({
-                'company_id': supplier[0],
-                'company_name': supplier[1],
-                'action_url': supplier[2],
-                'country_code': supplier[3],
-                'city': supplier[4],
-                'gold_years': supplier[5],
-                'verified_supplier': supplier[6],
-                'is_factory': supplier[7],
-                'review_score': supplier[8],
-                'review_count': supplier[9],
-                'company_on_time_shipping': supplier[10],
-                'factory_size_text': supplier[11],
-                'total_employees_text': supplier[12],
-                'transaction_count_6months': supplier[13],
-                'transaction_gmv_6months_text': supplier[14],
-                'gold_supplier': supplier[15],
-                'trade_assurance': supplier[16],
-                'response_time': supplier[17],
-                'save_path': supplier[18]
-            })
-        
-        df = pd.DataFrame(df_data)
-        excel_file = os.path.join(category_dir, f"{category_name}_供应商数据.xlsx")
-        df.to_excel(excel_file, index=False)
-        
-        # 保存执照图片和信息
-        for supplier in suppliers:
-            company_id, company_name = supplier[0], supplier[1]
+            # 保存Excel文件
+            import pandas as pd
+        
+            # 转换为DataFrame
+            df_data = []
+            for supplier in suppliers:
+                df_data.append({
+                    'company_id': supplier[0],
+                    'company_name': supplier[1],
+                    'action_url': supplier[2],
+                    'country_code': supplier[3],
+                    'city': supplier[4],
+                    'gold_years': supplier[5],
+                    'verified_supplier': supplier[6],
+                    'is_factory': supplier[7],
+                    'review_score': supplier[8],
+                    'review_count': supplier[9],
+                    'company_on_time_shipping': supplier[10],
+                    'factory_size_text': supplier[11],
+                    'total_employees_text': supplier[12],
+                    'transaction_count_6months': supplier[13],
+                    'transaction_gmv_6months_text': supplier[14],
+                    'gold_supplier': supplier[15],
+                    'trade_assurance': supplier[16],
+                    'response_time': supplier[17],
+                    'save_path': supplier[18]
+                })
+        
+            df = pd.DataFrame(df_data)
+            excel_file = os.path.join(category_dir, f"{category_name}_供应商数据.xlsx")
+            df.to_excel(excel_file, index=False)
+        
+            # 保存执照图片和信息
+            for supplier in suppliers:
+                company_id, company_name = supplier[0], supplier[1]
+            
+                # 获取执照图片
+                cursor.execute('SELECT license_url FROM licenses WHERE company_id = ?', (company_id,))
+                licenses = cursor.fetchall()
+            
+                # 获取执照信息
+                cursor.execute('SELECT field_name, field_value FROM license_info WHERE company_id = ?', (company_id,))
+                license_info = cursor.fetchall()
             
-            # 获取执照图片
-            cursor.execute('SELECT license_url FROM licenses WHERE company_id = ?', (company_id,))
-            licenses = cursor.fetchall()
-            
-            # 获取执照信息
-            cursor.execute('SELECT field_name, field_value FROM license_info WHERE company_id = ?', (company_id,))
-            license_info = cursor.fetchall()
-            
-            if licenses or license_info:
-                # 创建供应商目录
-                safe_name = company_name.replace('/', '_').replace('\\', '_').replace(':', '_')[:50]
-                supplier_dir = os.path.join(category_dir, safe_name)
-                os.makedirs(supplier_dir, exist_ok=True)
-                
-                # 保存执照信息
-                if license_info:
-                    info_file = os.path.join(supplier_dir, "执照信息.txt")
-                    with open(info_file, 'w', encoding='utf-8') as f:
-                        f.write(f"供应商: {company_name}\n")
-                        f.write(f"公司ID: {company_id}\n")
-                        f.write("=" * 50 + "\n")
-                        for field_name, field_value in license_info:
-                            f.write(f"{field_name}: {field_value}\n")
-                
-                # 下载执照图片
-                if licenses:
-                    import aiohttp
-                    async with aiohttp.ClientSession() as session:
+                if licenses or license_info:
+                    # 创建供应商目录
+                    safe_name = company_name.replace('/', '_').replace('\\', '_').replace(':', '_')[:50]
+                    supplier_dir = os.path.join(category_dir, safe_name)
+                    os.makedirs(supplier_dir, exist_ok=True)
+                
+                    # 保存执照信息
+                    if license_info:
+                        info_file = os.path.join(supplier_dir, "执照信息.txt")
+                        with open(info_file, 'w', encoding='utf-8') as f:
+                            f.write(f"供应商: {company_name}\n")
+                            f.write(f"公司ID: {company_id}\n")
+                            f.write("=" * 50 + "\n")
+                            for field_name, field_value in license_info:
+                                f.write(f"{field_name}: {field_value}\n")
+                
+                    # 下载执照图片
+                    if licenses:
                         for i, (license_url,) in enumerate(licenses):
                             try:
-                                async with session.get(license_url) as response:
-                                    if response.status == 200:
-                                        content = await response.read()
-                                        file_ext = license_url.split('.')[-1] if '.' in license_url else 'jpg'
-                                        img_file = os.path.join(supplier_dir, f"执照图片_{i+1}.{file_ext}")
-                                        with open(img_file, 'wb') as f:
-                                            f.write(content)
+                                content = await self.download_image(license_url)
+                                if content is not None:
+                                    file_ext = license_url.split('.')[-1] if '.' in license_url else 'jpg'
+                                    img_file = os.path.join(supplier_dir, f"执照图片_{i+1}.{file_ext}")
+                                    with open(img_file, 'wb') as f:
+                                        f.write(content)
                             except Exception as e:
                                 print(f"下载图片失败: {license_url} - {e}")
         
-        print(f"分类 {category_name} 的数据已保存到: {category_dir}")
-        return category_dir
+            print(f"分类 {category_name} 的数据已保存到: {category_dir}")
+            return category_dir
+        finally:
+            conn.close()
     
     def extract_suppliers_from_api(self, offers):
         """从API数据中提取供应商信息"""
@@ -1406,95 +1278,90 @@ class AlibabaSupplierCrawler:
         
         return suppliers
     
-    async def save_single_supplier(self, supplier, skip_duplicates=True):
-        """实时保存单个供应商数据"""
-        max_retries = 3
-        retry_delay = 0.5  # 500ms
+    def build_supplier_row(self, supplier):
+        """将供应商字典转换为suppliers表插入所需的参数元组"""
+        return (
+            supplier['company_id'],
+            supplier['company_name'],
+            supplier['action_url'],
+            supplier.get('country_code', ''),
+            supplier.get('city', ''),
+            supplier.get('gold_years', ''),
+            supplier.get('verified_supplier', False),
+            supplier.get('is_factory', False),
+            supplier.get('review_score', ''),
+            supplier.get('review_count', 0),
+            supplier.get('company_on_time_shipping', ''),
+            supplier.get('factory_size_text', ''),
+            supplier.get('total_employees_text', ''),
+            supplier.get('transaction_count_6months', ''),
+            supplier.get('transaction_gmv_6months_text', ''),
+            supplier.get('gold_supplier', False),
+            supplier.get('trade_assurance', False),
+            supplier.get('response_time', ''),
+            supplier.get('category_id', ''),
+            supplier.get('category_name', ''),
+            supplier['save_path']
+        ) + supplier_metric_values(supplier)
+    
+    async def save_suppliers_page(self, suppliers, skip_duplicates=True):
+        """批量保存一页供应商数据（通过写线程单事务 INSERT OR IGNORE）
         
-        for attempt in range(max_retries):
-            conn = None
-            try:
-                # 设置数据库连接超时和WAL模式
-                conn = sqlite3.connect(self.db_path, timeout=10.0)
-                conn.execute('PRAGMA journal_mode=WAL')
-                conn.execute('PRAGMA synchronous=NORMAL')
-                conn.execute('PRAGMA busy_timeout=10000')  # 10秒超时
-                cursor = conn.cursor()
-                
-                # 开始事务
-                conn.execute('BEGIN IMMEDIATE')
-                
-                if skip_duplicates:
-                    # 检查是否已存在
-                    cursor.execute('SELECT company_id FROM suppliers WHERE company_id = ?', (supplier['company_id'],))
-                    existing = cursor.fetchone()
-                    
-                    if existing:
-                        print(f"  ✓ 跳过重复供应商: {supplier['company_name']} (ID: {supplier['company_id']})")
-                        conn.rollback()
-                        return False
-                
-                # 生成保存路径
-                save_path = self.generate_save_path(supplier)
-                supplier['save_path'] = save_path
-                
-                cursor.execute('''
-                    INSERT INTO suppliers (company_id, company_name, action_url, country_code, 
-                                       city, gold_years, verified_supplier, is_factory, 
-                                       review_score, review_count, company_on_time_shipping,
-                                       factory_size_text, total_employees_text, transaction_count_6months,
-                                       transaction_gmv_6months_text, gold_supplier, trade_assurance, response_time,
-                                       category_id, category_name, save_path)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    supplier['company_id'],
-                    supplier['company_name'],
-                    supplier['action_url'],
-                    supplier['country_code'],
-                    supplier['city'],
-                    supplier['gold_years'],
-                    supplier['verified_supplier'],
-                    supplier['is_factory'],
-                    supplier['review_score'],
-                    supplier['review_count'],
-                    supplier.get('company_on_time_shipping', ''),
-                    supplier.get('factory_size_text', ''),
-                    supplier.get('total_employees_text', ''),
-                    supplier.get('transaction_count_6months', ''),
-                    supplier.get('transaction_gmv_6months_text', ''),
-                    supplier.get('gold_supplier', False),
-                    supplier.get('trade_assurance', False),
-                    supplier.get('response_time', ''),
-                    supplier.get('category_id', ''),
-                    supplier.get('category_name', ''),
-                    save_path
-                ))
-                
-                conn.commit()
-                print(f"  ✓ 成功保存供应商: {supplier['company_name']} (ID: {supplier['company_id']})")
-                return True
-                
-            except sqlite3.OperationalError as e:
-                if conn:
-                    conn.rollback()
-                
-                if "database is locked" in str(e) and attempt < max_retries - 1:
-                    print(f"  ⚠️ 数据库锁定，第 {attempt + 1} 次重试: {supplier['company_name']}")
-                    await asyncio.sleep(retry_delay * (attempt + 1))  # 递增延迟
-                    continue
-                else:
-                    print(f"  ✗ 保存供应商失败: {supplier['company_name']} - {e}")
-                    return False
-            except Exception as e:
-                if conn:
-                    conn.rollback()
-                print(f"  ✗ 保存供应商失败: {supplier['company_name']} - {e}")
-                return False
-            finally:
-                if conn:
-                    conn.close()
+        依赖company_id唯一索引完成去重，返回 (新增数量, 跳过数量)。
+        skip_duplicates=False 时对已存在的供应商刷新抓取字段，而不是重复插入。
+        写入失败时抛出异常（不能当作重复跳过），调用方把该页标记为失败，下次续爬时重新请求。
+        """
+        if not suppliers:
+            return 0, 0
+        
+        rows = []
+        for supplier in suppliers:
+            # 生成保存路径
+            supplier['save_path'] = self.generate_save_path(supplier)
+            rows.append(self.build_supplier_row(supplier))
+        
+        columns_sql = ', '.join(SUPPLIER_INSERT_COLUMNS)
+        placeholders = ', '.join(['?'] * len(SUPPLIER_INSERT_COLUMNS))
+        if skip_duplicates:
+            sql = f'INSERT OR IGNORE INTO suppliers ({columns_sql}) VALUES ({placeholders})'
+        else:
+            update_sql = ', '.join(f'{column} = excluded.{column}' for column in SUPPLIER_REFRESH_COLUMNS)
+            sql = (f'INSERT INTO suppliers ({columns_sql}) VALUES ({placeholders}) '
+                   f'ON CONFLICT(company_id) DO UPDATE SET {update_sql}')
+        
+        try:
+            return await get_writer(self.db_path).run_async(self._save_supplier_rows, sql, rows)
+        except Exception as e:
+            print(f"  ✗ 批量保存供应商失败: {e}")
+            raise
+    
+    @staticmethod
+    def _save_supplier_rows(conn, sql, rows):
+        """写线程命令：写入一页供应商并返回 (新增数量, 跳过数量)"""
+        cursor = conn.cursor()
         
-        return False
+        # 统计本页中已存在的供应商（走company_id索引）
+        company_ids = list({row[0] for row in rows})
+        cursor.execute(
+            f"SELECT COUNT(*) FROM suppliers WHERE company_id IN ({', '.join(['?'] * len(company_ids))})",
+            company_ids
+        )
+        existing_count = cursor.fetchone()[0]
+        
+        cursor.executemany(sql, rows)
+        
+        inserted = len(company_ids) - existing_count
+        skipped = len(rows) - inserted
+        return inserted, skipped
+    
+    async def save_single_supplier(self, supplier, skip_duplicates=True):
+        """实时保存单个供应商数据"""
+        inserted, _ = await self.save_suppliers_page([supplier], skip_duplicates)
+        if inserted:
+            print(f"  ✓ 成功保存供应商: {supplier['company_name']} (ID: {supplier['company_id']})")
+        else:
+            print(f"  ✓ 跳过重复供应商: {supplier['company_name']} (ID: {supplier['company_id']})")
+        return inserted > 0
     
     async def save_suppliers(self, suppliers, skip_duplicates=True):
         """批量保存供应商数据（保持向后兼容）"""
@@ -1502,116 +1369,120 @@ class AlibabaSupplierCrawler:
             print("没有供应商数据需要保存")
             return
         
-        saved_count = 0
-        skipped_count = 0
-        
-        for supplier in suppliers:
-            result = await self.save_single_supplier(supplier, skip_duplicates)
-            if result:
-                saved_count += 1
-            else:
-                skipped_count += 1
+        saved_count, skipped_count = await self.save_suppliers_page(suppliers, skip_duplicates)
         
         # Excel文件更新已移除
         
         if skip_duplicates:
             print(f"批量保存完成: {saved_count} 个新增，{skipped_count} 个重复")
         else:
-            print(f"批量保存完成: {saved_count} 个供应商数据")
+            print(f"批量保存完成: {saved_count} 个新增，{skipped_count} 个已更新")
     
-    async def check_image_size(self, url, base_name, file_ext):
-        """异步检查单个图片大小"""
+    async def probe_image(self, url):
+        """HEAD 请求探测图片（按主机节奏），返回 (状态码, 大小, 类型)；没有 content-length 时大小为 None"""
+        session = get_http_client().session()
+        pacer = get_host_pacer()
+        await pacer.wait(url)
+        started = time.monotonic()
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.head(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status == 200:
-                        content_length = response.headers.get('content-length')
-                        if content_length:
-                            file_size = int(content_length)
-                            if file_size >= 20 * 1024:  # 20KB = 20 * 1024 bytes
-                                license_item = {
-                                    'name': f"{base_name.split('.')[0]}.{file_ext}",
-                                    'type': 'img',
-                                    'url': url,
-                                    'fileId': base_name,
-                                    'file_size': file_size
-                                }
-                                print(f"保留执照图片: {url} (大小: {file_size} bytes)")
-                                return license_item
-                            else:
-                                print(f"忽略小图片: {url} (大小: {file_size} bytes, 小于20KB)")
-                                return None
-                        else:
-                            # 如果没有content-length头，保留图片，设置默认大小为0
-                            license_item = {
-                                'name': f"{base_name.split('.')[0]}.{file_ext}",
-                                'type': 'img',
-                                'url': url,
-                                'fileId': base_name,
-                                'file_size': 0
-                            }
-                            print(f"保留执照图片: {url} (无法获取大小)")
-                            return license_item
-                    else:
-                        print(f"无法访问图片: {url} (状态码: {response.status})")
-                        return None
-        except Exception as e:
-            print(f"检查图片大小时出错: {url} - {e}")
-            # 出错时保留图片
-            license_item = {
-                'name': f"{base_name.split('.')[0]}.{file_ext}",
-                'type': 'img',
-                'url': url,
-                'fileId': base_name
-            }
+            async with session.head(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                pacer.record(url, response.status, time.monotonic() - started, retry_after=response.headers.get('Retry-After'))
+                content_length = response.headers.get('content-length')
+                file_size = int(content_length) if content_length and content_length.isdigit() else None
+                return response.status, file_size, response.headers.get('content-type')
+        except Exception:
+            pacer.record(url, latency=time.monotonic() - started, error=True)
+            raise
+    
+    async def download_image(self, url):
+        """按主机节奏下载图片，返回图片内容；状态码不是200时返回 None"""
+        session = get_http_client().session()
+        pacer = get_host_pacer()
+        await pacer.wait(url)
+        started = time.monotonic()
+        try:
+            async with session.get(url) as response:
+                content = await response.read() if response.status == 200 else None
+                pacer.record(url, response.status, time.monotonic() - started, retry_after=response.headers.get('Retry-After'))
+                return content
+        except Exception:
+            pacer.record(url, latency=time.monotonic() - started, error=True)
+            raise
+    
+    async def check_image_size(self, url, base_name, file_ext, known=None, probed=None):
+        """检查单个图片大小（image_meta 中已有记录时不发请求）
+        
+        known 为 load_image_meta() 的结果；新探测到的结果追加到 probed 列表，由调用方统一记录。
+        """
+        license_item = {
+            'name': f"{base_name.split('.')[0]}.{file_ext}",
+            'type': 'img',
+            'url': url,
+            'fileId': base_name
+        }
+        meta = (known or {}).get(base_name)
+        if meta is None:
+            try:
+                meta = await self.probe_image(url)
+            except Exception as e:
+                print(f"检查图片大小时出错: {url} - {e}")
+                # 出错时保留图片
+                return license_item
+            if probed is not None:
+                probed.append((base_name, url) + meta)
+        
+        status, file_size, _content_type = meta
+        if status != 200:
+            print(f"无法访问图片: {url} (状态码: {status})")
+            return None
+        if file_size is None:
+            # 如果没有content-length头，保留图片，设置默认大小为0
+            license_item['file_size'] = 0
+            print(f"保留执照图片: {url} (无法获取大小)")
             return license_item
+        if file_size >= 20 * 1024:  # 20KB = 20 * 1024 bytes
+            license_item['file_size'] = file_size
+            print(f"保留执照图片: {url} (大小: {file_size} bytes)")
+            return license_item
+        print(f"忽略小图片: {url} (大小: {file_size} bytes, 小于20KB)")
+        return None
 
-    async def extract_licenses_from_html(self, html_content):
-        """从HTML内容中提取执照图片信息（异步版本）"""
+    async def extract_licenses_from_html(self, html_content, parsed=None):
+        """从HTML内容中提取执照图片信息（异步版本）
+        
+        parsed 为 parse_license_page() 的结果，调用方已解析过页面时传入，避免重复扫描。
+        """
         try:
-            # 搜索所有执照图片URL（支持jpg和png格式）
-            url_pattern = r'https://sc04\.alicdn\.com/kf/([^"]+\.(?:jpg|png))'
-            matches = re.findall(url_pattern, html_content)
-            
-            if matches:
-                # 去重处理：只保留原始尺寸的图片（不包含尺寸后缀）
-                unique_urls = {}
-                for file_id in matches:
-                    # 提取基础文件名（去除尺寸后缀）
-                    base_name = file_id
-                    file_ext = file_id.split('.')[-1]  # 获取文件扩展名
-                    
-                    if '_' in file_id and any(size in file_id for size in ['_50x50', '_80x80', '_100x100', '_120x120', '_200x200', '_250x250', '_350x350']):
-                        # 如果有尺寸后缀，尝试找到原始文件名
-                        for size in ['_50x50', '_80x80', '_100x100', '_120x120', '_200x200', '_250x250', '_350x350']:
-                            if file_id.endswith(size + '.' + file_ext):
-                                base_name = file_id.replace(size + '.' + file_ext, '.' + file_ext)
-                                break
-                    
-                    # 只保留原始尺寸的图片
-                    if not any(size in base_name for size in ['_50x50', '_80x80', '_100x100', '_120x120', '_200x200', '_250x250', '_350x350']):
-                        url = f"https://sc04.alicdn.com/kf/{base_name}"
-                        unique_urls[base_name] = (url, base_name, file_ext)
-                
-                # 并发检查图片大小
-                tasks = []
-                for base_name, (url, base_name, file_ext) in unique_urls.items():
-                    task = self.check_image_size(url, base_name, file_ext)
-                    tasks.append(task)
-                
-                # 分批处理，每批10个（增加并发）
-                batch_size = 10
+            # 候选图片：sc04.alicdn.com 上的原图（已去掉缩略图后缀并按 fileId 去重）
+            parsed = parsed or parse_license_page(html_content)
+            
+            if parsed.images:
+                unique_urls = {base_name: (url, base_name, file_ext) for url, base_name, file_ext in parsed.images}
+                
+                # 已记录大小的图片不再请求，其余图片并发探测（同时在途的数量由信号量限制）
+                known = load_image_meta(self.db_path, unique_urls.keys())
+                probed = []
+                semaphore = asyncio.Semaphore(load_crawler_config()['image_probe_concurrency'])
+                
+                async def check(url, base_name, file_ext):
+                    if base_name in known:
+                        return await self.check_image_size(url, base_name, file_ext, known)
+                    async with semaphore:
+                        return await self.check_image_size(url, base_name, file_ext, known, probed)
+                
+                results = await asyncio.gather(
+                    *(check(url, base_name, file_ext) for url, base_name, file_ext in unique_urls.values()),
+                    return_exceptions=True
+                )
                 all_licenses = []
+                for result in results:
+                    if isinstance(result, Exception):
+                        print(f"检查图片大小时出错: {result}")
+                    elif result is not None:
+                        all_licenses.append(result)
                 
-                for i in range(0, len(tasks), batch_size):
-                    batch_tasks = tasks[i:i + batch_size]
-                    results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-                    
-                    for result in results:
-                        if isinstance(result, Exception):
-                            print(f"检查图片大小时出错: {result}")
-                        elif result is not None:
-                            all_licenses.append(result)
+                print(f"候选图片 {len(unique_urls)} 张: {len(known)} 张使用已记录的大小，探测 {len(unique_urls) - len(known)} 张")
+                await record_image_meta(self.db_path, probed)
                 
                 # 只保留最大的一张图片
                 if all_licenses:
@@ -1630,33 +1501,13 @@ class AlibabaSupplierCrawler:
             print(f"提取执照图片失败: {e}")
             return []
     
-    def extract_license_info_from_html(self, html_content):
-        """从HTML内容中提取执照详细信息"""
+    def extract_license_info_from_html(self, html_content, parsed=None):
+        """从HTML内容中提取执照详细信息（parsed 同 extract_licenses_from_html）"""
         try:
-            # 提取营业执照信息的正则表达式
-            info_patterns = {
-                'registration_no': r'<span>Registration No\.</span>\s*:\s*([^<]+)',
-                'company_name': r'<span>Company Name</span>\s*:\s*([^<]+)',
-                'date_of_issue': r'<span>Date of Issue</span>\s*:\s*([^<]+)',
-                'date_of_expiry': r'<span>Date of Expiry</span>\s*:\s*([^<]+)',
-                'registered_capital': r'<span>Registered Capital</span>\s*:\s*([^<]+)',
-                'country_territory': r'<span>Country/Territory</span>\s*:\s*([^<]+)',
-                'registered_address': r'<span>Registered address</span>\s*:\s*([^<]+)',
-                'year_established': r'<span>Year Established</span>\s*:\s*([^<]+)',
-                'legal_form': r'<span>Legal Form</span>\s*:\s*([^<]+)',
-                'legal_representative': r'<span>Legal Representative</span>\s*:\s*([^<]+)'
-            }
-            
-            license_info = {}
-            for field, pattern in info_patterns.items():
-                match = re.search(pattern, html_content)
-                if match:
-                    license_info[field] = match.group(1).strip()
-                else:
-                    license_info[field] = ''
+            license_info = (parsed or parse_license_page(html_content)).license_info
             
             # 检查是否找到了任何信息
-            if any(license_info.values()):
+            if license_info:
                 print(f"找到执照信息: {len([v for v in license_info.values() if v])} 个字段")
                 return license_info
             else:
@@ -1667,17 +1518,26 @@ class AlibabaSupplierCrawler:
             print(f"提取执照信息失败: {e}")
             return None
     
+    @staticmethod
+    def supplier_page_url(action_url):
+        """供应商详情页URL（确保包含subpage参数）"""
+        if 'subpage=onsiteDetail' in action_url:
+            return action_url
+        if '?' in action_url:
+            return action_url + '&subpage=onsiteDetail'
+        return action_url + '?subpage=onsiteDetail'
+    
+    async def cache_supplier_page(self, action_url, html_content):
+        """解析出执照信息后把供应商页面写入响应缓存（没有执照信息的页面可能是验证码页，不缓存）"""
+        try:
+            await get_response_cache().put_async(self.supplier_page_url(action_url), html_content)
+        except Exception as e:
+            print(f"写入响应缓存失败: {e}")
+    
     async def fetch_supplier_page(self, action_url, proxy=None, session=None, check_ip=False, log_callback=None):
-        """获取供应商页面HTML"""
+        """获取供应商页面HTML（不写入响应缓存，解析出执照信息后由调用方调用 cache_supplier_page）"""
         try:
-            # 确保URL包含subpage参数
-            if 'subpage=onsiteDetail' not in action_url:
-                if '?' in action_url:
-                    actual_url = action_url + '&subpage=onsiteDetail'
-                else:
-                    actual_url = action_url + '?subpage=onsiteDetail'
-            else:
-                actual_url = action_url
+            actual_url = self.supplier_page_url(action_url)
             
             self.log(f"请求供应商页面: {actual_url}", "INFO", log_callback)
             
@@ -1698,8 +1558,7 @@ class AlibabaSupplierCrawler:
     async def extract_all_licenses(self, suppliers, proxy=None, session=None, log_callback=None):
         """提取所有供应商的执照图片"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            writer = get_writer(self.db_path)
             
             for i, supplier in enumerate(suppliers, 1):
                 self.log(f"处理第 {i}/{len(suppliers)} 个供应商: {supplier['company_name']}", "INFO", log_callback)
@@ -1712,47 +1571,34 @@ class AlibabaSupplierCrawler:
                     licenses = await self.extract_licenses_from_html(html_content)
                     
                     if licenses:
-                        # 保存执照图片到数据库
-                        for license_item in licenses:
-                            cursor.execute('''
-                                INSERT INTO licenses (supplier_id, license_name, license_url, file_id)
-                                VALUES (?, ?, ?, ?)
-                            ''', (
-                                supplier['company_id'],  # 使用company_id作为supplier_id
-                                license_item['name'],
-                                license_item['url'],
-                                license_item['fileId']
-                            ))
+                        await self.cache_supplier_page(supplier['action_url'], html_content)
+                        # 保存执照图片到数据库（使用company_id作为supplier_id）
+                        await writer.executemany_async('''
+                            INSERT INTO licenses (supplier_id, license_name, license_url, file_id)
+                            VALUES (?, ?, ?, ?)
+                        ''', [(supplier['company_id'], item['name'], item['url'], item['fileId']) for item in licenses])
                         
                         print(f"  - 找到 {len(licenses)} 个执照图片")
                     else:
                         print(f"  - 未找到执照图片")
-                
-                # 延迟避免请求过快
-                if i < len(suppliers):
-                    await asyncio.sleep(random.uniform(0.5, 1))
             
-            conn.commit()
-            conn.close()
             print("执照图片提取完成")
             
         except Exception as e:
             print(f"提取执照图片过程中出错: {e}")
-            if 'conn' in locals():
-                conn.close()
     
-    async def extract_licenses_from_database(self, proxy=None):
-        """从数据库中的供应商提取执照图片 - 使用10个并发线程"""
+    async def extract_licenses_from_database(self, proxy=None, log_callback=None, progress_callback=None):
+        """从数据库中的供应商提取执照图片 - 使用分阶段的提取流水线"""
         try:
             # 获取数据库中的所有供应商
-            conn = sqlite3.connect(self.db_path)
+            conn = get_read_connection(self.db_path)
             cursor = conn.cursor()
             
-            cursor.execute('''
+            # 只选择已到重试时间的供应商（刚失败的按退避时间等待）
+            cursor.execute(f'''
                 SELECT company_id, company_name, action_url 
                 FROM suppliers 
-                WHERE (license_extracted = FALSE OR license_extracted IS NULL)
-                  AND (skip_extraction = FALSE OR skip_extraction IS NULL)
+                WHERE {EXTRACTION_QUEUE_CONDITION}
                 ORDER BY created_at DESC
             ''')
             
@@ -1763,50 +1609,16 @@ class AlibabaSupplierCrawler:
                 print("数据库中没有供应商数据")
                 return 0
             
-            print(f"从数据库获取到 {len(suppliers)} 个供应商，使用5个并发线程处理")
-            
-            # 创建异步会话 - 优化并发设置
-            connector = aiohttp.TCPConnector(limit=20)  # 从60减少到20
-            timeout = aiohttp.ClientTimeout(total=15)  # 从10增加到15秒
+            # 请求、解析、探测图片、写入各自并发，阶段之间用有界队列连接，没有批次屏障
+            pipeline = ExtractionPipeline(self, proxy, check_ip=True, log_callback=log_callback, progress_callback=progress_callback)
+            print(f"从数据库获取到 {len(suppliers)} 个供应商，流水线并发: {pipeline.workers}")
+            extracted_ids = await pipeline.run(suppliers)
             
-            processed_count = 0
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                # 将供应商分成5个一组 - 减少批次大小
-                batch_size = 5
-                for i in range(0, len(suppliers), batch_size):
-                    batch = suppliers[i:i + batch_size]
-                    print(f"处理批次 {i//batch_size + 1}/{(len(suppliers) + batch_size - 1)//batch_size}: {len(batch)} 个供应商")
-                    
-                    # 创建5个并发任务
-                    tasks = []
-                    for company_id, company_name, action_url in batch:
-                        task = self.process_single_supplier(company_id, company_name, action_url, proxy, session)
-                        tasks.append(task)
-                    
-                    # 并发执行，不等待所有任务完成
-                    # 使用asyncio.create_task来创建任务，然后立即开始下一批
-                    running_tasks = []
-                    for task in tasks:
-                        running_tasks.append(asyncio.create_task(task))
-                    
-                    # 等待当前批次的任务完成（不阻塞下一批）
-                    for task in running_tasks:
-                        try:
-                            result = await task
-                            if result:
-                                processed_count += 1
-                        except Exception as e:
-                            print(f"处理供应商时出错: {e}")
-                    
-                    # 批次间延迟（固定1秒延迟）
-                    if i + batch_size < len(suppliers):
-                        delay = 1.0  # 固定1秒延迟
-                        print(f"批次间等待 {delay:.1f} 秒...")
-                        await asyncio.sleep(delay)
-            
-            print(f"执照图片提取完成，成功处理 {processed_count} 个供应商")
-            return processed_count
+            print(f"执照图片提取完成: {pipeline.format_stats()}")
+            parse_pool = get_parse_pool()
+            if parse_pool is not None:
+                print(parse_pool.format_stats())
+            return len(extracted_ids)
             
         except Exception as e:
             print(f"从数据库提取执照图片时出错: {e}")
@@ -1823,77 +1635,26 @@ class AlibabaSupplierCrawler:
             if html_content:
                 self.log(f"  - {company_name}: 成功获取页面", "SUCCESS", log_callback)
                 
-                # 提取执照图片
-                licenses = await self.extract_licenses_from_html(html_content)
+                # 一次扫描页面，提取执照图片和执照信息
+                parsed = await parse_page(html_content)
+                licenses = await self.extract_licenses_from_html(html_content, parsed)
+                license_info = self.extract_license_info_from_html(html_content, parsed)
                 
-                # 提取执照信息
-                license_info = self.extract_license_info_from_html(html_content)
-                
-                # 保存到数据库
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # 先删除该供应商的旧记录
-                cursor.execute('DELETE FROM licenses WHERE supplier_id = ?', (company_id,))
-                cursor.execute('DELETE FROM license_info WHERE supplier_id = ?', (company_id,))
+                # 保存到数据库（与其它供应商的结果攒批后一个事务提交；无结果时保留旧记录）
+                category_data = None
+                if licenses or license_info:
+                    await self.cache_supplier_page(action_url, html_content)
+                    category_data = await get_extraction_sink(self.db_path).add_result_async(company_id, licenses, license_info)
                 
-                # 保存执照图片
                 if licenses:
-                    for license_item in licenses:
-                        cursor.execute('''
-                            INSERT INTO licenses (supplier_id, license_name, license_url, file_id)
-                            VALUES (?, ?, ?, ?)
-                        ''', (
-                            company_id,
-                            license_item['name'],
-                            license_item['url'],
-                            license_item['fileId']
-                        ))
                     print(f"  - {company_name}: 找到 {len(licenses)} 个执照图片")
-                
-                # 保存执照信息
                 if license_info:
-                    cursor.execute('''
-                        INSERT INTO license_info (
-                            supplier_id, registration_no, company_name, date_of_issue, 
-                            date_of_expiry, registered_capital, country_territory, 
-                            registered_address, year_established, legal_form, legal_representative
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        company_id,
-                        license_info.get('registration_no', ''),
-                        license_info.get('company_name', ''),
-                        license_info.get('date_of_issue', ''),
-                        license_info.get('date_of_expiry', ''),
-                        license_info.get('registered_capital', ''),
-                        license_info.get('country_territory', ''),
-                        license_info.get('registered_address', ''),
-                        license_info.get('year_established', ''),
-                        license_info.get('legal_form', ''),
-                        license_info.get('legal_representative', '')
-                    ))
                     print(f"  - {company_name}: 执照信息已保存")
                 
-                # 如果成功提取到执照信息，标记为已获取并保存到文件
-                if licenses or license_info:
-                    cursor.execute('UPDATE suppliers SET license_extracted = TRUE WHERE company_id = ?', (company_id,))
-                    
-                    # 获取分类信息
-                    cursor.execute('SELECT category_id, category_name FROM suppliers WHERE company_id = ?', (company_id,))
-                    category_data = cursor.fetchone()
-                    
-                    if category_data and category_data[0]:
-                        category_id, category_name = category_data
-                        # 自动保存到对应分类目录
-                        save_path = await self.save_single_supplier_to_category(company_id, company_name, licenses, license_info, category_id, category_name)
-                        
-                        # 更新数据库中的保存路径
-                        if save_path:
-                            cursor.execute('UPDATE suppliers SET save_path = ? WHERE company_id = ?', (save_path, company_id))
-                    
-                    conn.commit()
-                
-                conn.close()
+                # 如果成功提取到执照信息，自动保存到对应分类目录（会同步更新save_path）
+                if category_data and category_data[0]:
+                    category_id, category_name = category_data
+                    await self.save_single_supplier_to_category(company_id, company_name, licenses, license_info, category_id, category_name)
                 
                 return bool(licenses or license_info)
             else:
@@ -1914,34 +1675,27 @@ class AlibabaSupplierCrawler:
             self.update_extraction_failure(company_id, company_name)
             return False
     
-    def update_extraction_failure(self, company_id, company_name, max_failures=3):
-        """更新提取失败次数，超过阈值自动标记为跳过"""
+    def update_extraction_failure(self, company_id, company_name):
+        """更新提取失败次数，超过阈值自动标记为跳过
+        
+        交给提取结果汇集器攒批提交，立即返回Future，不阻塞调用方（包括事件循环）。
+        """
+        sink = get_extraction_sink(self.db_path)
+        
+        def on_done(future):
+            try:
+                if future.result():
+                    print(f"  - {company_name}: 失败次数达到{sink.max_failures}次，已自动标记为跳过提取")
+            except Exception as e:
+                print(f"更新失败次数时出错: {e}")
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # 更新失败次数和最后尝试时间
-            cursor.execute('''
-                UPDATE suppliers 
-                SET extraction_failed_count = COALESCE(extraction_failed_count, 0) + 1,
-                    last_extraction_attempt = CURRENT_TIMESTAMP
-                WHERE company_id = ?
-            ''', (company_id,))
-            
-            # 获取当前失败次数
-            cursor.execute('SELECT extraction_failed_count FROM suppliers WHERE company_id = ?', (company_id,))
-            result = cursor.fetchone()
-            
-            if result and result[0] >= max_failures:
-                # 超过失败阈值，自动标记为跳过
-                cursor.execute('UPDATE suppliers SET skip_extraction = TRUE WHERE company_id = ?', (company_id,))
-                print(f"  - {company_name}: 失败次数达到{max_failures}次，已自动标记为跳过提取")
-            
-            conn.commit()
-            conn.close()
-            
+            future = sink.add_failure(company_id)
         except Exception as e:
             print(f"更新失败次数时出错: {e}")
+            return None
+        future.add_done_callback(on_done)
+        return future
     
     async def extract_single_license(self, company_id, company_name, action_url, proxy=None, log_callback=None):
         """提取单个供应商的执照"""
@@ -1954,65 +1708,22 @@ class AlibabaSupplierCrawler:
             if html_content:
                 self.log(f"  - {company_name}: 成功获取页面", "SUCCESS", log_callback)
                 
-                # 提取执照图片
-                licenses = await self.extract_licenses_from_html(html_content)
-                
-                # 提取执照信息
-                license_info = self.extract_license_info_from_html(html_content)
+                # 一次扫描页面，提取执照图片和执照信息
+                parsed = await parse_page(html_content)
+                licenses = await self.extract_licenses_from_html(html_content, parsed)
+                license_info = self.extract_license_info_from_html(html_content, parsed)
                 
                 # 保存到数据库
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                # 先删除该供应商的旧记录
-                cursor.execute('DELETE FROM licenses WHERE supplier_id = ?', (company_id,))
-                cursor.execute('DELETE FROM license_info WHERE supplier_id = ?', (company_id,))
+                await get_extraction_sink(self.db_path).add_result_async(company_id, licenses, license_info)
                 
-                # 保存执照图片
                 if licenses:
-                    for license_item in licenses:
-                        cursor.execute('''
-                            INSERT INTO licenses (supplier_id, license_name, license_url, file_id)
-                            VALUES (?, ?, ?, ?)
-                        ''', (
-                            company_id,
-                            license_item['name'],
-                            license_item['url'],
-                            license_item['fileId']
-                        ))
                     print(f"  - {company_name}: 找到 {len(licenses)} 个执照图片")
-                
-                # 保存执照信息
                 if license_info:
-                    cursor.execute('''
-                        INSERT INTO license_info (
-                            supplier_id, registration_no, company_name, date_of_issue, 
-                            date_of_expiry, registered_capital, country_territory, 
-                            registered_address, year_established, legal_form, legal_representative
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        company_id,
-                        license_info.get('registration_no', ''),
-                        license_info.get('company_name', ''),
-                        license_info.get('date_of_issue', ''),
-                        license_info.get('date_of_expiry', ''),
-                        license_info.get('registered_capital', ''),
-                        license_info.get('country_territory', ''),
-                        license_info.get('registered_address', ''),
-                        license_info.get('year_established', ''),
-                        license_info.get('legal_form', ''),
-                        license_info.get('legal_representative', '')
-                    ))
                     print("执照信息已保存到数据库")
-                
-                # 如果成功提取到执照信息，标记为已获取
                 if licenses or license_info:
-                    cursor.execute('UPDATE suppliers SET license_extracted = TRUE WHERE company_id = ?', (company_id,))
+                    await self.cache_supplier_page(action_url, html_content)
                     print(f"  - {company_name}: 标记为已提取")
                 
-                conn.commit()
-                conn.close()
-                
                 return True
             else:
                 print(f"  - {company_name}: 获取页面失败")
@@ -2033,15 +1744,10 @@ class AlibabaSupplierCrawler:
             if html_content:
                 self.log(f"成功获取页面", "SUCCESS", log_callback)
                 
-                # 提取执照图片
-                licenses = await self.extract_licenses_from_html(html_content)
-                
-                # 提取执照信息
-                license_info = self.extract_license_info_from_html(html_content)
-                
-                # 获取或创建供应商记录
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
+                # 一次扫描页面，提取执照图片和执照信息
+                parsed = await parse_page(html_content)
+                licenses = await self.extract_licenses_from_html(html_content, parsed)
+                license_info = self.extract_license_info_from_html(html_content, parsed)
                 
                 # 尝试从URL中提取company_id
                 company_id = None
@@ -2056,68 +1762,37 @@ class AlibabaSupplierCrawler:
                 except:
                     company_id = str(hash(action_url) % 1000000000)
                 
-                # 检查是否已存在该供应商
-                cursor.execute('SELECT company_id, company_name FROM suppliers WHERE action_url = ?', (action_url,))
-                existing_supplier = cursor.fetchone()
-                
-                if existing_supplier:
-                    company_id, company_name = existing_supplier
-                else:
-                    # 创建新的供应商记录
-                    company_name = f"供应商_{company_id}"
-                    cursor.execute('''
-                        INSERT INTO suppliers (company_id, company_name, action_url, created_at)
-                        VALUES (?, ?, ?, ?)
-                    ''', (company_id, company_name, action_url, datetime.now()))
-                    conn.commit()
+                def save_recognized(conn, company_id):
+                    # 先按company_id查找（同一供应商可能通过不同URL访问），再按URL查找，都没有时创建新的供应商记录
+                    existing_supplier = (
+                        conn.execute('SELECT company_id, company_name FROM suppliers WHERE company_id = ?', (company_id,)).fetchone()
+                        or conn.execute('SELECT company_id, company_name FROM suppliers WHERE action_url = ?', (action_url,)).fetchone()
+                    )
+                    if existing_supplier:
+                        company_id, company_name = existing_supplier
+                    else:
+                        company_name = f"供应商_{company_id}"
+                        conn.execute('''
+                            INSERT INTO suppliers (company_id, company_name, action_url, created_at)
+                            VALUES (?, ?, ?, ?)
+                            ON CONFLICT(company_id) DO NOTHING
+                        ''', (company_id, company_name, action_url, datetime.now()))
+                    
+                    write_extraction_result(conn, company_id, licenses, license_info)
+                    # 标记为已提取
+                    conn.execute('UPDATE suppliers SET license_extracted = TRUE WHERE company_id = ?', (company_id,))
+                    return company_id, company_name
                 
-                # 先删除该供应商的旧记录
-                cursor.execute('DELETE FROM licenses WHERE supplier_id = ?', (company_id,))
-                cursor.execute('DELETE FROM license_info WHERE supplier_id = ?', (company_id,))
+                # 获取或创建供应商记录并保存识别结果
+                company_id, company_name = await get_writer(self.db_path).run_async(save_recognized, company_id)
+                if licenses or license_info:
+                    await self.cache_supplier_page(action_url, html_content)
                 
-                # 保存执照图片
                 if licenses:
-                    for license_item in licenses:
-                        cursor.execute('''
-                            INSERT INTO licenses (supplier_id, license_name, license_url, file_id)
-                            VALUES (?, ?, ?, ?)
-                        ''', (
-                            company_id,
-                            license_item['name'],
-                            license_item['url'],
-                            license_item['fileId']
-                        ))
                     print(f"找到 {len(licenses)} 个执照图片")
-                
-                # 保存执照信息
                 if license_info:
-                    cursor.execute('''
-                        INSERT INTO license_info (
-                            supplier_id, registration_no, company_name, date_of_issue, 
-                            date_of_expiry, registered_capital, country_territory, 
-                            registered_address, year_established, legal_form, legal_representative
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        company_id,
-                        license_info.get('registration_no', ''),
-                        license_info.get('company_name', ''),
-                        license_info.get('date_of_issue', ''),
-                        license_info.get('date_of_expiry', ''),
-                        license_info.get('registered_capital', ''),
-                        license_info.get('country_territory', ''),
-                        license_info.get('registered_address', ''),
-                        license_info.get('year_established', ''),
-                        license_info.get('legal_form', ''),
-                        license_info.get('legal_representative', '')
-                    ))
                     print("执照信息已保存到数据库")
                 
-                # 标记为已提取
-                cursor.execute('UPDATE suppliers SET license_extracted = TRUE WHERE company_id = ?', (company_id,))
-                
-                conn.commit()
-                conn.close()
-                
                 return {
                     'company_id': company_id,
                     'company_name': company_name,
@@ -2302,10 +1977,7 @@ class AlibabaSupplierCrawlerGUI:
                 self.log("启用执照图片提取功能")
             
             # 运行异步爬虫
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            suppliers = loop.run_until_complete(
+            suppliers = get_async_runner().run(
                 self.crawler.crawl_suppliers(keyword, pages, proxy, extract_licenses)
             )
             
@@ -2359,10 +2031,7 @@ class AlibabaSupplierCrawlerGUI:
                 self.log("不使用代理")
             
             # 运行异步提取
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            result = loop.run_until_complete(
+            result = get_async_runner().run(
                 self.crawler.extract_licenses_from_database(proxy)
             )
             
@@ -2384,5 +2053,7 @@ class AlibabaSupplierCrawlerGUI:
         self.root.mainloop()
 
 if __name__ == "__main__":
+    # 打包后的程序启动解析子进程时需要
+    multiprocessing.freeze_support()
     app = AlibabaSupplierCrawlerGUI()
     app.run()
\ No newline at end of file
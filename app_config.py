@@ -0,0 +1,107 @@
+"""
+config.json 配置读取
+
+爬虫、数据库连接和HTTP客户端的配置都在 config.json 中，按段落（crawler、database、http）
+与这里的默认值合并。config.json 只读取一次，结果缓存；reload=True 时重新读取。
+
+    load_section('database')     # {配置项: 值}，返回副本，可以随意修改
+    load_crawler_config()        # 即 load_section('crawler')
+"""
+
+import json
+import os
+import threading
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.json')
+
+# config.json 缺省时使用的各段配置
+DEFAULT_CONFIG = {
+    'crawler': {
+        'page_concurrency': 4,       # 单个关键词/分类同时在途的搜索结果页数
+        'max_concurrent_requests': 8,  # 一键爬取时所有关键词合计同时在途的请求数
+        'host_min_interval': 0.2,    # 同一主机相邻请求的最小间隔（秒），即每秒请求数上限的倒数
+        'host_burst': 2,             # 同一主机允许的突发请求数
+        'host_min_rate': 0.2,        # 限流退避时同一主机的最低速率（次/秒）
+        'slow_response_threshold': 5.0,  # 响应慢于多少秒时降速
+        'retry_base_delay': 1.0,     # 请求失败后首次重试的等待（秒），之后指数增长
+        'retry_max_delay': 30.0,     # 重试等待上限（秒）
+        'ip_check_interval': 60,     # 代理出口IP的后台检测间隔（秒）
+        'incremental_stop_pages': 2,  # 增量爬取：连续多少页都是已知供应商时停止翻页
+        'response_cache_mode': 'use',  # 响应缓存模式：use（读写）、refresh（只写不读）、bypass（不用缓存）
+        'response_cache_path': 'http_cache.db',  # 响应缓存文件
+        'response_cache_ttl': 86400,  # 缓存有效期（秒）
+        'response_cache_api_ttl': 600,  # 搜索接口响应的缓存有效期（秒），0 表示不读缓存，搜索结果总是重新请求
+        'response_cache_max_mb': 512,  # 缓存大小上限（MB），超出时淘汰最久未访问的响应
+        'image_probe_concurrency': 10,  # 单个页面同时探测大小的执照候选图片数
+        'pipeline_fetch_workers': 8,  # 执照提取流水线：同时请求供应商页面的数量
+        'pipeline_parse_workers': 2,  # 执照提取流水线：解析页面的工作协程数
+        'pipeline_probe_workers': 4,  # 执照提取流水线：同时探测候选图片的供应商数
+        'pipeline_save_workers': 4,  # 执照提取流水线：同时下载执照图片、写入分类目录的供应商数
+        'pipeline_write_workers': 2,  # 执照提取流水线：提交结果的工作协程数
+        'pipeline_queue_size': 16,   # 执照提取流水线：阶段之间队列的容量
+        'parse_pool_enabled': False,  # 在子进程中解析供应商页面（不占用事件循环）
+        'parse_pool_size': 0,        # 解析进程数，0 表示CPU核数
+        'extraction_retry_base_delay': 600,  # 执照提取失败后首次重试的等待（秒），之后每次失败翻倍
+        'extraction_retry_max_delay': 86400,  # 执照提取重试等待上限（秒）
+        'extraction_retry_jitter': 0.2,  # 重试等待的随机浮动比例，避免同一批失败的供应商同时到期
+        'loop_monitor': False,       # 调试：检测阻塞后台事件循环的回调
+        'loop_block_threshold': 0.1,  # 调试：回调阻塞超过多少秒时报告
+    },
+    'database': {
+        'max_connections': 4,        # 读连接池保留的空闲连接数
+        'timeout': 30,               # 连接超时（秒）
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': 10000,         # 页缓存（正数为页数，负数为KB）
+        'temp_store': 'memory',
+        'busy_timeout': 30000,       # 毫秒
+        'mmap_size': 268435456,      # 内存映射大小（字节），0表示关闭
+    },
+    'http': {
+        'limit': 100,              # 连接池总连接数上限
+        'limit_per_host': 8,       # 每个主机的连接数上限
+        'ttl_dns_cache': 300,      # DNS缓存时间（秒）
+        'keepalive_timeout': 30,   # 空闲连接保持时间（秒）
+        'total_timeout': 30,       # 单个请求总超时（秒）
+        'connect_timeout': 10,     # 建立连接超时（秒）
+        'sync_pool_size': 20,      # 同步会话缓存的主机连接池数（每个池最多保留 limit_per_host 个连接）
+    },
+}
+
+# 读取失败时的提示
+_SECTION_NAMES = {'crawler': '爬虫', 'database': '数据库', 'http': 'HTTP'}
+
+_file_cache = None
+_file_lock = threading.Lock()
+
+
+def _load_file(reload=False):
+    """读取整个 config.json（结果缓存），读取失败时返回 None"""
+    global _file_cache
+    with _file_lock:
+        if _file_cache is None or reload:
+            data = {}
+            try:
+                if os.path.exists(CONFIG_FILE):
+                    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+            except Exception as e:
+                print(f"读取配置文件失败，使用默认配置: {e}")
+            _file_cache = data
+        return _file_cache
+
+
+def load_section(section, reload=False):
+    """读取 config.json 的一段配置（与默认值合并）"""
+    config = dict(DEFAULT_CONFIG.get(section, {}))
+    value = _load_file(reload).get(section, {})
+    if isinstance(value, dict):
+        config.update(value)
+    else:
+        print(f"{_SECTION_NAMES.get(section, section)}配置格式不正确，使用默认配置")
+    return config
+
+
+def load_crawler_config(reload=False):
+    """读取 config.json 的 crawler 配置（与默认值合并）"""
+    return load_section('crawler', reload)
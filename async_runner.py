@@ -0,0 +1,103 @@
+"""
+长期运行的后台事件循环
+
+GUI 的按钮回调运行在 Tk 主线程中，不能直接运行协程。以前每个任务都
+new_event_loop() 一次，循环、会话和连接池随任务创建又销毁。
+AsyncRunner 在一个后台线程中常驻一个事件循环，任何线程都可以把协程
+提交给它执行：
+
+    runner = get_async_runner()
+    future = runner.submit(coro)      # 返回 concurrent.futures.Future
+    result = runner.run(coro)         # 阻塞等待结果（不要在Tk主线程中调用）
+
+config.json 的 crawler 配置中 loop_monitor 为 true 时，后台事件循环启动
+LoopMonitor，报告阻塞循环超过 loop_block_threshold 秒的回调。
+"""
+
+import asyncio
+import atexit
+import threading
+
+from app_config import load_crawler_config
+from http_client import close_loop_session
+from loop_monitor import LoopMonitor
+
+
+class AsyncRunner:
+    """在后台线程中常驻的事件循环"""
+
+    def __init__(self, name="async-runner"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+        self.monitor = None
+        crawler_config = load_crawler_config()
+        if crawler_config['loop_monitor']:
+            self.monitor = LoopMonitor(self.loop, crawler_config['loop_block_threshold'])
+            self.monitor.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """提交协程，立即返回 concurrent.futures.Future"""
+        if self.loop.is_closed():
+            raise RuntimeError("后台事件循环已关闭")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """提交协程并阻塞等待结果"""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("不能在后台事件循环线程中同步等待协程")
+        return self.submit(coro).result(timeout)
+
+    def close(self, timeout=5):
+        """取消未完成的任务，在本循环中关闭共享的 aiohttp 会话，然后停止事件循环"""
+        if self.loop.is_closed():
+            return
+        if self.monitor is not None:
+            self.monitor.stop()
+
+        async def shutdown():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # 会话和连接池绑定本循环，必须在循环停止前关闭
+            await close_loop_session()
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout)
+        except Exception:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_async_runner():
+    """获取全局共享的后台事件循环（不存在时创建）"""
+    global _runner
+    with _runner_lock:
+        if _runner is None or _runner.loop.is_closed():
+            _runner = AsyncRunner()
+        return _runner
+
+
+def close_async_runner():
+    """关闭全局后台事件循环"""
+    global _runner
+    with _runner_lock:
+        runner, _runner = _runner, None
+    if runner is not None:
+        runner.close()
+
+
+atexit.register(close_async_runner)
@@ -0,0 +1,192 @@
+"""
+一键爬取调度器
+
+在同一个事件循环里、使用全局共享的 HTTP 会话并发爬取多个关键词：
+- keyword_concurrency  同时进行的关键词数（对话框中的"并发线程数"）
+- max_requests         所有关键词合计同时在途的页面请求上限
+- start_interval       相邻两个关键词开始的最小间隔（对话框中的"关键词间隔"）
+
+所有关键词共用全局的主机节奏控制器（request_pacer），同一主机的请求节奏不随关键词数量放大。
+每完成一页回调 progress_callback(已完成页数, 总页数)，每个关键词完成时
+在日志中输出该关键词的结果和累计吞吐量。总页数按 crawl_page_counts 中
+记录的各关键词实际页数规划，没有记录的关键词按用户填写的范围计算。
+
+每个（关键词, 页码）是 crawl_frontier 中的一个工作单元。同样的关键词和页面范围
+再次启动时跳过上次已完成的页面和关键词；stop() 之后不再请求新的页面。
+"""
+
+import asyncio
+import time
+
+from app_config import load_crawler_config
+from crawl_frontier import CrawlFrontier
+from crawl_plan import get_page_counts
+from db_pool import get_read_connection
+from http_client import get_http_client
+from request_pacer import get_host_pacer
+from response_cache import get_response_cache
+
+
+class BatchCrawlScheduler:
+    """多关键词并发爬取调度"""
+
+    def __init__(self, crawler, keyword_concurrency=3, max_requests=None, log_callback=None, progress_callback=None):
+        crawler_config = load_crawler_config()
+        self.crawler = crawler
+        self.keyword_concurrency = max(1, keyword_concurrency)
+        self.max_requests = max_requests or crawler_config['max_concurrent_requests']
+        self.log_callback = log_callback
+        self.progress_callback = progress_callback
+
+        self.pages_done = 0
+        self.total_pages = 0
+        self.suppliers_found = 0
+        self.keywords_done = 0
+        self.keywords_failed = 0
+        self.frontier = None
+        self._started_at = None
+
+    def log(self, message, level="INFO"):
+        if self.log_callback:
+            self.log_callback(message, level)
+        else:
+            print(message)
+
+    def get_stats(self):
+        """获取累计吞吐量统计"""
+        elapsed = max(time.time() - self._started_at, 1e-6) if self._started_at else 0
+        return {
+            'keywords_done': self.keywords_done,
+            'keywords_failed': self.keywords_failed,
+            'pages_done': self.pages_done,
+            'total_pages': self.total_pages,
+            'suppliers': self.suppliers_found,
+            'elapsed': round(elapsed, 1),
+            'pages_per_min': round(self.pages_done * 60 / elapsed, 1) if elapsed else 0,
+            'suppliers_per_sec': round(self.suppliers_found / elapsed, 2) if elapsed else 0,
+        }
+
+    def format_stats(self):
+        stats = self.get_stats()
+        return (f"累计 {stats['pages_done']}/{stats['total_pages']} 页，{stats['suppliers']} 个供应商，"
+                f"耗时 {stats['elapsed']} 秒（{stats['pages_per_min']} 页/分钟，{stats['suppliers_per_sec']} 个供应商/秒）")
+
+    def plan_pages(self, keywords, start_page, end_page):
+        """按已记录的页数规划每个关键词要爬取的页数，返回 {关键词: 页数}"""
+        page_counts = {}
+        try:
+            conn = get_read_connection(self.crawler.db_path)
+            try:
+                page_counts = get_page_counts(conn, 'keyword', keywords)
+            finally:
+                conn.close()
+        except Exception as e:
+            self.log(f"读取已记录的页数失败，按填写的页面范围计算: {e}", "WARNING")
+
+        planned = {}
+        for keyword in keywords:
+            last_page = min(end_page, page_counts.get(keyword, end_page))
+            planned[keyword] = max(0, last_page - start_page + 1)
+        return planned
+
+    def stop(self):
+        """停止爬取：不再请求新的页面，在途页面处理完后结束（可在任意线程调用）"""
+        if self.frontier is not None:
+            self.frontier.stop()
+
+    async def run(self, keywords, start_page, end_page, proxy=None, skip_duplicates=True,
+                  save_to_file=False, cache_file=None, start_interval=0, incremental=False):
+        """并发爬取所有关键词，返回累计统计（incremental=True 时各关键词按增量模式爬取）"""
+        planned_pages = self.plan_pages(keywords, start_page, end_page)
+        self.total_pages = sum(planned_pages.values())
+        requested_pages = max(0, end_page - start_page + 1) * len(keywords)
+        if self.total_pages < requested_pages:
+            self.log(f"按已记录的页数规划: 共 {self.total_pages} 页（填写的范围为 {requested_pages} 页）", "INFO")
+
+        # 写入工作单元；上次同样的任务未完成时跳过已完成的页面
+        self.frontier = frontier = CrawlFrontier(self.crawler.db_path, 'keyword', keywords, start_page, end_page)
+        await frontier.plan({keyword: start_page + pages - 1 for keyword, pages in planned_pages.items()})
+        finished_keywords = set()
+        for keyword in keywords:
+            done = sum(1 for page in frontier.finished_pages(keyword) if page < start_page + planned_pages[keyword])
+            self.pages_done += done
+            planned_pages[keyword] -= done
+            if done and not planned_pages[keyword]:
+                finished_keywords.add(keyword)
+        if frontier.resumed:
+            self.log(f"继续上次未完成的一键爬取: 已完成 {self.pages_done}/{self.total_pages} 页，"
+                     f"{len(finished_keywords)} 个关键词已爬完", "INFO")
+            if self.progress_callback:
+                self.progress_callback(self.pages_done, self.total_pages)
+        self._started_at = time.time()
+
+        keyword_semaphore = asyncio.Semaphore(self.keyword_concurrency)
+        request_semaphore = asyncio.Semaphore(self.max_requests)
+        # 关键词之间的启动间隔：按调用顺序预约开始时间（预约时没有 await，协程之间不会交错）
+        loop = asyncio.get_running_loop()
+        next_start = loop.time()
+
+        async def wait_start_slot():
+            nonlocal next_start
+            now = loop.time()
+            start_at = max(now, next_start)
+            next_start = start_at + max(0, start_interval)
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+
+        # 同时在途的请求数由 request_semaphore 限制，连接池使用全局共享会话
+        session = get_http_client().session()
+
+        async def crawl_keyword(index, keyword):
+            if keyword in finished_keywords:
+                self.keywords_done += 1
+                return 0
+            async with keyword_semaphore:
+                if frontier.stopped:
+                    return 0
+                await wait_start_slot()
+                self.log(f"[{index}/{len(keywords)}] 开始爬取关键词: {keyword}", "INFO")
+                keyword_pages = 0
+
+                def on_page(page, supplier_count):
+                    nonlocal keyword_pages
+                    keyword_pages += 1
+                    if keyword_pages > planned_pages[keyword]:
+                        # 结果数比上次记录的多，实际页数超出规划
+                        self.total_pages += 1
+                    self.pages_done += 1
+                    self.suppliers_found += supplier_count
+                    if self.progress_callback:
+                        self.progress_callback(self.pages_done, self.total_pages)
+
+                try:
+                    suppliers = await self.crawler.crawl_suppliers_range(
+                        keyword, start_page, end_page, proxy, skip_duplicates=skip_duplicates,
+                        log_callback=self.log_callback, save_to_file=save_to_file, cache_file=cache_file,
+                        session=session, request_semaphore=request_semaphore, page_callback=on_page,
+                        incremental=incremental, frontier=frontier, raise_errors=True
+                    )
+                except Exception as e:
+                    self.keywords_failed += 1
+                    self.log(f"关键词 '{keyword}' 爬取失败: {e}", "ERROR")
+                    return 0
+                finally:
+                    # 失败或实际页数少于规划时补齐未完成的页数，保证进度条能走完
+                    self.pages_done += max(0, planned_pages[keyword] - keyword_pages)
+                    if self.progress_callback:
+                        self.progress_callback(self.pages_done, self.total_pages)
+
+                self.keywords_done += 1
+                self.log(f"关键词 '{keyword}' 爬取完成，获取 {len(suppliers)} 个供应商"
+                         f"（{self.keywords_done + self.keywords_failed}/{len(keywords)}）；{self.format_stats()}", "SUCCESS")
+                return len(suppliers)
+
+        await asyncio.gather(*(crawl_keyword(i, keyword) for i, keyword in enumerate(keywords, 1)))
+        if frontier.stopped:
+            self.log("一键爬取已停止，再次启动同样的关键词和页面范围时从未完成的页面继续", "WARNING")
+
+        self.log(f"一键爬取统计: 成功 {self.keywords_done} 个关键词，失败 {self.keywords_failed} 个；{self.format_stats()}", "SUCCESS")
+        self.log(get_http_client().format_stats(), "INFO")
+        self.log(get_host_pacer().format_stats(), "INFO")
+        self.log(get_response_cache().format_stats(), "INFO")
+        return self.get_stats()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+执照页面解析吞吐量对比
+
+对同一批供应商页面分别运行原来的解析方式（10次未编译 re.search + re.findall + 尺寸后缀嵌套循环）
+和 license_parser.parse_license_page（预编译正则，字段和图片各扫描一次），输出 MB/s、页/s，并核对两者结果一致。
+
+    python bench_license_parser.py [语料] [轮数]
+
+语料可以是保存了 .html/.htm 页面的目录，也可以是响应缓存文件 http_cache.db（取其中的HTML页面）；
+不指定时使用响应缓存，缓存中没有页面时生成模拟页面。
+"""
+
+import os
+import random
+import re
+import sqlite3
+import sys
+import time
+import zlib
+
+from license_parser import parse_license_page
+
+LEGACY_SIZES = ['_50x50', '_80x80', '_100x100', '_120x120', '_200x200', '_250x250', '_350x350']
+
+
+def legacy_parse(html_content):
+    """原来的解析方式（去掉了日志输出），返回 (执照信息, 候选图片)"""
+    info_patterns = {
+        'registration_no': r'<span>Registration No\.</span>\s*:\s*([^<]+)',
+        'company_name': r'<span>Company Name</span>\s*:\s*([^<]+)',
+        'date_of_issue': r'<span>Date of Issue</span>\s*:\s*([^<]+)',
+        'date_of_expiry': r'<span>Date of Expiry</span>\s*:\s*([^<]+)',
+        'registered_capital': r'<span>Registered Capital</span>\s*:\s*([^<]+)',
+        'country_territory': r'<span>Country/Territory</span>\s*:\s*([^<]+)',
+        'registered_address': r'<span>Registered address</span>\s*:\s*([^<]+)',
+        'year_established': r'<span>Year Established</span>\s*:\s*([^<]+)',
+        'legal_form': r'<span>Legal Form</span>\s*:\s*([^<]+)',
+        'legal_representative': r'<span>Legal Representative</span>\s*:\s*([^<]+)'
+    }
+    license_info = {}
+    for field, pattern in info_patterns.items():
+        match = re.search(pattern, html_content)
+        license_info[field] = match.group(1).strip() if match else ''
+    if not any(license_info.values()):
+        license_info = None
+
+    unique_urls = {}
+    for file_id in re.findall(r'https://sc04\.alicdn\.com/kf/([^"]+\.(?:jpg|png))', html_content):
+        base_name = file_id
+        file_ext = file_id.split('.')[-1]
+        if '_' in file_id and any(size in file_id for size in LEGACY_SIZES):
+            for size in LEGACY_SIZES:
+                if file_id.endswith(size + '.' + file_ext):
+                    base_name = file_id.replace(size + '.' + file_ext, '.' + file_ext)
+                    break
+        if not any(size in base_name for size in LEGACY_SIZES):
+            unique_urls[base_name] = (f"https://sc04.alicdn.com/kf/{base_name}", base_name, file_ext)
+    return license_info, list(unique_urls.values())
+
+
+def new_parse(html_content):
+    parsed = parse_license_page(html_content)
+    return parsed.license_info, parsed.images
+
+
+def load_directory(path):
+    pages = []
+    for name in sorted(os.listdir(path)):
+        if name.lower().endswith(('.html', '.htm')):
+            with open(os.path.join(path, name), 'r', encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+    return pages
+
+
+def load_response_cache(path):
+    """从响应缓存中取出HTML页面（JSON接口响应跳过）"""
+    pages = []
+    conn = sqlite3.connect(path)
+    try:
+        for (body,) in conn.execute('SELECT body FROM responses'):
+            text = zlib.decompress(body).decode('utf-8', errors='replace')
+            if text.lstrip()[:1] == '<':
+                pages.append(text)
+    finally:
+        conn.close()
+    return pages
+
+
+def synthetic_pages(count=50, seed=1):
+    """生成结构类似供应商详情页的模拟页面（没有保存的页面时使用）"""
+    rng = random.Random(seed)
+    filler = ''.join(f'<div class="item-{i}"><a href="https://www.alibaba.com/p/{i}">product {i}</a></div>' for i in range(400))
+    pages = []
+    for n in range(count):
+        images = []
+        for i in range(rng.randint(10, 40)):
+            file_id = f"H{rng.getrandbits(64):016x}"
+            images.append(f'<img src="https://sc04.alicdn.com/kf/{file_id}.jpg">')
+            images.append(f'<img src="https://sc04.alicdn.com/kf/{file_id}_{rng.choice(["50x50", "120x120", "350x350"])}.jpg">')
+        fields = ''.join(
+            f'<li><span>{label}</span>: value {n}-{i}</li>'
+            for i, label in enumerate(['Registration No.', 'Company Name', 'Date of Issue', 'Registered Capital',
+                                       'Country/Territory', 'Registered address', 'Legal Form'])
+        ) if n % 4 else ''
+        pages.append(f'<html><head><title>supplier {n}</title></head><body>{filler}{"".join(images)}{fields}{filler}</body></html>')
+    return pages
+
+
+def bench(parse, pages, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for html in pages:
+            parse(html)
+    return time.perf_counter() - started
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else 'http_cache.db'
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    pages = []
+    if os.path.isdir(source):
+        pages = load_directory(source)
+    elif os.path.isfile(source):
+        pages = load_response_cache(source)
+    if pages:
+        print(f"语料: {source}，{len(pages)} 个页面")
+    else:
+        pages = synthetic_pages()
+        print(f"没有找到保存的页面（{source}），使用 {len(pages)} 个模拟页面")
+
+    total_mb = sum(len(html.encode('utf-8')) for html in pages) / 1024 / 1024
+    mismatches = sum(1 for html in pages if legacy_parse(html) != new_parse(html))
+    print(f"语料大小 {total_mb:.2f} MB，轮数 {rounds}，结果不一致的页面: {mismatches}")
+
+    results = {}
+    for name, parse in (('原解析', legacy_parse), ('新解析', new_parse)):
+        elapsed = bench(parse, pages, rounds)
+        results[name] = elapsed
+        print(f"{name}: {total_mb * rounds / elapsed:8.2f} MB/s  {len(pages) * rounds / elapsed:10.1f} 页/s  "
+              f"（耗时 {elapsed:.3f} 秒）")
+    print(f"提速 {results['原解析'] / results['新解析']:.2f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 
 import sqlite3
 
+from supplier_stats import get_supplier_stats
+
 def check_database():
     try:
         print("正在连接数据库...")
@@ -15,15 +17,28 @@ def check_database():
         tables = cursor.fetchall()
         
         print(f"数据库中共有 {len(tables)} 个表:")
+        has_stats = any(table[0] == 'supplier_stats' for table in tables)
         for i, table in enumerate(tables, 1):
             table_name = table[0]
             print(f"{i}. {table_name}")
             
             try:
-                # 获取记录数
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                count = cursor.fetchone()[0]
-                print(f"   记录数: {count}")
+                # 获取记录数（suppliers表读取触发器维护的计数表，不做全表扫描）
+                if table_name == 'suppliers' and has_stats:
+                    stats = get_supplier_stats(conn)
+                    print(f"   记录数: {stats.get(('all', ''), 0)}")
+                    print(f"   已提取执照: {stats.get(('license_extracted', '1'), 0)}，"
+                          f"待提取: {stats.get(('extract_state', 'pending'), 0)}，"
+                          f"跳过提取: {stats.get(('skip_extraction', '1'), 0)}")
+                    print(f"   已使用: {stats.get(('is_used', '1'), 0)}，未使用: {stats.get(('is_used', '0'), 0)}")
+                    ocr_counts = {value: count for (dimension, value), count in stats.items() if dimension == 'ocr_status'}
+                    print(f"   OCR状态: {ocr_counts}")
+                    category_count = sum(1 for dimension, value in stats if dimension == 'category_id' and value)
+                    print(f"   分类数: {category_count}")
+                else:
+                    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+                    count = cursor.fetchone()[0]
+                    print(f"   记录数: {count}")
                 
                 # 如果是license_info表，检查地址相关字段
                 if table_name == 'license_info':
@@ -0,0 +1,25 @@
+"""
+测试公用的夹具：每个测试使用临时目录中已执行全部迁移的数据库
+"""
+
+import pytest
+
+from db_migrations import run_migrations
+from db_pool import connect, get_read_pool
+from db_writer import close_all_writers
+from extraction_sink import close_all_sinks
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """已执行全部迁移的临时数据库；测试结束后关闭汇集器、写线程和读连接"""
+    path = str(tmp_path / 'test.db')
+    conn = connect(path, isolation_level=None)
+    try:
+        run_migrations(conn)
+    finally:
+        conn.close()
+    yield path
+    close_all_sinks()
+    close_all_writers()
+    get_read_pool(path).close_all()
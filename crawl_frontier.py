@@ -0,0 +1,148 @@
+"""
+可恢复的爬取工作单元（crawl_frontier 表）
+
+以前一键爬取或分类爬取中途崩溃/停止后，无法知道哪些（关键词或分类, 页码）已经完成，
+只能全部重新爬取。现在每次爬取先把工作单元写入 crawl_frontier 表：
+
+- run_id 由目标类型、目标列表和页面范围决定，同样的任务再次启动时得到同一个 run_id
+- 上次的任务还有未完成的单元时继续（已完成的页面不再请求），全部完成时重新开始一轮
+- 请求某页前 claim()（状态改为 in_progress，尝试次数加1），处理成功后 complete()，
+  失败后 fail()；崩溃时停在 in_progress 的单元下次视为未完成
+- 失败次数达到 max_attempts 的单元视为放弃，不再阻止开始新一轮
+- 按结果总数收缩范围、遇到空页或增量爬取停止后，finish() 把之后的单元标为 skipped
+- stop() 之后不再领取新的单元，在途页面处理完后结束，下次启动时从未完成的页面继续
+
+所有写操作通过写线程执行。
+"""
+
+import hashlib
+import json
+
+from db_writer import get_writer
+
+STATUS_PENDING = 'pending'
+STATUS_IN_PROGRESS = 'in_progress'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+STATUS_SKIPPED = 'skipped'
+
+# 已结束的单元：完成、跳过、或失败次数已达上限
+_FINISHED_SQL = "(status IN ('done', 'skipped') OR (status = 'failed' AND attempts >= ?))"
+
+
+def make_run_id(target_type, targets, start_page, end_page):
+    """同样的目标和页面范围得到同样的 run_id（目标顺序无关）"""
+    payload = json.dumps([target_type, sorted(str(target) for target in targets), start_page, end_page], ensure_ascii=False)
+    return f"{target_type}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _plan_units(conn, run_id, target_type, units, start_page, max_attempts):
+    """写线程命令：上一轮已全部结束时清空重来，然后补充本次规划的单元，返回 (是否继续上一轮, 已结束的单元)"""
+    total, unfinished = conn.execute(f'''
+        SELECT COUNT(*), COALESCE(SUM(CASE WHEN {_FINISHED_SQL} THEN 0 ELSE 1 END), 0)
+        FROM crawl_frontier WHERE run_id = ?
+    ''', (max_attempts, run_id)).fetchone()
+    if total and not unfinished:
+        conn.execute('DELETE FROM crawl_frontier WHERE run_id = ?', (run_id,))
+
+    conn.executemany('''
+        INSERT OR IGNORE INTO crawl_frontier (run_id, target_type, target, page)
+        VALUES (?, ?, ?, ?)
+    ''', [(run_id, target_type, str(target), page)
+          for target, last_page in units.items()
+          for page in range(start_page, last_page + 1)])
+
+    finished = conn.execute(f'''
+        SELECT target, page FROM crawl_frontier WHERE run_id = ? AND {_FINISHED_SQL}
+    ''', (run_id, max_attempts)).fetchall()
+    return bool(unfinished), finished
+
+
+def _claim_unit(conn, run_id, target_type, target, page):
+    conn.execute('''
+        INSERT INTO crawl_frontier (run_id, target_type, target, page, status, attempts, claimed_at)
+        VALUES (?, ?, ?, ?, 'in_progress', 1, CURRENT_TIMESTAMP)
+        ON CONFLICT(run_id, target_type, target, page) DO UPDATE SET
+            status = 'in_progress',
+            attempts = attempts + 1,
+            claimed_at = CURRENT_TIMESTAMP
+    ''', (run_id, target_type, target, page))
+
+
+def _finish_unit(conn, run_id, target_type, target, page, status, error):
+    conn.execute('''
+        UPDATE crawl_frontier SET status = ?, last_error = ?, finished_at = CURRENT_TIMESTAMP
+        WHERE run_id = ? AND target_type = ? AND target = ? AND page = ?
+    ''', (status, error, run_id, target_type, target, page))
+
+
+def _skip_after(conn, run_id, target_type, target, last_page):
+    conn.execute('''
+        UPDATE crawl_frontier SET status = 'skipped', finished_at = CURRENT_TIMESTAMP
+        WHERE run_id = ? AND target_type = ? AND target = ? AND page > ?
+          AND status IN ('pending', 'in_progress', 'failed')
+    ''', (run_id, target_type, target, last_page))
+
+
+class CrawlFrontier:
+    """一次爬取任务的工作单元（一个目标类型、多个目标、同一页面范围）"""
+
+    def __init__(self, db_path, target_type, targets, start_page, end_page, max_attempts=3):
+        self.db_path = db_path
+        self.target_type = target_type
+        self.targets = list(targets)
+        self.start_page = start_page
+        self.end_page = end_page
+        self.max_attempts = max_attempts
+        self.run_id = make_run_id(target_type, self.targets, start_page, end_page)
+        self.resumed = False
+        self.stopped = False
+        self._finished = {}   # 目标 -> 已结束的页码集合
+
+    async def plan(self, last_pages=None):
+        """写入工作单元。last_pages 为 {目标: 规划的最后一页}，缺省时每个目标都规划到 end_page；返回是否继续上一轮"""
+        if last_pages is None:
+            last_pages = {target: self.end_page for target in self.targets}
+        units = {str(target): last_page for target, last_page in last_pages.items()}
+        resumed, finished = await get_writer(self.db_path).run_async(
+            _plan_units, self.run_id, self.target_type, units, self.start_page, self.max_attempts)
+        self.resumed = resumed
+        self._finished = {}
+        for target, page in finished:
+            self._finished.setdefault(target, set()).add(page)
+        return resumed
+
+    def finished_pages(self, target):
+        """某个目标已结束（完成或跳过）的页码集合"""
+        return self._finished.get(str(target), set())
+
+    @property
+    def finished_count(self):
+        return sum(len(pages) for pages in self._finished.values())
+
+    async def claim(self, target, page):
+        """领取一个单元，已停止时返回 False"""
+        if self.stopped:
+            return False
+        await get_writer(self.db_path).run_async(_claim_unit, self.run_id, self.target_type, str(target), page)
+        return True
+
+    async def complete(self, target, page):
+        self._finished.setdefault(str(target), set()).add(page)
+        await get_writer(self.db_path).run_async(
+            _finish_unit, self.run_id, self.target_type, str(target), page, STATUS_DONE, None)
+
+    async def fail(self, target, page, error=None):
+        await get_writer(self.db_path).run_async(
+            _finish_unit, self.run_id, self.target_type, str(target), page, STATUS_FAILED,
+            str(error)[:500] if error else None)
+
+    async def finish(self, target, last_page):
+        """目标爬完：last_page 之后未完成的单元标为跳过（已停止时不处理，保留给下次继续）"""
+        if self.stopped:
+            return
+        await get_writer(self.db_path).run_async(_skip_after, self.run_id, self.target_type, str(target), last_page)
+
+    def stop(self):
+        """不再领取新的单元"""
+        self.stopped = True
@@ -0,0 +1,161 @@
+"""
+搜索结果页数规划
+
+搜索接口的第一页响应里带有结果总数（关键词搜索 model.pagination.totalCount，
+分类搜索 data.page.totalCount）。以前只把它写进日志，仍然一直请求到用户填的
+结束页，后面全是空页。这里提供：
+
+- PageRange         可以在爬取过程中收缩的页码范围：按总数换算出真实页数后
+                    clamp()，遇到空页后 stop_before()，尚未发出的页面不再请求
+- record_page_count 把关键词/分类的总数和页数写入 crawl_page_counts 表
+- get_page_counts   读取已记录的页数，一键爬取时据此规划每个关键词的实际页数
+- record_seen_ids   把每页见到的供应商写入 crawl_seen 表（每次爬取都记录）
+- KnownPageTracker  增量爬取时判断页面是否全是已知供应商，连续若干页都是
+                    已知供应商时给出停止翻页的位置
+
+已记录的页数只用于规划进度，实际范围仍以本次第一页响应中的总数为准，
+结果数增长时不会漏掉新增的页面。增量爬取的停止页数读取 config.json 的
+crawler 配置：
+    "crawler": {"incremental_stop_pages": 2}
+"""
+
+from db_writer import get_writer
+
+DEFAULT_PAGE_SIZE = 20
+
+
+def page_count_from_total(total_count, page_size=DEFAULT_PAGE_SIZE):
+    """按结果总数和每页条数计算页数"""
+    page_size = max(1, int(page_size or DEFAULT_PAGE_SIZE))
+    return (max(0, int(total_count)) + page_size - 1) // page_size
+
+
+def parse_pagination(info, page_size=DEFAULT_PAGE_SIZE):
+    """从分页信息中取出 (结果总数, 每页条数)，没有总数时返回 None"""
+    if not isinstance(info, dict) or info.get('totalCount') is None:
+        return None
+    try:
+        total_count = int(info['totalCount'])
+        page_size = int(info.get('pageSize') or page_size)
+    except (TypeError, ValueError):
+        return None
+    return total_count, page_size
+
+
+class PageRange:
+    """爬取过程中可以收缩的页码范围（供 fetch_pages 逐页取用）"""
+
+    def __init__(self, start_page, end_page, skip=None):
+        self.start_page = start_page
+        self.end_page = end_page
+        self.last_page = end_page
+        self.skip = set(skip or ())   # 不需要请求的页码（上次已完成的页面）
+
+    def __iter__(self):
+        page = self.start_page
+        while page <= self.last_page:
+            if page not in self.skip:
+                yield page
+            page += 1
+
+    def clamp(self, page_count):
+        """按真实页数收缩范围，返回范围是否发生变化"""
+        if page_count is None or page_count >= self.last_page:
+            return False
+        self.last_page = page_count
+        return True
+
+    def stop_before(self, page):
+        """不再请求 page 及之后的页面（遇到空页时调用）"""
+        self.last_page = min(self.last_page, page - 1)
+
+    @property
+    def page_total(self):
+        return max(0, self.last_page - self.start_page + 1)
+
+
+def save_page_count(conn, target_type, target, total_count, page_size):
+    """写入关键词/分类的结果总数和页数（写线程命令）"""
+    conn.execute('''
+        INSERT INTO crawl_page_counts (target_type, target, total_count, page_size, page_count, updated_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(target_type, target) DO UPDATE SET
+            total_count = excluded.total_count,
+            page_size = excluded.page_size,
+            page_count = excluded.page_count,
+            updated_at = excluded.updated_at
+    ''', (target_type, str(target), total_count, page_size, page_count_from_total(total_count, page_size)))
+
+
+async def record_page_count(db_path, target_type, target, total_count, page_size):
+    """通过写线程记录页数"""
+    await get_writer(db_path).run_async(save_page_count, target_type, target, total_count, page_size)
+
+
+def get_page_counts(conn, target_type, targets):
+    """读取已记录的页数，返回 {目标: 页数}（没有记录的目标不在结果中）"""
+    targets = [str(target) for target in targets]
+    if not targets:
+        return {}
+    placeholders = ', '.join(['?'] * len(targets))
+    rows = conn.execute(f'''
+        SELECT target, page_count FROM crawl_page_counts
+        WHERE target_type = ? AND target IN ({placeholders})
+    ''', [target_type] + targets).fetchall()
+    return {target: page_count for target, page_count in rows}
+
+
+def load_seen_ids(conn, target_type, target):
+    """读取某个关键词/分类以前见到的供应商ID集合"""
+    rows = conn.execute(
+        'SELECT company_id FROM crawl_seen WHERE target_type = ? AND target = ?',
+        (target_type, str(target))
+    ).fetchall()
+    return {row[0] for row in rows}
+
+
+def save_seen_ids(conn, target_type, target, company_ids):
+    """记录一页中见到的供应商（写线程命令）"""
+    conn.executemany('''
+        INSERT INTO crawl_seen (target_type, target, company_id)
+        VALUES (?, ?, ?)
+        ON CONFLICT(target_type, target, company_id) DO UPDATE SET
+            last_seen_at = CURRENT_TIMESTAMP
+    ''', [(target_type, str(target), str(company_id)) for company_id in company_ids])
+
+
+async def record_seen_ids(db_path, target_type, target, company_ids):
+    """通过写线程记录见到的供应商"""
+    company_ids = [company_id for company_id in company_ids if company_id]
+    if company_ids:
+        await get_writer(db_path).run_async(save_seen_ids, target_type, target, company_ids)
+
+
+class KnownPageTracker:
+    """增量爬取：连续 stop_pages 页都是已知供应商时停止翻页
+
+    页面并发抓取、完成顺序不定，所以按页码记录"全是已知供应商"的页面，
+    只有页码连续的一段达到 stop_pages 页才停止。
+    """
+
+    def __init__(self, seen_ids, stop_pages=2):
+        self.seen_ids = set(seen_ids)
+        self.stop_pages = max(1, int(stop_pages))
+        self.known_pages = set()
+
+    def add_page(self, page, company_ids):
+        """记录一页的供应商，返回 (新供应商数, 停止页码)；不需要停止时停止页码为 None"""
+        company_ids = [str(company_id) for company_id in company_ids if company_id]
+        new_count = sum(1 for company_id in company_ids if company_id not in self.seen_ids)
+        if not company_ids or new_count:
+            return new_count, None
+
+        self.known_pages.add(page)
+        first = last = page
+        while first - 1 in self.known_pages:
+            first -= 1
+        while last + 1 in self.known_pages:
+            last += 1
+        if last - first + 1 >= self.stop_pages:
+            return 0, last + 1
+        return 0, None
@@ -0,0 +1,556 @@
+"""
+数据库版本化迁移
+
+schema_version 表记录已执行的迁移版本，启动时只执行尚未执行过的迁移，
+不再在每次刷新列表时反复 PRAGMA table_info + ALTER TABLE。
+
+新增迁移：在 MIGRATIONS 末尾追加 (版本号, 说明, 函数)，版本号必须递增，
+已发布的迁移不要再修改。迁移函数返回 MIGRATION_DEFERRED 表示当前环境无法执行
+（例如 SQLite 版本过低），不记录版本号，下次启动时再尝试。
+"""
+
+import sqlite3
+import time
+
+from supplier_metrics import backfill_metrics
+from supplier_stats import STAT_COLUMNS, rebuild_supplier_stats, stats_upsert_sql
+
+# 迁移函数返回该值时不记录版本号，下次启动时重新执行
+MIGRATION_DEFERRED = 'deferred'
+
+
+def _column_names(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _add_column_if_missing(conn, table, column, definition):
+    """旧库兼容：字段不存在时添加"""
+    if column not in _column_names(conn, table):
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        print(f"已添加{column}字段到{table}表")
+
+
+# 合并重复供应商时取各条记录最大值的状态字段（重新爬取的新记录这些字段是0，不能覆盖已提取/已使用）
+_MERGE_MAX_COLUMNS = ('license_extracted', 'is_used', 'skip_extraction', 'extraction_failed_count')
+
+# 按 suppliers.id 引用供应商的子表字段，合并时改指向保留的记录
+_SUPPLIER_CHILD_COLUMNS = (('licenses', 'supplier_id'), ('license_info', 'supplier_id'),
+                           ('company_registration', 'supplier_id'))
+
+
+def _merge_duplicate_suppliers(conn):
+    """把同一company_id的多条记录合并到id最小的一条，返回 {company_id: 合并掉的记录数}
+
+    每个字段取最新（id最大）的一条中的非空值，状态字段取最大值；子表中引用被删除记录的行
+    改指向保留的记录，然后删除其余记录。company_id 为空（NULL 或空字符串）的记录不是同一个
+    供应商，不合并。
+    """
+    duplicates = conn.execute('''
+        SELECT company_id FROM suppliers
+        WHERE company_id IS NOT NULL AND company_id != ''
+        GROUP BY company_id HAVING COUNT(*) > 1
+    ''').fetchall()
+    if not duplicates:
+        return {}
+
+    columns = [column for column in _column_names(conn, 'suppliers') if column not in ('id', 'company_id', 'created_at')]
+    merged = {}
+    for (company_id,) in duplicates:
+        rows = conn.execute(f'''
+            SELECT id, {', '.join(columns)} FROM suppliers WHERE company_id = ? ORDER BY id DESC
+        ''', (company_id,)).fetchall()
+        values = {}
+        for index, column in enumerate(columns, 1):
+            present = [row[index] for row in rows if row[index] is not None]
+            if not present:
+                continue
+            values[column] = max(present) if column in _MERGE_MAX_COLUMNS else present[0]
+        keep_id = min(row[0] for row in rows)
+        removed_ids = [row[0] for row in rows if row[0] != keep_id]
+        if values:
+            conn.execute(f'''
+                UPDATE suppliers SET {', '.join(f"{column} = ?" for column in values)} WHERE id = ?
+            ''', list(values.values()) + [keep_id])
+        placeholders = ', '.join(['?'] * len(removed_ids))
+        for table, column in _SUPPLIER_CHILD_COLUMNS:
+            conn.execute(f'UPDATE {table} SET {column} = ? WHERE {column} IN ({placeholders})', [keep_id] + removed_ids)
+        conn.executemany('DELETE FROM suppliers WHERE id = ?', [(supplier_id,) for supplier_id in removed_ids])
+        merged[company_id] = len(rows) - 1
+    return merged
+
+
+def migration_001_base_schema(conn):
+    """基础表结构（兼容迁移机制引入之前创建的旧库）"""
+    # 创建供应商表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS suppliers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            company_id TEXT,
+            company_name TEXT,
+            action_url TEXT,
+            country_code TEXT,
+            city TEXT,
+            gold_years TEXT,
+            verified_supplier BOOLEAN,
+            is_factory BOOLEAN,
+            review_score TEXT,
+            review_count INTEGER,
+            company_on_time_shipping TEXT,
+            factory_size_text TEXT,
+            total_employees_text TEXT,
+            transaction_count_6months TEXT,
+            transaction_gmv_6months_text TEXT,
+            gold_supplier BOOLEAN,
+            trade_assurance BOOLEAN,
+            response_time TEXT,
+            category_id TEXT,
+            category_name TEXT,
+            save_path TEXT,
+            license_extracted BOOLEAN DEFAULT FALSE,
+            is_used BOOLEAN DEFAULT FALSE,
+            extraction_failed_count INTEGER DEFAULT 0,
+            skip_extraction BOOLEAN DEFAULT FALSE,
+            last_extraction_attempt TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # 创建执照图片表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS licenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            supplier_id INTEGER,
+            license_name TEXT,
+            license_url TEXT,
+            file_id TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (supplier_id) REFERENCES suppliers (id)
+        )
+    ''')
+
+    # 创建执照信息表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS license_info (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            supplier_id INTEGER,
+            registration_no TEXT,
+            company_name TEXT,
+            date_of_issue TEXT,
+            date_of_expiry TEXT,
+            registered_capital TEXT,
+            country_territory TEXT,
+            registered_address TEXT,
+            year_established TEXT,
+            legal_form TEXT,
+            legal_representative TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (supplier_id) REFERENCES suppliers (id)
+        )
+    ''')
+
+    # 创建公司注册信息表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS company_registration (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            profile_id VARCHAR(100) NOT NULL,
+            supplier_id VARCHAR(100) NOT NULL,
+            registration_number VARCHAR(50) NOT NULL,
+            company_name VARCHAR(200) NOT NULL,
+            registered_address TEXT,
+            province VARCHAR(50),
+            city VARCHAR(50),
+            district VARCHAR(50),
+            zip_code VARCHAR(10),
+            address_parsed BOOLEAN DEFAULT FALSE,
+            license_url TEXT,
+            legal_representative VARCHAR(100),
+            issue_date DATE,
+            expiration_date DATE,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(supplier_id, registration_number)
+        )
+    ''')
+
+    # 创建代理配置表
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS proxies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            host TEXT NOT NULL,
+            port INTEGER NOT NULL,
+            username TEXT,
+            password TEXT,
+            is_active BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # 旧库缺少的字段（原先散落在init_database和列表刷新中的ALTER TABLE）
+    _add_column_if_missing(conn, 'suppliers', 'category_id', 'TEXT')
+    _add_column_if_missing(conn, 'suppliers', 'category_name', 'TEXT')
+    _add_column_if_missing(conn, 'suppliers', 'save_path', 'TEXT')
+    _add_column_if_missing(conn, 'suppliers', 'license_extracted', 'BOOLEAN DEFAULT FALSE')
+    _add_column_if_missing(conn, 'suppliers', 'is_used', 'BOOLEAN DEFAULT FALSE')
+    _add_column_if_missing(conn, 'suppliers', 'extraction_failed_count', 'INTEGER DEFAULT 0')
+    _add_column_if_missing(conn, 'suppliers', 'skip_extraction', 'BOOLEAN DEFAULT FALSE')
+    _add_column_if_missing(conn, 'suppliers', 'last_extraction_attempt', 'TIMESTAMP')
+    _add_column_if_missing(conn, 'suppliers', 'ocr_recognition_status', "TEXT DEFAULT 'pending'")
+    _add_column_if_missing(conn, 'company_registration', 'address_parsed', 'BOOLEAN DEFAULT FALSE')
+    _add_column_if_missing(conn, 'company_registration', 'license_url', 'TEXT')
+
+    # company_id唯一索引：去重检查走索引，并支持INSERT OR IGNORE批量入库
+    index_exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_suppliers_company_id'"
+    ).fetchone()
+    if not index_exists:
+        # 旧库可能存在重复的company_id（skip_duplicates=False时写入），合并后再建唯一索引；
+        # 空字符串的company_id改为NULL（唯一索引允许多个NULL）
+        conn.execute("UPDATE suppliers SET company_id = NULL WHERE company_id = ''")
+        merged = _merge_duplicate_suppliers(conn)
+        if merged:
+            print(f"已合并 {sum(merged.values())} 条重复的供应商记录: "
+                  + "，".join(f"{company_id}（{count} 条）" for company_id, count in merged.items()))
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_suppliers_company_id ON suppliers(company_id)')
+
+    # 为company_registration表创建索引
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_supplier_id ON company_registration(supplier_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_registration_number ON company_registration(registration_number)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_company_name ON company_registration(company_name)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_province_city ON company_registration(province, city)')
+
+    # 创建触发器，自动更新updated_at字段
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS update_company_registration_timestamp
+            AFTER UPDATE ON company_registration
+            FOR EACH ROW
+        BEGIN
+            UPDATE company_registration
+            SET updated_at = CURRENT_TIMESTAMP
+            WHERE id = NEW.id;
+        END
+    ''')
+
+    # 插入默认代理配置（如果表为空）
+    if conn.execute('SELECT COUNT(*) FROM proxies').fetchone()[0] == 0:
+        conn.execute('''
+            INSERT INTO proxies (name, host, port, username, password, is_active)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', ('默认代理', '127.0.0.1', 7890, 't15395136610470', 'Aa123456', True))
+
+
+def migration_002_query_indexes(conn):
+    """状态字段去NULL，并为爬虫和GUI的查询添加二级索引"""
+    # 状态字段统一为0/1，查询条件不再需要 "OR ... IS NULL"，才能走索引
+    conn.execute('UPDATE suppliers SET license_extracted = 0 WHERE license_extracted IS NULL')
+    conn.execute('UPDATE suppliers SET skip_extraction = 0 WHERE skip_extraction IS NULL')
+    conn.execute('UPDATE suppliers SET is_used = 0 WHERE is_used IS NULL')
+    conn.execute('UPDATE suppliers SET extraction_failed_count = 0 WHERE extraction_failed_count IS NULL')
+    conn.execute("UPDATE suppliers SET ocr_recognition_status = 'pending' WHERE ocr_recognition_status IS NULL")
+
+    # 由 (ocr_recognition_status, created_at) 取代
+    conn.execute('DROP INDEX IF EXISTS idx_ocr_recognition_status')
+
+    # 执照详情查询、删除旧记录、OCR选择的JOIN（覆盖license_url）
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_licenses_supplier_url ON licenses(supplier_id, license_url)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_license_info_supplier_id ON license_info(supplier_id)')
+
+    # 按URL识别执照时查找已有供应商；按名称编辑/删除/标记
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_action_url ON suppliers(action_url)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_company_name ON suppliers(company_name)')
+
+    # 提取队列：未提取且未跳过，按创建时间倒序
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_suppliers_extract_queue
+        ON suppliers(license_extracted, skip_extraction, created_at)
+    ''')
+
+    # OCR选择：未使用且待识别的供应商，带company_id用于JOIN licenses
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_suppliers_ocr_queue
+        ON suppliers(is_used, ocr_recognition_status, company_id)
+    ''')
+
+    # 数据库列表各Tab的过滤 + ORDER BY created_at DESC
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_created_at ON suppliers(created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_extracted_created ON suppliers(license_extracted, created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_used_created ON suppliers(is_used, created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_skip_created ON suppliers(skip_extraction, created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_ocr_created ON suppliers(ocr_recognition_status, created_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_category_created ON suppliers(category_id, created_at)')
+
+    # OCR结果列表按创建时间排序
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_company_registration_created_at ON company_registration(created_at)')
+
+    conn.execute('ANALYZE')
+
+
+def migration_003_supplier_stats(conn):
+    """状态计数表 supplier_stats，由 suppliers 上的触发器维护"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS supplier_stats (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, value)
+        ) WITHOUT ROWID
+    ''')
+
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS suppliers_stats_insert
+            AFTER INSERT ON suppliers
+            FOR EACH ROW
+        BEGIN{stats_upsert_sql('NEW', 1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS suppliers_stats_delete
+            AFTER DELETE ON suppliers
+            FOR EACH ROW
+        BEGIN{stats_upsert_sql('OLD', -1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS suppliers_stats_update
+            AFTER UPDATE OF {', '.join(STAT_COLUMNS)} ON suppliers
+            FOR EACH ROW
+        BEGIN{stats_upsert_sql('OLD', -1)}{stats_upsert_sql('NEW', 1)}
+        END
+    ''')
+
+    rebuild_supplier_stats(conn)
+
+
+def migration_004_fulltext_search(conn):
+    """FTS5 trigram 全文索引（公司名称、注册地址、法人），由触发器与原表同步"""
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        print(f"SQLite {sqlite3.sqlite_version} 不支持trigram分词，搜索将使用LIKE查询（升级后下次启动时创建全文索引）")
+        return MIGRATION_DEFERRED
+
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS suppliers_fts USING fts5(
+            company_name,
+            content='suppliers', content_rowid='id', tokenize='trigram'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS suppliers_fts_insert AFTER INSERT ON suppliers BEGIN
+            INSERT INTO suppliers_fts (rowid, company_name) VALUES (NEW.id, NEW.company_name);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS suppliers_fts_delete AFTER DELETE ON suppliers BEGIN
+            INSERT INTO suppliers_fts (suppliers_fts, rowid, company_name) VALUES ('delete', OLD.id, OLD.company_name);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS suppliers_fts_update AFTER UPDATE OF company_name ON suppliers BEGIN
+            INSERT INTO suppliers_fts (suppliers_fts, rowid, company_name) VALUES ('delete', OLD.id, OLD.company_name);
+            INSERT INTO suppliers_fts (rowid, company_name) VALUES (NEW.id, NEW.company_name);
+        END
+    ''')
+
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS company_registration_fts USING fts5(
+            company_name, registered_address, legal_representative,
+            content='company_registration', content_rowid='id', tokenize='trigram'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS company_registration_fts_insert AFTER INSERT ON company_registration BEGIN
+            INSERT INTO company_registration_fts (rowid, company_name, registered_address, legal_representative)
+            VALUES (NEW.id, NEW.company_name, NEW.registered_address, NEW.legal_representative);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS company_registration_fts_delete AFTER DELETE ON company_registration BEGIN
+            INSERT INTO company_registration_fts (company_registration_fts, rowid, company_name, registered_address, legal_representative)
+            VALUES ('delete', OLD.id, OLD.company_name, OLD.registered_address, OLD.legal_representative);
+        END
+    ''')
+    # 只在索引字段变化时同步（updated_at 触发器的更新不会触发）
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS company_registration_fts_update
+            AFTER UPDATE OF company_name, registered_address, legal_representative ON company_registration
+        BEGIN
+            INSERT INTO company_registration_fts (company_registration_fts, rowid, company_name, registered_address, legal_representative)
+            VALUES ('delete', OLD.id, OLD.company_name, OLD.registered_address, OLD.legal_representative);
+            INSERT INTO company_registration_fts (rowid, company_name, registered_address, legal_representative)
+            VALUES (NEW.id, NEW.company_name, NEW.registered_address, NEW.legal_representative);
+        END
+    ''')
+
+    # 为已有数据建立索引
+    conn.execute("INSERT INTO suppliers_fts (suppliers_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO company_registration_fts (company_registration_fts) VALUES ('rebuild')")
+
+
+def migration_005_supplier_metrics(conn):
+    """评分、发货率、成交量、成交额、年限、员工数的数值字段及范围查询索引"""
+    _add_column_if_missing(conn, 'suppliers', 'review_score_value', 'REAL')
+    _add_column_if_missing(conn, 'suppliers', 'on_time_shipping_rate', 'REAL')
+    _add_column_if_missing(conn, 'suppliers', 'transaction_count_value', 'INTEGER')
+    _add_column_if_missing(conn, 'suppliers', 'transaction_gmv_min', 'REAL')
+    _add_column_if_missing(conn, 'suppliers', 'transaction_gmv_max', 'REAL')
+    _add_column_if_missing(conn, 'suppliers', 'gold_years_value', 'INTEGER')
+    _add_column_if_missing(conn, 'suppliers', 'employees_min', 'INTEGER')
+    _add_column_if_missing(conn, 'suppliers', 'employees_max', 'INTEGER')
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_review_score_value ON suppliers(review_score_value)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_on_time_shipping_rate ON suppliers(on_time_shipping_rate)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_transaction_count_value ON suppliers(transaction_count_value)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_transaction_gmv ON suppliers(transaction_gmv_min, transaction_gmv_max)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_gold_years_value ON suppliers(gold_years_value)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_suppliers_employees ON suppliers(employees_min, employees_max)')
+
+    # 已有数据在数据库内批量解析回填
+    updated = backfill_metrics(conn)
+    if updated:
+        print(f"已回填 {updated} 条供应商的数值指标")
+
+
+def migration_006_crawl_page_counts(conn):
+    """每个关键词/分类的搜索结果总数和页数，供后续爬取规划页面范围"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_page_counts (
+            target_type TEXT NOT NULL,
+            target TEXT NOT NULL,
+            total_count INTEGER NOT NULL,
+            page_size INTEGER NOT NULL,
+            page_count INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (target_type, target)
+        ) WITHOUT ROWID
+    ''')
+
+
+def migration_007_crawl_seen(conn):
+    """每个关键词/分类最近一次爬取时见到的供应商，增量爬取据此判断页面是否全是已知供应商"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_seen (
+            target_type TEXT NOT NULL,
+            target TEXT NOT NULL,
+            company_id TEXT NOT NULL,
+            first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (target_type, target, company_id)
+        ) WITHOUT ROWID
+    ''')
+
+
+def migration_008_crawl_frontier(conn):
+    """一键爬取/分类爬取的工作单元（目标 + 页码），中断后据此从未完成的页面继续"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS crawl_frontier (
+            run_id TEXT NOT NULL,
+            target_type TEXT NOT NULL,
+            target TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            claimed_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            PRIMARY KEY (run_id, target_type, target, page)
+        ) WITHOUT ROWID
+    ''')
+
+
+def migration_009_image_meta(conn):
+    """执照候选图片的大小和类型（按 fileId），重复提取时不再逐个发 HEAD 请求"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS image_meta (
+            file_id TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            status INTEGER NOT NULL,
+            file_size INTEGER,
+            content_type TEXT,
+            checked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    ''')
+
+
+def migration_010_extraction_retry(conn):
+    """提取失败后的下次重试时间，待提取查询只选择已到期的供应商"""
+    _add_column_if_missing(conn, 'suppliers', 'next_attempt_at', 'TIMESTAMP')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_suppliers_retry_queue
+        ON suppliers(license_extracted, skip_extraction, next_attempt_at)
+    ''')
+
+    # 已有的失败记录按上次尝试时间和失败次数回填：固定按 600 * 2^(失败次数-1) 秒、最多一天，不加抖动
+    # （迁移不读取配置，同一个数据库什么时候迁移结果都相同）
+    rows = conn.execute('''
+        SELECT company_id, extraction_failed_count, last_extraction_attempt FROM suppliers
+        WHERE license_extracted = 0 AND skip_extraction = 0
+          AND extraction_failed_count > 0 AND last_extraction_attempt IS NOT NULL
+    ''').fetchall()
+    conn.executemany('''
+        UPDATE suppliers SET next_attempt_at = datetime(?, ?) WHERE company_id = ?
+    ''', [(last_attempt, f"+{min(600 * 2 ** (failures - 1), 86400)} seconds", company_id)
+          for company_id, failures, last_attempt in rows])
+
+
+# 按版本号顺序排列的迁移列表
+MIGRATIONS = [
+    (1, '基础表结构', migration_001_base_schema),
+    (2, '查询索引', migration_002_query_indexes),
+    (3, '状态计数表', migration_003_supplier_stats),
+    (4, '全文搜索索引', migration_004_fulltext_search),
+    (5, '供应商数值指标', migration_005_supplier_metrics),
+    (6, '搜索结果页数', migration_006_crawl_page_counts),
+    (7, '增量爬取已见供应商', migration_007_crawl_seen),
+    (8, '爬取工作单元', migration_008_crawl_frontier),
+    (9, '图片大小缓存', migration_009_image_meta),
+    (10, '提取失败重试时间', migration_010_extraction_retry),
+]
+
+
+def get_schema_version(conn):
+    """获取当前数据库的迁移版本（没有schema_version表时为0）"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def run_migrations(conn):
+    """执行所有未执行的迁移，返回执行的迁移数量
+
+    conn 需为自动提交模式（isolation_level=None），每个迁移在独立的事务中执行，
+    失败时回滚该迁移并抛出异常。
+    """
+    applied = 0
+    get_schema_version(conn)
+    # 按已记录的版本集合判断（推迟的迁移没有记录，之后的迁移可能已执行）
+    done = {row[0] for row in conn.execute('SELECT version FROM schema_version')}
+
+    for version, description, migrate in MIGRATIONS:
+        if version in done:
+            continue
+
+        started = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # 获取写锁后再次确认，避免多个进程重复执行同一迁移
+            if conn.execute('SELECT 1 FROM schema_version WHERE version = ?', (version,)).fetchone():
+                conn.execute('COMMIT')
+                continue
+            if migrate(conn) == MIGRATION_DEFERRED:
+                conn.execute('COMMIT')
+                continue
+            conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)', (version, description))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        applied += 1
+        print(f"数据库迁移 {version:03d} ({description}) 完成，耗时 {time.time() - started:.2f} 秒")
+
+    return applied
@@ -0,0 +1,149 @@
+"""
+数据库连接工厂与读连接池
+
+统一读取 config.json 中的 database 配置（app_config.load_section），所有模块使用同一套 PRAGMA：
+- connect()          创建一个应用了统一 PRAGMA 的新连接（写线程、建表等使用）
+- get_read_connection() 从读连接池借出一个只读连接，close() 时归还而不是断开
+
+读连接设置 query_only，写操作统一交给 db_writer 的写线程。
+"""
+
+import os
+import sqlite3
+import threading
+
+from app_config import load_section
+
+
+def apply_pragmas(conn, config=None, read_only=False):
+    """对连接应用统一的 PRAGMA 配置"""
+    config = config or load_section('database')
+    conn.execute(f"PRAGMA busy_timeout={int(config['busy_timeout'])}")
+    # journal_mode 是数据库文件级别的设置，只读连接不去修改它
+    if not read_only and config.get('journal_mode'):
+        conn.execute(f"PRAGMA journal_mode={config['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous={config['synchronous']}")
+    conn.execute(f"PRAGMA cache_size={int(config['cache_size'])}")
+    conn.execute(f"PRAGMA temp_store={config['temp_store']}")
+    conn.execute(f"PRAGMA mmap_size={int(config['mmap_size'])}")
+    if read_only:
+        conn.execute('PRAGMA query_only=1')
+    return conn
+
+
+def connect(db_path, read_only=False, **kwargs):
+    """创建应用统一 PRAGMA 的数据库连接"""
+    config = load_section('database')
+    kwargs.setdefault('timeout', config['timeout'])
+    conn = sqlite3.connect(db_path, **kwargs)
+    return apply_pragmas(conn, config, read_only)
+
+
+class PooledConnection:
+    """读连接池借出的连接，close() 时归还到连接池"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    @property
+    def raw_connection(self):
+        """底层的 sqlite3.Connection（供 pandas 等需要原生连接的库使用）"""
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._pool._release(self._conn)
+            self._conn = None
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("连接已归还到连接池")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # row_factory 等属性设置到底层连接上
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ReadPool:
+    """只读连接池：复用连接，空闲连接数不超过 max_connections"""
+
+    def __init__(self, db_path, max_connections=None):
+        self.db_path = db_path
+        self.max_connections = max_connections or load_section('database')['max_connections']
+        self._idle = []
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, row_factory=None):
+        """借出一个读连接"""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                self.reused += 1
+        if conn is None:
+            # 连接会在不同线程间复用，但同一时刻只被一个借用者使用
+            conn = connect(self.db_path, read_only=True, check_same_thread=False)
+            with self._lock:
+                self.created += 1
+        conn.row_factory = row_factory
+        return PooledConnection(self, conn)
+
+    def _release(self, conn):
+        try:
+            # 结束可能未结束的读事务，避免长期持有WAL快照
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.max_connections:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        """关闭所有空闲连接"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_read_pool(db_path):
+    """获取指定数据库的读连接池（不存在时创建）"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ReadPool(db_path)
+            _pools[key] = pool
+        return pool
+
+
+def get_read_connection(db_path, row_factory=None):
+    """从连接池借出一个只读连接，用完调用 close() 归还"""
+    return get_read_pool(db_path).acquire(row_factory)
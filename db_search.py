@@ -0,0 +1,109 @@
+"""
+供应商全文搜索
+
+基于 FTS5 trigram 分词的外部内容索引（见 db_migrations.migration_004_fulltext_search）：
+- suppliers_fts             suppliers.company_name
+- company_registration_fts  company_registration 的 company_name / registered_address / legal_representative
+
+trigram 按连续3个字符建索引，中文公司名、地址可以直接做子串匹配，结果按 bm25 排序。
+关键词不足3个字符（如"深圳"）时 trigram 无法使用索引，退回 LIKE 子串查询；
+数据库中没有FTS表（旧库未迁移或SQLite不支持trigram）时同样退回 LIKE。
+"""
+
+# trigram 分词要求的最短关键词长度
+MIN_TRIGRAM_LENGTH = 3
+
+# 默认最多返回的结果数
+DEFAULT_SEARCH_LIMIT = 500
+
+
+def has_fulltext_index(conn):
+    """数据库中是否已建立全文索引"""
+    row = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('suppliers_fts', 'company_registration_fts')"
+    ).fetchone()
+    return row[0] == 2
+
+
+def build_match_query(keyword):
+    """把关键词转换为 FTS5 短语查询（整个关键词作为一个子串匹配），无法使用索引时返回 None"""
+    keyword = keyword.strip()
+    if len(keyword) < MIN_TRIGRAM_LENGTH:
+        return None
+    return '"' + keyword.replace('"', '""') + '"'
+
+
+def _like_pattern(keyword):
+    escaped = keyword.strip().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def search_supplier_ids(conn, keyword, filter_sql="", limit=DEFAULT_SEARCH_LIMIT):
+    """按公司名称及其注册信息（名称、地址、法人）搜索供应商
+
+    filter_sql 为作用于 suppliers 表（别名 s）的附加过滤条件，
+    返回按相关度排序的 suppliers.id 列表。
+    """
+    filter_clause = f" AND ({filter_sql})" if filter_sql else ""
+    match_query = build_match_query(keyword)
+
+    if match_query and has_fulltext_index(conn):
+        # 两个索引的命中合并后按最好的 bm25 分数排序（分数越小越相关），公司名称权重更高
+        rows = conn.execute(f'''
+            WITH hits(id, score) AS (
+                SELECT rowid, bm25(suppliers_fts)
+                FROM suppliers_fts WHERE suppliers_fts MATCH ?
+                UNION ALL
+                SELECT CAST(cr.supplier_id AS INTEGER), bm25(company_registration_fts, 2.0, 1.0, 1.0)
+                FROM company_registration_fts
+                JOIN company_registration cr ON cr.id = company_registration_fts.rowid
+                WHERE company_registration_fts MATCH ?
+            )
+            SELECT s.id FROM hits
+            JOIN suppliers s ON s.id = hits.id
+            WHERE 1 = 1{filter_clause}
+            GROUP BY s.id
+            ORDER BY MIN(hits.score), s.created_at DESC
+            LIMIT ?
+        ''', (match_query, match_query, limit)).fetchall()
+    else:
+        pattern = _like_pattern(keyword)
+        rows = conn.execute(f'''
+            SELECT s.id FROM suppliers s
+            WHERE (s.company_name LIKE ? ESCAPE '\\'
+                   OR s.id IN (
+                       SELECT CAST(supplier_id AS INTEGER) FROM company_registration
+                       WHERE company_name LIKE ? ESCAPE '\\'
+                          OR registered_address LIKE ? ESCAPE '\\'
+                          OR legal_representative LIKE ? ESCAPE '\\'
+                   )){filter_clause}
+            ORDER BY s.created_at DESC
+            LIMIT ?
+        ''', (pattern, pattern, pattern, pattern, limit)).fetchall()
+
+    return [row[0] for row in rows]
+
+
+def search_registration_ids(conn, keyword, limit=DEFAULT_SEARCH_LIMIT):
+    """搜索公司注册信息，返回按相关度排序的 company_registration.id 列表"""
+    match_query = build_match_query(keyword)
+
+    if match_query and has_fulltext_index(conn):
+        rows = conn.execute('''
+            SELECT rowid FROM company_registration_fts
+            WHERE company_registration_fts MATCH ?
+            ORDER BY bm25(company_registration_fts, 2.0, 1.0, 1.0)
+            LIMIT ?
+        ''', (match_query, limit)).fetchall()
+    else:
+        pattern = _like_pattern(keyword)
+        rows = conn.execute('''
+            SELECT id FROM company_registration
+            WHERE company_name LIKE ? ESCAPE '\\'
+               OR registered_address LIKE ? ESCAPE '\\'
+               OR legal_representative LIKE ? ESCAPE '\\'
+            ORDER BY created_at DESC
+            LIMIT ?
+        ''', (pattern, pattern, pattern, limit)).fetchall()
+
+    return [row[0] for row in rows]
@@ -1,9 +1,10 @@
-import sqlite3
 import pandas as pd
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 import os
+from db_pool import get_read_connection
+from db_search import search_supplier_ids
 
 class DatabaseViewer:
     def __init__(self):
@@ -132,10 +133,10 @@ class DatabaseViewer:
         if selected_db:
             self.load_data(selected_db)
     
-    def load_data(self, db_path):
-        """加载数据库数据"""
+    def load_data(self, db_path, supplier_ids=None):
+        """加载数据库数据（传入supplier_ids时只显示这些供应商，并按其顺序排列）"""
         try:
-            conn = sqlite3.connect(db_path)
+            conn = get_read_connection(db_path)
             
             # 检查suppliers表是否存在
             cursor = conn.cursor()
@@ -145,7 +146,10 @@ class DatabaseViewer:
                 return
             
             # 获取供应商数据和执照图片数据
-            query = """
+            where_clause = ""
+            if supplier_ids is not None:
+                where_clause = f"WHERE s.id IN ({','.join('?' * len(supplier_ids))})" if supplier_ids else "WHERE 0"
+            query = f"""
                 SELECT s.id, s.company_id, s.company_name, s.action_url, s.created_at,
                        COUNT(l.id) as license_count,
                        GROUP_CONCAT(l.license_url, '|') as license_urls,
@@ -153,10 +157,15 @@ class DatabaseViewer:
                 FROM suppliers s
                 LEFT JOIN licenses l ON s.company_id = l.supplier_id
                 LEFT JOIN license_info li ON s.company_id = li.supplier_id
+                {where_clause}
                 GROUP BY s.id, s.company_id, s.company_name, s.action_url, s.created_at
                 ORDER BY s.created_at DESC
             """
-            df = pd.read_sql_query(query, conn)
+            df = pd.read_sql_query(query, conn.raw_connection, params=list(supplier_ids or []))
+            if supplier_ids:
+                # 搜索结果按相关度排序
+                rank = {supplier_id: i for i, supplier_id in enumerate(supplier_ids)}
+                df = df.sort_values('id', key=lambda ids: ids.map(rank)).reset_index(drop=True)
             
             conn.close()
             
@@ -231,55 +240,14 @@ class DatabaseViewer:
             return
         
         try:
-            conn = sqlite3.connect(selected_db)
-            cursor = conn.cursor()
-            
-            # 获取表名
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-            if not tables:
-                return
-            
-            table_name = tables[0][0]
-            
-            # 搜索查询
-            query = f"""
-            SELECT * FROM {table_name} 
-            WHERE product_id LIKE ? OR shop_name LIKE ? OR detail_url LIKE ?
-            """
-            
-            search_pattern = f"%{keyword}%"
-            cursor.execute(query, (search_pattern, search_pattern, search_pattern))
-            results = cursor.fetchall()
-            
-            # 获取列名
-            cursor.execute(f"PRAGMA table_info({table_name})")
-            columns = [col[1] for col in cursor.fetchall()]
-            
-            # 清空表格
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            
-            # 填充搜索结果
-            for row in results:
-                values = []
-                for i, col in enumerate(columns):
-                    if col == 'created_at':
-                        try:
-                            dt = datetime.fromisoformat(row[i].replace('Z', '+00:00'))
-                            values.append(dt.strftime('%Y-%m-%d %H:%M:%S'))
-                        except:
-                            values.append(str(row[i]))
-                    elif col in ['trade_assurance', 'gold_supplier', 'assessed_supplier']:
-                        values.append('是' if row[i] else '否')
-                    else:
-                        values.append(str(row[i]) if row[i] is not None else '')
-                
-                self.tree.insert('', 'end', values=values)
-            
+            # 全文索引按相关度搜索公司名称、注册地址和法人
+            conn = get_read_connection(selected_db)
+            supplier_ids = search_supplier_ids(conn, keyword)
             conn.close()
             
-            messagebox.showinfo("搜索结果", f"找到 {len(results)} 条匹配记录")
+            self.load_data(selected_db, supplier_ids)
+            
+            messagebox.showinfo("搜索结果", f"找到 {len(supplier_ids)} 条匹配记录")
             
         except Exception as e:
             messagebox.showerror("错误", f"搜索失败: {e}")
@@ -305,7 +273,7 @@ class DatabaseViewer:
             )
             
             if file_path:
-                conn = sqlite3.connect(selected_db)
+                conn = get_read_connection(selected_db)
                 cursor = conn.cursor()
                 
                 # 获取表名
@@ -317,7 +285,7 @@ class DatabaseViewer:
                 table_name = tables[0][0]
                 
                 # 读取数据
-                df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
+                df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn.raw_connection)
                 
                 # 导出到Excel
                 df.to_excel(file_path, index=False)
@@ -360,8 +328,8 @@ class DatabaseViewer:
         
         # 在新线程中执行提取
         import threading
-        import asyncio
         from alibaba_supplier_crawler import AlibabaSupplierCrawler
+        from async_runner import get_async_runner
         
         def run_extract():
             try:
@@ -377,10 +345,7 @@ class DatabaseViewer:
                 }
                 
                 # 运行异步提取
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                result = loop.run_until_complete(
+                result = get_async_runner().run(
                     crawler.extract_single_license(company_id, company_name, action_url, proxy)
                 )
                 
@@ -409,7 +374,7 @@ class DatabaseViewer:
         company_name = values[2]
         
         # 从数据库获取执照图片信息和执照信息
-        conn = sqlite3.connect(self.db_var.get())
+        conn = get_read_connection(self.db_var.get())
         cursor = conn.cursor()
         
         # 获取执照图片
@@ -509,8 +474,8 @@ class DatabaseViewer:
             # 导入PIL用于图片处理
             try:
                 from PIL import Image, ImageTk
-                import requests
                 from io import BytesIO
+                from request_pacer import paced_get
                 
                 # 显示每个执照图片
                 for i, (license_name, license_url, file_id) in enumerate(licenses, 1):
@@ -529,7 +494,7 @@ class DatabaseViewer:
                     # 尝试显示图片
                     try:
                         # 下载图片
-                        response = requests.get(license_url, timeout=10)
+                        response = paced_get(license_url, timeout=10)
                         if response.status_code == 200:
                             # 打开图片
                             img = Image.open(BytesIO(response.content))
@@ -598,7 +563,7 @@ class DatabaseViewer:
         company_name = values[2]
         
         # 从数据库获取执照信息
-        conn = sqlite3.connect(self.db_var.get())
+        conn = get_read_connection(self.db_var.get())
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -745,18 +710,15 @@ class DatabaseViewer:
             
             # 在新线程中运行爬虫
             import threading
-            import asyncio
             from alibaba_supplier_crawler import AlibabaSupplierCrawler
+            from async_runner import get_async_runner
             
             def run_fetch():
                 try:
                     crawler = AlibabaSupplierCrawler()
                     
                     # 运行异步爬虫
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    suppliers = loop.run_until_complete(
+                    suppliers = get_async_runner().run(
                         crawler.crawl_suppliers(keyword, pages, proxy)
                     )
                     
@@ -0,0 +1,297 @@
+"""
+数据库单写线程
+
+爬虫、执照提取、OCR 和 GUI 的所有写操作都交给同一个写线程执行：
+- 写线程独占一个 SQLite 连接，调用方不再各自打开短连接，避免 "database is locked"
+- 写命令进入有界队列（队列满时调用方阻塞，形成背压）
+- 写线程在很短的时间窗口内收集多条命令，合并到一个事务里提交（group commit）
+- 每条命令用 SAVEPOINT 隔离，单条失败只回滚自己，不影响同批次其它命令
+- 结果通过 concurrent.futures.Future 返回，异步调用方用 run_async 等待，不阻塞事件循环
+
+写命令是一个可调用对象 func(conn, *args, **kwargs)，在写线程中执行，
+事务由写线程统一管理，命令内部不要调用 conn.commit()/rollback()。
+"""
+
+import asyncio
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from db_pool import connect
+
+
+class _WriteCommand:
+    """队列中的一条写命令"""
+    __slots__ = ('func', 'args', 'kwargs', 'future')
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+# 停止写线程的哨兵
+_STOP = object()
+
+
+class DatabaseWriter:
+    """单连接写线程，负责合并提交所有写命令"""
+
+    def __init__(self, db_path, max_queue_size=1000, batch_window=0.02, max_batch_size=200):
+        self.db_path = db_path
+        self.batch_window = batch_window        # 合并提交的时间窗口（秒）
+        self.max_batch_size = max_batch_size    # 单个事务最多包含的命令数
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._conn = None
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'writes': 0,          # 成功执行的写命令数
+            'failed': 0,          # 执行失败的写命令数
+            'commits': 0,         # 提交的事务数
+            'max_batch': 0,       # 单个事务最多合并的命令数
+            'commit_time': 0.0,   # 事务执行总耗时（秒）
+        }
+        self._started_at = time.time()
+        # 数据版本号：每次提交了实际变更的事务后加1，读方可据此判断缓存是否过期
+        self.generation = 0
+
+        self._thread = threading.Thread(target=self._run, name=f"db-writer:{os.path.basename(db_path)}", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # 提交接口
+    # ------------------------------------------------------------------
+    def in_writer_thread(self):
+        """当前是否运行在写线程中"""
+        return threading.current_thread() is self._thread
+
+    def submit(self, func, *args, **kwargs):
+        """提交写命令，立即返回 Future（队列满时阻塞等待）"""
+        if self.in_writer_thread():
+            # 写命令内部再次提交时直接在当前事务中执行，避免自己等待自己
+            future = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(func(self._conn, *args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        if self._closed:
+            raise RuntimeError("数据库写线程已关闭")
+
+        command = _WriteCommand(func, args, kwargs)
+        self._queue.put(command)
+        return command.future
+
+    def run(self, func, *args, timeout=None, **kwargs):
+        """同步执行写命令并返回结果（供线程和GUI调用）"""
+        return self.submit(func, *args, **kwargs).result(timeout)
+
+    async def submit_async(self, func, *args, **kwargs):
+        """异步提交写命令，入队后返回 Future（队列满时等待入队，不阻塞事件循环）"""
+        if self._closed:
+            raise RuntimeError("数据库写线程已关闭")
+
+        command = _WriteCommand(func, args, kwargs)
+        try:
+            self._queue.put_nowait(command)
+        except queue.Full:
+            # 队列已满时在线程中等待入队，事件循环可以继续处理其它任务
+            await asyncio.to_thread(self._queue.put, command)
+        return command.future
+
+    async def run_async(self, func, *args, **kwargs):
+        """异步执行写命令并返回结果，等待期间不阻塞事件循环"""
+        return await asyncio.wrap_future(await self.submit_async(func, *args, **kwargs))
+
+    def execute(self, sql, params=()):
+        """同步执行一条写SQL，返回影响行数"""
+        return self.run(_execute, sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        """同步批量执行写SQL，返回影响行数"""
+        return self.run(_executemany, sql, list(seq_of_params))
+
+    async def execute_async(self, sql, params=()):
+        """异步执行一条写SQL，返回影响行数"""
+        return await self.run_async(_execute, sql, params)
+
+    async def executemany_async(self, sql, seq_of_params):
+        """异步批量执行写SQL，返回影响行数"""
+        return await self.run_async(_executemany, sql, list(seq_of_params))
+
+    # ------------------------------------------------------------------
+    # 统计与关闭
+    # ------------------------------------------------------------------
+    def get_stats(self):
+        """获取写入统计（写入速率、事务数、平均合并数等）"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        elapsed = max(time.time() - self._started_at, 1e-6)
+        stats['queue_size'] = self._queue.qsize()
+        stats['generation'] = self.generation
+        stats['writes_per_sec'] = round(stats['writes'] / elapsed, 2)
+        stats['avg_batch'] = round(stats['writes'] / stats['commits'], 2) if stats['commits'] else 0
+        stats['avg_commit_ms'] = round(stats['commit_time'] * 1000 / stats['commits'], 2) if stats['commits'] else 0
+        return stats
+
+    def close(self, timeout=10):
+        """处理完队列中剩余的命令后关闭写线程"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # 写线程
+    # ------------------------------------------------------------------
+    def _connect(self):
+        # 使用 config.json 中统一的 PRAGMA 配置；事务由写线程显式控制
+        return connect(self.db_path, isolation_level=None, check_same_thread=False)
+
+    def _run(self):
+        try:
+            self._conn = self._connect()
+        except Exception as e:
+            print(f"数据库写线程连接失败: {e}")
+            self._closed = True
+            self._fail_pending(e)
+            return
+
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # 在时间窗口内继续收集命令，合并为一个事务
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._commit_batch(batch)
+
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+    def _commit_batch(self, batch):
+        """在一个事务中执行一批写命令"""
+        conn = self._conn
+        started = time.perf_counter()
+        changes_before = conn.total_changes
+        results = []
+
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for command in batch:
+                if not command.future.set_running_or_notify_cancel():
+                    continue
+                conn.execute('SAVEPOINT write_command')
+                try:
+                    result = command.func(conn, *command.args, **command.kwargs)
+                    conn.execute('RELEASE write_command')
+                    results.append((command, result, None))
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write_command')
+                    conn.execute('RELEASE write_command')
+                    results.append((command, None, e))
+            conn.execute('COMMIT')
+        except Exception as e:
+            # 事务本身失败（如磁盘错误），整批命令都返回异常
+            if conn.in_transaction:
+                try:
+                    conn.execute('ROLLBACK')
+                except Exception:
+                    pass
+            for command in batch:
+                future = command.future
+                if future.done():
+                    continue
+                if future.running() or future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+            with self._stats_lock:
+                self._stats['failed'] += len(batch)
+            print(f"数据库写线程提交失败: {e}")
+            return
+
+        elapsed = time.perf_counter() - started
+        if conn.total_changes != changes_before:
+            self.generation += 1
+        failed = 0
+        for command, result, error in results:
+            if error is None:
+                command.future.set_result(result)
+            else:
+                failed += 1
+                command.future.set_exception(error)
+
+        with self._stats_lock:
+            self._stats['writes'] += len(results) - failed
+            self._stats['failed'] += failed
+            self._stats['commits'] += 1
+            self._stats['max_batch'] = max(self._stats['max_batch'], len(results))
+            self._stats['commit_time'] += elapsed
+
+    def _fail_pending(self, error):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP and item.future.set_running_or_notify_cancel():
+                item.future.set_exception(error)
+
+
+def _execute(conn, sql, params):
+    return conn.execute(sql, params).rowcount
+
+
+def _executemany(conn, sql, seq_of_params):
+    return conn.executemany(sql, seq_of_params).rowcount
+
+
+# 每个数据库文件一个写线程
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path):
+    """获取指定数据库的写线程（不存在时创建）"""
+    key = os.path.abspath(db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = DatabaseWriter(db_path)
+            _writers[key] = writer
+        return writer
+
+
+def close_all_writers():
+    """关闭所有写线程，确保队列中的写命令全部落盘"""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
+
+
+atexit.register(close_all_writers)
@@ -0,0 +1,239 @@
+"""
+执照提取流水线
+
+以前 extract_licenses_from_database 和界面的批量提取把待提取供应商按并发数切成固定批次，
+等一批全部完成、再等待批次间隔后才开始下一批，一个慢页面会让其它工作协程全部空等。
+现在拆成五个阶段，阶段之间用有界队列连接，每个阶段有自己的并发数：
+
+    fetch（请求供应商页面）-> parse（解析执照字段和候选图片）
+        -> probe（探测候选图片大小）-> save（下载执照图片，写入分类目录）
+        -> write（提交到提取结果汇集器，更新save_path）
+
+- 每个工作协程处理完一个供应商立即取下一个，没有批次屏障
+- 队列有界（pipeline_queue_size），下游变慢时上游自然等待，内存中的页面数量有上限
+- 请求节奏由全局的主机节奏控制器（request_pacer）控制，不再需要批次间隔
+- 每完成一个供应商回调 progress_callback(已完成数, 总数, 说明)，说明中包含
+  端到端的 供应商/分钟 和各队列长度
+- stop() 之后不再请求新的页面，已在流水线中的供应商处理完后结束
+- 开启解析进程池（parse_pool）时 parse 阶段把页面交给子进程解析，工作协程数不少于进程数；
+  进度说明中同时报告进程池在途的解析数和事件循环延迟
+
+并发数读取 config.json 的 crawler 配置：
+    "crawler": {"pipeline_fetch_workers": 8, "pipeline_parse_workers": 2, "pipeline_probe_workers": 4,
+                "pipeline_save_workers": 4, "pipeline_write_workers": 2, "pipeline_queue_size": 16}
+"""
+
+import asyncio
+import time
+import traceback
+
+from app_config import load_crawler_config
+from db_writer import get_writer
+from extraction_sink import get_extraction_sink
+from http_client import get_http_client
+from loop_monitor import LoopLagSampler
+from parse_pool import get_parse_pool, parse_page
+
+STAGES = ('fetch', 'parse', 'probe', 'save', 'write')
+
+
+class ExtractionPipeline:
+    """按阶段并发提取一批供应商的执照"""
+
+    def __init__(self, crawler, proxy=None, check_ip=True, fetch_workers=None, parse_workers=None,
+                 probe_workers=None, save_workers=None, write_workers=None, queue_size=None, log_callback=None,
+                 progress_callback=None):
+        crawler_config = load_crawler_config()
+        self.crawler = crawler
+        self.proxy = proxy
+        self.check_ip = check_ip
+        self.workers = {
+            'fetch': max(1, fetch_workers or crawler_config['pipeline_fetch_workers']),
+            'parse': max(1, parse_workers or crawler_config['pipeline_parse_workers']),
+            'probe': max(1, probe_workers or crawler_config['pipeline_probe_workers']),
+            'save': max(1, save_workers or crawler_config['pipeline_save_workers']),
+            'write': max(1, write_workers or crawler_config['pipeline_write_workers']),
+        }
+        parse_pool = get_parse_pool()
+        if parse_pool is not None and not parse_workers:
+            # 每个进程都有页面可解析
+            self.workers['parse'] = max(self.workers['parse'], parse_pool.processes)
+        self.queue_size = max(1, queue_size or crawler_config['pipeline_queue_size'])
+        self.log_callback = log_callback
+        self.progress_callback = progress_callback
+
+        self.total = 0
+        self.done = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.extracted_ids = []   # 成功提取的供应商ID
+        self.stopped = False
+        self._queues = {}
+        self._busy = dict.fromkeys(STAGES, 0)
+        self._started_at = None
+        self._parse_pool = parse_pool
+        self._lag_sampler = LoopLagSampler()
+
+    def log(self, message, level="INFO"):
+        if self.log_callback:
+            self.log_callback(message, level)
+        else:
+            print(message)
+
+    def stop(self):
+        """不再请求新的页面"""
+        self.stopped = True
+
+    def get_stats(self):
+        """获取吞吐量和各阶段队列统计"""
+        elapsed = max(time.time() - self._started_at, 1e-6) if self._started_at else 0
+        return {
+            'total': self.total,
+            'done': self.done,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'elapsed': round(elapsed, 1),
+            'suppliers_per_min': round(self.done * 60 / elapsed, 1) if elapsed else 0,
+            'queued': {stage: queue.qsize() for stage, queue in self._queues.items()},
+            'busy': dict(self._busy),
+            'parse_pool_pending': self._parse_pool.pending if self._parse_pool else 0,
+            'loop_lag': self._lag_sampler.get_stats(),
+        }
+
+    def format_stats(self):
+        stats = self.get_stats()
+        queues = ' '.join(f"{stage} {stats['queued'].get(stage, 0)}/{stats['busy'][stage]}" for stage in STAGES)
+        if self._parse_pool:
+            queues += f"，解析进程池在途 {stats['parse_pool_pending']}"
+        lag = stats['loop_lag']
+        return (f"{stats['done']}/{stats['total']}，成功 {stats['succeeded']}，失败 {stats['failed']}，"
+                f"{stats['suppliers_per_min']} 个供应商/分钟（队列/处理中: {queues}；"
+                f"事件循环延迟 {lag['lag_ms']} ms，最大 {lag['max_lag_ms']} ms）")
+
+    async def run(self, suppliers):
+        """处理 [(company_id, company_name, action_url), ...]，返回成功提取的供应商ID列表"""
+        self.total = len(suppliers)
+        self._started_at = time.time()
+        self._queues = {stage: asyncio.Queue(maxsize=self.queue_size) for stage in STAGES}
+        session = get_http_client().session()
+        self._lag_sampler.start()
+
+        handlers = {
+            'fetch': lambda item: self._fetch(item, session),
+            'parse': self._parse,
+            'probe': self._probe,
+            'save': self._save,
+            'write': self._write,
+        }
+        stage_tasks = []
+        for index, stage in enumerate(STAGES):
+            next_queue = self._queues[STAGES[index + 1]] if index + 1 < len(STAGES) else None
+            stage_tasks.append(asyncio.create_task(self._run_stage(stage, handlers[stage], next_queue)))
+
+        # 供料：队列满时等待，停止后不再放入新的供应商
+        fetch_queue = self._queues['fetch']
+        for supplier in suppliers:
+            if self.stopped:
+                break
+            await fetch_queue.put(supplier)
+        for _ in range(self.workers['fetch']):
+            await fetch_queue.put(None)
+
+        try:
+            await asyncio.gather(*stage_tasks)
+        finally:
+            self._lag_sampler.stop()
+        if self.stopped:
+            self.log(f"提取已停止，{self.total - self.done} 个供应商未处理", "WARNING")
+        return self.extracted_ids
+
+    async def _run_stage(self, stage, handler, next_queue):
+        """启动一个阶段的工作协程，全部结束后向下一阶段的每个工作协程发送结束标记"""
+        await asyncio.gather(*(self._worker(stage, handler, next_queue) for _ in range(self.workers[stage])))
+        if next_queue is not None:
+            for _ in range(self.workers[STAGES[STAGES.index(stage) + 1]]):
+                await next_queue.put(None)
+
+    async def _worker(self, stage, handler, next_queue):
+        queue = self._queues[stage]
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            self._busy[stage] += 1
+            try:
+                result = await handler(item)
+            except Exception as e:
+                result = None
+                # fetch 阶段的数据就是供应商本身，之后各阶段的第一项是供应商
+                self._finish(item if stage == 'fetch' else item[0], False, e)
+            finally:
+                self._busy[stage] -= 1
+            if result is not None and next_queue is not None:
+                await next_queue.put(result)
+
+    async def _fetch(self, item, session):
+        company_id, company_name, action_url = item
+        html_content = await self.crawler.fetch_supplier_page(action_url, self.proxy, session, check_ip=self.check_ip)
+        if not html_content:
+            self._finish(item, False, "无法获取页面")
+            return None
+        return item, html_content
+
+    async def _parse(self, item):
+        supplier, html_content = item
+        return supplier, html_content, await parse_page(html_content)
+
+    async def _probe(self, item):
+        supplier, html_content, parsed = item
+        licenses = await self.crawler.extract_licenses_from_html(html_content, parsed)
+        license_info = self.crawler.extract_license_info_from_html(html_content, parsed)
+        if not (licenses or license_info):
+            self._finish(supplier, False, "未找到执照信息", record_failure=False)
+            return None
+        # 解析出执照信息的页面才写入响应缓存
+        await self.crawler.cache_supplier_page(supplier[2], html_content)
+        return supplier, licenses, license_info
+
+    async def _save(self, item):
+        supplier, licenses, license_info = item
+        company_id, company_name, _action_url = supplier
+        # 有分类的供应商下载执照图片，保存到对应分类目录
+        supplier_dir = None
+        category_data = await asyncio.to_thread(self.crawler.get_supplier_category, company_id)
+        if category_data and category_data[0]:
+            category_id, category_name = category_data
+            supplier_dir = await self.crawler.save_supplier_files(company_id, company_name, licenses, license_info, category_id, category_name)
+        return supplier, licenses, license_info, supplier_dir
+
+    async def _write(self, item):
+        supplier, licenses, license_info, supplier_dir = item
+        company_id = supplier[0]
+        # 与其它供应商的结果攒批后一个事务提交
+        await get_extraction_sink(self.crawler.db_path).add_result_async(company_id, licenses, license_info)
+        if supplier_dir:
+            await get_writer(self.crawler.db_path).execute_async(
+                'UPDATE suppliers SET save_path = ? WHERE company_id = ?', (supplier_dir, company_id))
+        self._finish(supplier, True)
+        return None
+
+    def _finish(self, supplier, success, error=None, record_failure=True):
+        """一个供应商处理结束：更新计数、记录失败、回调进度"""
+        company_id, company_name, _action_url = supplier
+        self.done += 1
+        if success:
+            self.succeeded += 1
+            self.extracted_ids.append(company_id)
+            self.log(f"✓ 成功处理: {company_name} ({self.done}/{self.total})", "SUCCESS")
+        else:
+            self.failed += 1
+            if isinstance(error, Exception):
+                self.log(f"✗ 处理异常: {company_name} - 错误: {error}", "ERROR")
+                self.log(f"  - 详细错误: {''.join(traceback.format_exception(type(error), error, error.__traceback__))}", "DEBUG")
+            else:
+                self.log(f"✗ 处理失败: {company_name} ({self.done}/{self.total}) - {error}", "ERROR")
+            if record_failure:
+                # 更新失败次数和最后尝试时间
+                self.crawler.update_extraction_failure(company_id, company_name)
+        if self.progress_callback:
+            self.progress_callback(self.done, self.total, self.format_stats())
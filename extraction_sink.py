@@ -0,0 +1,364 @@
+"""
+执照提取结果汇集器
+
+并发提取时每个供应商的结果（执照图片、执照信息、已提取标记）和失败计数
+先放入内存，攒够 max_batch 条或距第一条超过 flush_interval 秒时，
+作为一条写命令交给写线程，在一个事务里用 executemany 批量完成：
+
+    删除旧执照 -> 写入执照图片/执照信息 -> 标记已提取 -> 累加失败次数/自动跳过
+
+调用方拿到的 Future 在所在批次提交后完成，提交失败时得到异常。
+交给写线程时不持有汇集器的锁（写队列满时入队会等待，写线程完成批次后的回调也需要这把锁）；
+add_result_async 在事件循环中非阻塞入队，同步的 add_result/add_failure 攒满一批时
+交给后台线程提交，都不会卡住调用方所在的事件循环。
+close()（以及进程退出时的 atexit）会把未提交的结果全部写入后再返回。
+
+失败的供应商按 RetryPolicy 计算 next_attempt_at（指数退避加随机抖动），
+待提取查询（EXTRACTION_QUEUE_CONDITION）只返回已到重试时间的供应商，
+刚失败的供应商不会在下一次提取时立即被重新请求。
+"""
+
+import asyncio
+import atexit
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from app_config import load_crawler_config
+from db_writer import get_writer
+
+LICENSE_INFO_FIELDS = (
+    'registration_no', 'company_name', 'date_of_issue', 'date_of_expiry', 'registered_capital',
+    'country_territory', 'registered_address', 'year_established', 'legal_form', 'legal_representative'
+)
+
+# 待提取队列：未提取、未跳过、已到重试时间（失败后未设置 next_attempt_at 的旧记录视为已到期）
+EXTRACTION_QUEUE_CONDITION = (
+    "license_extracted = 0 AND skip_extraction = 0 "
+    "AND (next_attempt_at IS NULL OR next_attempt_at <= CURRENT_TIMESTAMP)"
+)
+
+
+class RetryPolicy:
+    """提取失败后的重试间隔：base_delay * 2^(失败次数-1)，不超过 max_delay，再乘以 1±jitter 的随机系数"""
+
+    def __init__(self, base_delay=600, max_delay=86400, jitter=0.2):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    @classmethod
+    def from_config(cls):
+        config = load_crawler_config()
+        return cls(config['extraction_retry_base_delay'], config['extraction_retry_max_delay'],
+                   config['extraction_retry_jitter'])
+
+    def base_wait(self, failures):
+        """第 failures 次失败后等待的秒数（不含抖动）"""
+        return min(self.base_delay * (2 ** max(failures - 1, 0)), self.max_delay)
+
+    def delay(self, failures):
+        """第 failures 次失败后等待的秒数（含抖动）"""
+        return self.base_wait(failures) * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def write_extraction_results(conn, results):
+    """批量写入执照提取结果（写线程命令）
+
+    results 为 [(company_id, licenses, license_info), ...]，同一供应商只保留最后一条。
+    先删除旧的执照图片和执照信息，再写入新结果；有结果时标记为已提取。
+    """
+    latest = {}
+    for company_id, licenses, license_info in results:
+        latest[company_id] = (licenses, license_info)
+    if not latest:
+        return
+
+    company_ids = [(company_id,) for company_id in latest]
+    cursor = conn.cursor()
+    cursor.executemany('DELETE FROM licenses WHERE supplier_id = ?', company_ids)
+    cursor.executemany('DELETE FROM license_info WHERE supplier_id = ?', company_ids)
+
+    # 保存执照图片
+    license_rows = [
+        (company_id, item['name'], item['url'], item['fileId'])
+        for company_id, (licenses, _info) in latest.items() for item in licenses or []
+    ]
+    if license_rows:
+        cursor.executemany('''
+            INSERT INTO licenses (supplier_id, license_name, license_url, file_id)
+            VALUES (?, ?, ?, ?)
+        ''', license_rows)
+
+    # 保存执照信息
+    info_rows = [
+        (company_id,) + tuple(license_info.get(field, '') for field in LICENSE_INFO_FIELDS)
+        for company_id, (_licenses, license_info) in latest.items() if license_info
+    ]
+    if info_rows:
+        cursor.executemany(f'''
+            INSERT INTO license_info (supplier_id, {', '.join(LICENSE_INFO_FIELDS)})
+            VALUES ({', '.join(['?'] * (len(LICENSE_INFO_FIELDS) + 1))})
+        ''', info_rows)
+
+    # 成功提取到执照信息的标记为已获取
+    extracted = [(company_id,) for company_id, (licenses, license_info) in latest.items() if licenses or license_info]
+    if extracted:
+        cursor.executemany('UPDATE suppliers SET license_extracted = TRUE WHERE company_id = ?', extracted)
+
+
+def record_extraction_failures(conn, company_ids, max_failures=3, retry_policy=None):
+    """批量累加提取失败次数并安排下次重试时间，达到阈值的自动标记为跳过，返回本次被标记跳过的company_id集合"""
+    if not company_ids:
+        return set()
+    cursor = conn.cursor()
+    cursor.executemany('''
+        UPDATE suppliers
+        SET extraction_failed_count = COALESCE(extraction_failed_count, 0) + 1,
+            last_extraction_attempt = CURRENT_TIMESTAMP
+        WHERE company_id = ?
+    ''', [(company_id,) for company_id in company_ids])
+
+    unique_ids = list(set(company_ids))
+    placeholders = ', '.join(['?'] * len(unique_ids))
+
+    cursor.execute(f'''
+        SELECT company_id, extraction_failed_count FROM suppliers
+        WHERE company_id IN ({placeholders}) AND skip_extraction = 0
+    ''', unique_ids)
+    rows = cursor.fetchall()
+    skipped = {company_id for company_id, failures in rows if failures >= max_failures}
+    if skipped:
+        cursor.executemany('UPDATE suppliers SET skip_extraction = TRUE WHERE company_id = ?', [(company_id,) for company_id in skipped])
+
+    # 仍可重试的供应商按累计失败次数计算下次重试时间
+    retry_policy = retry_policy or RetryPolicy()
+    cursor.executemany('''
+        UPDATE suppliers SET next_attempt_at = datetime('now', ?) WHERE company_id = ?
+    ''', [(f"+{int(retry_policy.delay(failures))} seconds", company_id)
+          for company_id, failures in rows if company_id not in skipped])
+    return skipped
+
+
+class ExtractionResultSink:
+    """把提取结果和失败计数攒批后交给写线程，一次事务提交"""
+
+    def __init__(self, db_path, max_batch=50, flush_interval=0.2, max_failures=3, retry_policy=None):
+        self.db_path = db_path
+        self.max_batch = max_batch              # 攒够多少条立即提交
+        self.flush_interval = flush_interval    # 第一条结果最多等待多久（秒）
+        self.max_failures = max_failures        # 失败多少次后自动跳过
+        self.retry_policy = retry_policy or RetryPolicy()   # 失败后的重试间隔
+
+        self._lock = threading.Lock()
+        self._results = []      # (company_id, licenses, license_info, future)
+        self._failures = []     # (company_id, future)
+        self._timer = None
+        self._closed = False
+        self._inflight = set()  # 已提交给写线程、尚未完成的批次
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'results': 0,         # 已提交的提取结果数
+            'failures': 0,        # 已提交的失败记录数
+            'flushes': 0,         # 提交的批次数
+            'errors': 0,          # 提交失败的批次数
+            'flush_time': 0.0,    # 批次从提交到落盘的总耗时（秒）
+            'max_flush_ms': 0.0,  # 单个批次的最长耗时（毫秒）
+        }
+
+    # ------------------------------------------------------------------
+    # 添加结果
+    # ------------------------------------------------------------------
+    def add_result(self, company_id, licenses, license_info):
+        """添加一条提取结果，返回 Future，批次提交后结果为供应商的 (category_id, category_name)"""
+        future = Future()
+        if self._add(self._results, (company_id, licenses, license_info, future)):
+            self._flush_in_background()
+        return future
+
+    def add_failure(self, company_id):
+        """添加一次提取失败，返回 Future，批次提交后结果为是否被自动标记为跳过"""
+        future = Future()
+        if self._add(self._failures, (company_id, future)):
+            self._flush_in_background()
+        return future
+
+    async def add_result_async(self, company_id, licenses, license_info):
+        """异步添加提取结果并等待其所在批次提交（攒满一批时在事件循环中非阻塞入队）"""
+        future = Future()
+        if self._add(self._results, (company_id, licenses, license_info, future)):
+            batch = self._take()
+            if batch is not None:
+                await self._submit_async(*batch)
+        return await asyncio.wrap_future(future)
+
+    def _add(self, target, item):
+        """加入待提交列表，返回是否已攒满一批"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("提取结果汇集器已关闭")
+            target.append(item)
+            pending = len(self._results) + len(self._failures)
+            if pending >= self.max_batch:
+                return True
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return False
+
+    # ------------------------------------------------------------------
+    # 提交
+    # ------------------------------------------------------------------
+    def flush(self):
+        """立即提交已攒下的结果，返回批次的 Future（没有待提交结果时返回 None；写队列满时等待入队）"""
+        batch = self._take()
+        if batch is None:
+            return None
+        results, failures = batch
+        started = time.perf_counter()
+        future = get_writer(self.db_path).submit(self._write_batch, results, failures, self.max_failures, self.retry_policy)
+        self._track(future, results, failures, started)
+        return future
+
+    def _flush_in_background(self):
+        """同步调用方（可能在事件循环中）攒满一批时，由后台线程提交，调用方不等待写队列"""
+        thread = threading.Thread(target=self.flush, name="extraction-sink-flush", daemon=True)
+        thread.start()
+
+    async def _submit_async(self, results, failures):
+        started = time.perf_counter()
+        future = await get_writer(self.db_path).submit_async(
+            self._write_batch, results, failures, self.max_failures, self.retry_policy)
+        self._track(future, results, failures, started)
+
+    def _take(self):
+        """持锁取出待提交的结果（之后在锁外提交），没有时返回 None"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            results, self._results = self._results, []
+            failures, self._failures = self._failures, []
+        if not results and not failures:
+            return None
+        return results, failures
+
+    def _track(self, batch, results, failures, started):
+        with self._lock:
+            self._inflight.add(batch)
+        # 在锁外注册：批次已完成时回调立即在当前线程执行，回调中需要获取锁
+        batch.add_done_callback(lambda done: self._on_flushed(done, results, failures, started))
+
+    @staticmethod
+    def _write_batch(conn, results, failures, max_failures, retry_policy):
+        """写线程命令：一个事务内写入整批结果，返回 (分类信息, 被跳过的company_id)"""
+        write_extraction_results(conn, [(company_id, licenses, license_info) for company_id, licenses, license_info, _ in results])
+        skipped = record_extraction_failures(conn, [company_id for company_id, _ in failures], max_failures, retry_policy)
+
+        categories = {}
+        company_ids = list({company_id for company_id, _, _, _ in results})
+        if company_ids:
+            placeholders = ', '.join(['?'] * len(company_ids))
+            for company_id, category_id, category_name in conn.execute(
+                    f'SELECT company_id, category_id, category_name FROM suppliers WHERE company_id IN ({placeholders})',
+                    company_ids):
+                categories[company_id] = (category_id, category_name)
+        return categories, skipped
+
+    def _on_flushed(self, batch, results, failures, started):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._inflight.discard(batch)
+
+        error = batch.exception()
+        with self._stats_lock:
+            self._stats['flushes'] += 1
+            self._stats['flush_time'] += elapsed
+            self._stats['max_flush_ms'] = max(self._stats['max_flush_ms'], elapsed * 1000)
+            if error is None:
+                self._stats['results'] += len(results)
+                self._stats['failures'] += len(failures)
+            else:
+                self._stats['errors'] += 1
+
+        if error is not None:
+            print(f"提取结果批量写入失败: {error}")
+            for *_, future in results + failures:
+                future.set_exception(error)
+            return
+
+        categories, skipped = batch.result()
+        for company_id, _, _, future in results:
+            future.set_result(categories.get(company_id, (None, None)))
+        for company_id, future in failures:
+            # 同一批次内多次失败的供应商只报告一次被跳过
+            future.set_result(company_id in skipped)
+            skipped.discard(company_id)
+
+    # ------------------------------------------------------------------
+    # 统计与关闭
+    # ------------------------------------------------------------------
+    def get_stats(self):
+        """获取提交统计（批次数、平均/最长落盘耗时、待提交数量）"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._lock:
+            stats['pending'] = len(self._results) + len(self._failures)
+            stats['inflight'] = len(self._inflight)
+        stats['avg_flush_ms'] = round(stats['flush_time'] * 1000 / stats['flushes'], 2) if stats['flushes'] else 0
+        stats['max_flush_ms'] = round(stats['max_flush_ms'], 2)
+        return stats
+
+    def close(self, timeout=30):
+        """提交剩余结果并等待所有批次落盘"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self.flush()
+        with self._lock:
+            inflight = list(self._inflight)
+        for batch in inflight:
+            try:
+                batch.result(timeout)
+            except Exception:
+                pass
+
+        stats = self.get_stats()
+        if stats['flushes']:
+            print(f"提取结果已全部落盘: {stats['results']} 条结果，{stats['failures']} 条失败记录，"
+                  f"{stats['flushes']} 次提交，平均 {stats['avg_flush_ms']} ms，最长 {stats['max_flush_ms']} ms"
+                  + (f"，{stats['errors']} 次提交失败" if stats['errors'] else ""))
+
+
+# 每个数据库文件一个汇集器
+_sinks = {}
+_sinks_lock = threading.Lock()
+
+
+def get_extraction_sink(db_path):
+    """获取指定数据库的提取结果汇集器（不存在时创建）"""
+    key = os.path.abspath(db_path)
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None or sink._closed:
+            sink = ExtractionResultSink(db_path, retry_policy=RetryPolicy.from_config())
+            _sinks[key] = sink
+        return sink
+
+
+def close_all_sinks():
+    """关闭所有汇集器，确保未提交的提取结果在写线程关闭前落盘"""
+    with _sinks_lock:
+        sinks = list(_sinks.values())
+        _sinks.clear()
+    for sink in sinks:
+        sink.close()
+
+
+# 在 db_writer 之后注册，atexit 按注册的逆序执行，先于写线程关闭
+atexit.register(close_all_sinks)
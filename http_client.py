@@ -0,0 +1,284 @@
+"""
+全局共享的HTTP客户端
+
+以前爬取、执照提取、图片下载和OCR各自创建会话：每次爬取一个 ClientSession，
+每张图片的 HEAD 检查一个，每个供应商的执照下载一个，OCR 直接用 requests。
+连接、DNS解析和TLS握手都无法复用。这里统一提供：
+
+- session()        当前事件循环共用的 aiohttp 会话（aiohttp 会话绑定事件循环，每个循环一个）
+- get()/post()     线程安全的 requests 会话，供同步代码（OCR、图片下载）使用
+- get_stats()      请求数、新建/复用连接数、DNS缓存命中、平均/最长延迟
+
+连接池、DNS缓存、每主机连接上限和超时读取 config.json 的 http 配置：
+    "http": {"limit": 100, "limit_per_host": 8, "ttl_dns_cache": 300, "keepalive_timeout": 30,
+             "total_timeout": 30, "connect_timeout": 10, "sync_pool_size": 20}
+
+    client = get_http_client()
+    async with client.session().get(url) as response: ...   # 不要关闭共享会话
+    response = client.get(url)                                 # 同步请求
+"""
+
+import asyncio
+import atexit
+import threading
+import time
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from app_config import DEFAULT_CONFIG, load_section
+
+
+class SharedHttpClient:
+    """长期存活的HTTP客户端：异步会话按事件循环共享，同步会话全局共享"""
+
+    def __init__(self, config=None):
+        self.config = dict(DEFAULT_CONFIG['http'], **(config or {}))
+        self.timeout = aiohttp.ClientTimeout(total=self.config['total_timeout'], connect=self.config['connect_timeout'])
+
+        self._lock = threading.Lock()
+        self._sessions = {}  # id(loop) -> (loop, ClientSession)
+        self._sync_session = None
+        self._closed = False
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'requests': 0,          # 异步请求数
+            'errors': 0,            # 异步请求异常数
+            'new_connections': 0,   # 新建的连接数
+            'reused_connections': 0,  # 复用的连接数
+            'dns_cache_hits': 0,
+            'dns_cache_misses': 0,
+            'latency': 0.0,         # 异步请求总耗时（秒）
+            'max_latency': 0.0,
+            'sync_requests': 0,     # 同步请求数
+            'sync_errors': 0,
+            'sync_latency': 0.0,
+            'sync_max_latency': 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # 异步会话
+    # ------------------------------------------------------------------
+    def session(self):
+        """获取当前事件循环共用的 aiohttp 会话（需在协程中调用，调用方不要关闭）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("HTTP客户端已关闭")
+            entry = self._sessions.get(id(loop))
+            if entry is not None and entry[0] is loop and not entry[1].closed:
+                return entry[1]
+            self._prune_closed_loops()
+
+            connector = aiohttp.TCPConnector(
+                limit=self.config['limit'],
+                limit_per_host=self.config['limit_per_host'],
+                ttl_dns_cache=self.config['ttl_dns_cache'],
+                keepalive_timeout=self.config['keepalive_timeout'],
+            )
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, trace_configs=[self._trace_config()])
+            self._sessions[id(loop)] = (loop, session)
+            return session
+
+    def _prune_closed_loops(self):
+        """丢弃已关闭事件循环的会话"""
+        for key, (loop, session) in list(self._sessions.items()):
+            if loop.is_closed():
+                self._discard(session)
+                del self._sessions[key]
+
+    @staticmethod
+    def _discard(session):
+        """丢弃已关闭事件循环的会话：连接已随循环失效，无法再等待关闭，只解除会话与连接池的关联
+
+        事件循环停止前应先调用 close_session()（AsyncRunner.close 会调用），
+        走到这里说明循环没有正常关闭，连接池析构时可能报未关闭的警告。
+        """
+        session.detach()
+
+    async def close_session(self):
+        """关闭当前事件循环的会话（事件循环停止前调用）"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._sessions.pop(id(loop), None)
+        if entry is not None and entry[0] is loop:
+            await entry[1].close()
+
+    def _trace_config(self):
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.started = time.perf_counter()
+
+        async def on_request_end(session, ctx, params):
+            self._record('requests', 'errors', 'latency', 'max_latency', ctx.started, ok=True)
+
+        async def on_request_exception(session, ctx, params):
+            self._record('requests', 'errors', 'latency', 'max_latency', ctx.started, ok=False)
+
+        def counter(name):
+            async def on_event(session, ctx, params):
+                with self._stats_lock:
+                    self._stats[name] += 1
+            return on_event
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(counter('new_connections'))
+        trace_config.on_connection_reuseconn.append(counter('reused_connections'))
+        trace_config.on_dns_cache_hit.append(counter('dns_cache_hits'))
+        trace_config.on_dns_cache_miss.append(counter('dns_cache_misses'))
+        return trace_config
+
+    def _record(self, count_key, error_key, latency_key, max_key, started, ok):
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self._stats[count_key] += 1
+            if not ok:
+                self._stats[error_key] += 1
+            self._stats[latency_key] += elapsed
+            self._stats[max_key] = max(self._stats[max_key], elapsed)
+
+    # ------------------------------------------------------------------
+    # 同步会话
+    # ------------------------------------------------------------------
+    def sync_session(self):
+        """获取共享的 requests 会话（urllib3 连接池线程安全，可在多个线程中使用）"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("HTTP客户端已关闭")
+            if self._sync_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.config['sync_pool_size'],
+                                      pool_maxsize=self.config['limit_per_host'])
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sync_session = session
+            return self._sync_session
+
+    def request(self, method, url, **kwargs):
+        """同步请求，未指定 timeout 时使用配置的 (连接超时, 总超时)"""
+        kwargs.setdefault('timeout', (self.config['connect_timeout'], self.config['total_timeout']))
+        session = self.sync_session()
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except Exception:
+            self._record('sync_requests', 'sync_errors', 'sync_latency', 'sync_max_latency', started, ok=False)
+            raise
+        self._record('sync_requests', 'sync_errors', 'sync_latency', 'sync_max_latency', started, ok=True)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def _sync_connection_count(self):
+        """同步会话连接池中累计新建的连接数"""
+        with self._lock:
+            session = self._sync_session
+        if session is None:
+            return 0
+        count = 0
+        for adapter in set(session.adapters.values()):
+            managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+            for manager in managers:
+                for key in list(manager.pools.keys()):
+                    pool = manager.pools.get(key)
+                    if pool is not None:
+                        count += pool.num_connections
+        return count
+
+    # ------------------------------------------------------------------
+    # 统计与关闭
+    # ------------------------------------------------------------------
+    def get_stats(self):
+        """获取请求数、连接复用率和延迟统计"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._lock:
+            stats['sessions'] = len(self._sessions)
+
+        connections = stats['new_connections'] + stats['reused_connections']
+        stats['reuse_rate'] = round(stats['reused_connections'] * 100 / connections, 1) if connections else 0
+        stats['avg_latency_ms'] = round(stats.pop('latency') * 1000 / stats['requests'], 1) if stats['requests'] else 0
+        stats['max_latency_ms'] = round(stats.pop('max_latency') * 1000, 1)
+
+        stats['sync_new_connections'] = self._sync_connection_count()
+        sync_reused = max(0, stats['sync_requests'] - stats['sync_errors'] - stats['sync_new_connections'])
+        stats['sync_reuse_rate'] = round(sync_reused * 100 / stats['sync_requests'], 1) if stats['sync_requests'] else 0
+        stats['sync_avg_latency_ms'] = round(stats.pop('sync_latency') * 1000 / stats['sync_requests'], 1) if stats['sync_requests'] else 0
+        stats['sync_max_latency_ms'] = round(stats.pop('sync_max_latency') * 1000, 1)
+        return stats
+
+    def format_stats(self):
+        stats = self.get_stats()
+        return (f"HTTP: 异步 {stats['requests']} 次请求（新建连接 {stats['new_connections']}，复用 {stats['reused_connections']}，"
+                f"复用率 {stats['reuse_rate']}%，平均 {stats['avg_latency_ms']} ms，最长 {stats['max_latency_ms']} ms，"
+                f"DNS缓存命中 {stats['dns_cache_hits']}/{stats['dns_cache_hits'] + stats['dns_cache_misses']}）；"
+                f"同步 {stats['sync_requests']} 次请求（新建连接 {stats['sync_new_connections']}，"
+                f"复用率 {stats['sync_reuse_rate']}%，平均 {stats['sync_avg_latency_ms']} ms）"
+                + (f"；失败 {stats['errors'] + stats['sync_errors']} 次" if stats['errors'] or stats['sync_errors'] else ""))
+
+    def close(self):
+        """关闭所有会话；事件循环仍在运行的会话提交到其循环中关闭"""
+        with self._lock:
+            self._closed = True
+            sessions, self._sessions = list(self._sessions.values()), {}
+            sync_session, self._sync_session = self._sync_session, None
+
+        for loop, session in sessions:
+            if loop.is_closed():
+                self._discard(session)
+            elif loop.is_running():
+                try:
+                    asyncio.run_coroutine_threadsafe(session.close(), loop).result(5)
+                except Exception:
+                    session.detach()
+            else:
+                loop.run_until_complete(session.close())
+        if sync_session is not None:
+            sync_session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+_atexit_registered = False
+
+
+def get_http_client():
+    """获取全局共享的HTTP客户端（不存在时创建）"""
+    global _client, _atexit_registered
+    with _client_lock:
+        if _client is None or _client._closed:
+            _client = SharedHttpClient(load_section('http'))
+        if not _atexit_registered:
+            # 首次使用时才注册：atexit 按注册的逆序执行，保证在后台事件循环停止之前关闭会话
+            atexit.register(close_http_client)
+            _atexit_registered = True
+        return _client
+
+
+async def close_loop_session():
+    """关闭当前事件循环的共享会话；全局客户端尚未创建时什么都不做"""
+    with _client_lock:
+        client = _client
+    if client is not None:
+        await client.close_session()
+
+
+def close_http_client():
+    """关闭全局HTTP客户端"""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
@@ -0,0 +1,67 @@
+"""
+执照候选图片的大小缓存（image_meta 表）
+
+extract_licenses_from_html 要从页面上所有 sc04.alicdn.com/kf/... 图片里挑出最大的一张，
+以前每次都对每张图片发一次 HEAD 请求，同一个 fileId 在重新提取和不同店铺中反复出现。
+现在探测结果按 fileId 记录：
+
+- 状态 200 的图片内容不会变，记录后一直有效，重复提取时完全不发请求
+- 其它状态（404 等）记录后 RECHECK_FAILED_AFTER 之内不再探测，之后重新探测
+- 请求异常（超时、断连）不记录，下次仍会探测
+
+    known = load_image_meta(db_path, file_ids)          # {fileId: (状态, 大小, 类型)}
+    await record_image_meta(db_path, [(fileId, url, 状态, 大小, 类型), ...])
+"""
+
+from db_pool import get_read_connection
+from db_writer import get_writer
+
+# 非200的探测结果多久后重新探测（SQLite datetime 修饰符）
+RECHECK_FAILED_AFTER = '-1 day'
+
+
+def get_image_meta(conn, file_ids):
+    """读取已记录且仍有效的图片信息，返回 {fileId: (状态, 大小, 类型)}"""
+    file_ids = list(file_ids)
+    if not file_ids:
+        return {}
+    placeholders = ', '.join(['?'] * len(file_ids))
+    rows = conn.execute(f'''
+        SELECT file_id, status, file_size, content_type FROM image_meta
+        WHERE file_id IN ({placeholders})
+          AND (status = 200 OR checked_at > datetime('now', '{RECHECK_FAILED_AFTER}'))
+    ''', file_ids).fetchall()
+    return {file_id: (status, file_size, content_type) for file_id, status, file_size, content_type in rows}
+
+
+def load_image_meta(db_path, file_ids):
+    """从读连接池读取图片信息（读取失败时返回空字典，全部重新探测）"""
+    try:
+        conn = get_read_connection(db_path)
+        try:
+            return get_image_meta(conn, file_ids)
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"读取图片大小缓存失败: {e}")
+        return {}
+
+
+def save_image_meta(conn, rows):
+    """写入探测结果（写线程命令），rows 为 [(fileId, url, 状态, 大小, 类型), ...]"""
+    conn.executemany('''
+        INSERT INTO image_meta (file_id, url, status, file_size, content_type, checked_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(file_id) DO UPDATE SET
+            url = excluded.url,
+            status = excluded.status,
+            file_size = excluded.file_size,
+            content_type = excluded.content_type,
+            checked_at = excluded.checked_at
+    ''', rows)
+
+
+async def record_image_meta(db_path, rows):
+    """通过写线程记录探测结果"""
+    if rows:
+        await get_writer(db_path).run_async(save_image_meta, rows)
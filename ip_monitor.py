@@ -0,0 +1,123 @@
+"""
+出口IP后台检测
+
+以前 fetch_with_proxy(check_ip=True) 在每次抓取供应商页面之前都请求一次
+icanhazip.com（失败最多重试3次），请求数翻倍，每个供应商多出一次往返。
+现在由 EgressIpMonitor 在后台任务中定期检测，抓取路径只读取缓存的结果：
+
+- 第一次读取时在当前事件循环中启动后台任务，之后每 interval 秒刷新一次
+- 缓存超过 ttl 秒未刷新成功视为过期（is_fresh 为 False）
+- 连续 idle_timeout 秒没有读取时后台任务自动退出，下次读取时再启动
+- IP 变化时输出 "IP已变化: 旧IP -> 新IP"
+
+检测间隔读取 config.json 的 crawler 配置：
+    "crawler": {"ip_check_interval": 60}
+"""
+
+import asyncio
+import threading
+import time
+
+import aiohttp
+
+from app_config import load_crawler_config
+from http_client import get_http_client
+
+IP_CHECK_URL = "https://icanhazip.com"
+
+
+class EgressIpMonitor:
+    """定期检测某个代理的出口IP，缓存最近一次结果"""
+
+    def __init__(self, proxy_url=None, interval=60, ttl=None, idle_timeout=None, log_callback=None):
+        self.proxy_url = proxy_url
+        self.interval = interval                         # 刷新间隔（秒）
+        self.ttl = ttl or interval * 2                   # 缓存有效期（秒）
+        self.idle_timeout = idle_timeout or interval * 3  # 无人读取多久后停止后台任务（秒）
+        self.log_callback = log_callback
+
+        self.current_ip = None
+        self.checked_at = 0.0      # 最近一次检测成功的时间（time.monotonic）
+        self.last_access = 0.0     # 最近一次读取的时间
+        self.checks = 0            # 检测次数
+        self.failures = 0          # 检测失败次数
+        self.changes = 0           # 检测到的IP变化次数
+        self._task = None
+
+    def log(self, message, level="INFO"):
+        if self.log_callback:
+            self.log_callback(message, level)
+        else:
+            print(message)
+
+    @property
+    def is_fresh(self):
+        return self.current_ip is not None and time.monotonic() - self.checked_at < self.ttl
+
+    def get_ip(self):
+        """读取缓存的出口IP（不发请求）；需在事件循环中调用，必要时启动后台刷新任务"""
+        self.last_access = time.monotonic()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self.current_ip
+
+    async def refresh(self, max_retries=3):
+        """立即检测一次出口IP，返回检测到的IP（失败返回 None）"""
+        session = get_http_client().session()
+        for attempt in range(max_retries):
+            self.checks += 1
+            try:
+                async with session.get(IP_CHECK_URL, proxy=self.proxy_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    if response.status == 200:
+                        self._update((await response.text()).strip())
+                        return self.current_ip
+                    self.failures += 1
+                    self.log(f"IP检查失败，状态码: {response.status}", "WARNING")
+            except Exception as e:
+                self.failures += 1
+                self.log(f"检查IP变化时出错 (尝试 {attempt + 1}/{max_retries}): {e}", "WARNING")
+            if attempt < max_retries - 1:
+                await asyncio.sleep(2)
+        return None
+
+    def _update(self, ip):
+        if self.current_ip is None:
+            self.log(f"首次获取IP: {ip}")
+        elif ip != self.current_ip:
+            self.changes += 1
+            self.log(f"IP已变化: {self.current_ip} -> {ip}")
+        self.current_ip = ip
+        self.checked_at = time.monotonic()
+
+    async def _run(self):
+        while time.monotonic() - self.last_access < self.idle_timeout:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def get_stats(self):
+        return {
+            'ip': self.current_ip,
+            'fresh': self.is_fresh,
+            'age': round(time.monotonic() - self.checked_at, 1) if self.checked_at else None,
+            'checks': self.checks,
+            'failures': self.failures,
+            'changes': self.changes,
+        }
+
+
+# (事件循环, 代理URL) -> EgressIpMonitor；后台任务属于创建它的事件循环
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_ip_monitor(proxy_url=None):
+    """获取当前事件循环中某个代理的出口IP检测器（不存在时创建）"""
+    loop = asyncio.get_running_loop()
+    with _monitors_lock:
+        for key in [key for key, (owner, _monitor) in _monitors.items() if owner.is_closed()]:
+            del _monitors[key]
+        entry = _monitors.get((id(loop), proxy_url))
+        if entry is None or entry[0] is not loop:
+            entry = (loop, EgressIpMonitor(proxy_url, load_crawler_config()['ip_check_interval']))
+            _monitors[(id(loop), proxy_url)] = entry
+        return entry[1]
@@ -0,0 +1,97 @@
+"""
+供应商页面执照解析
+
+以前 extract_license_info_from_html 对整页HTML执行10次未编译的 re.search（每个字段一次，
+页面上没有该字段时每次都扫描整页），extract_licenses_from_html 再用 re.findall 扫描一遍找图片，
+然后对每个 fileId 嵌套循环检查7种尺寸后缀。这里只解析一次页面，两个调用方共用结果：
+
+- 10个字段合成一个预编译正则（以 <span> 开头），一次扫描取出全部字段
+- 图片URL一个预编译正则（以 https://sc04.alicdn.com/kf/ 开头），一次扫描
+- 尺寸后缀用预编译正则判断
+
+没有把字段和图片合成一个正则：两个分支的开头不同，合并后正则引擎无法按固定前缀快速跳过，
+实测比原来的11次扫描还慢；两个带固定前缀的正则各扫描一次要快得多。解析结果：
+
+- 执照字段：每个字段取第一次出现的值（与原来 re.search 的结果一致）
+- 执照候选图片：sc04.alicdn.com/kf/ 下的 jpg/png，去掉缩略图尺寸后缀后按 fileId 去重，
+  保持第一次出现的顺序；去掉后缀后仍带尺寸标记的图片丢弃（与原来的规则一致）
+
+    parsed = parse_license_page(html)
+    parsed.license_info   # {字段: 值}，一个字段都没有时为 None
+    parsed.images         # [(url, fileId, 扩展名), ...]
+
+吞吐量对比见 bench_license_parser.py。
+"""
+
+import re
+
+# 页面上的标签 -> 执照信息字段
+LICENSE_FIELD_LABELS = {
+    'Registration No.': 'registration_no',
+    'Company Name': 'company_name',
+    'Date of Issue': 'date_of_issue',
+    'Date of Expiry': 'date_of_expiry',
+    'Registered Capital': 'registered_capital',
+    'Country/Territory': 'country_territory',
+    'Registered address': 'registered_address',
+    'Year Established': 'year_established',
+    'Legal Form': 'legal_form',
+    'Legal Representative': 'legal_representative',
+}
+
+IMAGE_URL_PREFIX = 'https://sc04.alicdn.com/kf/'
+
+# 缩略图尺寸后缀
+THUMBNAIL_SIZES = ('50x50', '80x80', '100x100', '120x120', '200x200', '250x250', '350x350')
+
+_FIELD_PATTERN = re.compile(
+    r'<span>(' + '|'.join(re.escape(label) for label in LICENSE_FIELD_LABELS) + r')</span>\s*:\s*([^<]+)'
+)
+_IMAGE_PATTERN = re.compile(re.escape(IMAGE_URL_PREFIX) + r'([^"]+\.(jpg|png))')
+_SIZE_ALTERNATION = '|'.join(THUMBNAIL_SIZES)
+# 文件名末尾的尺寸后缀（去掉后得到原图）
+_TRAILING_SIZE = re.compile(r'_(?:' + _SIZE_ALTERNATION + r')(?=\.(?:jpg|png)$)')
+# 文件名中任意位置的尺寸标记
+_ANY_SIZE = re.compile(r'_(?:' + _SIZE_ALTERNATION + r')')
+
+
+class LicensePage:
+    """一次扫描得到的执照字段和候选图片"""
+    __slots__ = ('fields', 'images')
+
+    def __init__(self, fields, images):
+        self.fields = fields
+        self.images = images
+
+    @property
+    def license_info(self):
+        """完整的执照信息（缺少的字段为空字符串），一个字段都没有时返回 None"""
+        if not self.fields:
+            return None
+        return {field: self.fields.get(field, '') for field in LICENSE_FIELD_LABELS.values()}
+
+
+def original_file_id(file_id):
+    """去掉缩略图尺寸后缀，返回原图的 fileId；仍带尺寸标记（不是原图）时返回 None"""
+    base_name = _TRAILING_SIZE.sub('', file_id, count=1)
+    if _ANY_SIZE.search(base_name):
+        return None
+    return base_name
+
+
+def parse_license_page(html_content):
+    """解析页面，取出执照字段和候选图片"""
+    fields = {}
+    for label, value in _FIELD_PATTERN.findall(html_content):
+        field = LICENSE_FIELD_LABELS[label]
+        if field not in fields:
+            fields[field] = value.strip()
+    # 值全是空白的字段视为没找到
+    fields = {field: value for field, value in fields.items() if value}
+
+    images = {}
+    for file_id, file_ext in _IMAGE_PATTERN.findall(html_content):
+        base_name = original_file_id(file_id)
+        if base_name is not None and base_name not in images:
+            images[base_name] = (IMAGE_URL_PREFIX + base_name, base_name, file_ext)
+    return LicensePage(fields, list(images.values()))
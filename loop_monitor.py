@@ -0,0 +1,194 @@
+"""
+事件循环阻塞检测（调试用）
+
+协程里的同步请求、time.sleep、大段CPU计算都会卡住整个事件循环，所有在途的
+请求一起停下来，而且从日志上很难看出是谁卡的。LoopMonitor 用两种方式报告：
+
+- 开启 asyncio 调试模式，slow_callback_duration 设为阈值，单个回调执行超过阈值时
+  asyncio 会输出 "Executing <Handle ...> took 0.523 seconds"，这里转给 log_callback
+- 看门狗线程定期向事件循环投递心跳，心跳超过阈值仍未执行说明循环被阻塞，
+  立即抓取事件循环线程当时的调用栈，循环恢复后连同阻塞时长一起报告
+
+在 config.json 的 crawler 配置中开启（后台事件循环创建时启动）：
+    "crawler": {"loop_monitor": true, "loop_block_threshold": 0.1}
+
+LoopLagSampler 是轻量的延迟采样，不依赖调试模式，执照提取流水线运行时用它报告事件循环延迟。
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """接收 asyncio 调试模式输出的慢回调警告"""
+
+    def __init__(self, monitor):
+        super().__init__(logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+        except Exception:
+            return
+        if message.startswith('Executing '):
+            self.monitor._on_slow_callback(message)
+
+
+class LoopMonitor:
+    """检测并报告阻塞事件循环的回调"""
+
+    def __init__(self, loop, threshold=0.1, interval=None, log_callback=None):
+        self.loop = loop
+        self.threshold = threshold                       # 阻塞多久算慢（秒）
+        self.interval = interval or max(threshold, 0.05)  # 心跳间隔（秒）
+        self.log_callback = log_callback
+
+        self._stop = threading.Event()
+        self._thread = None
+        self._handler = None
+        self._loop_thread_id = None
+        self._previous_debug = None
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'blocks': 0,            # 看门狗检测到的阻塞次数
+            'blocked_time': 0.0,    # 累计阻塞时长（秒）
+            'max_block_ms': 0.0,    # 最长一次阻塞（毫秒）
+            'slow_callbacks': 0,    # asyncio 报告的慢回调次数
+        }
+
+    def log(self, message, level="WARNING"):
+        if self.log_callback:
+            self.log_callback(message, level)
+        else:
+            print(message)
+
+    def start(self):
+        """开启调试模式并启动看门狗线程（可在任意线程调用）"""
+        if self._thread is not None:
+            return
+        self._handler = _SlowCallbackHandler(self)
+        logging.getLogger('asyncio').addHandler(self._handler)
+        self.loop.call_soon_threadsafe(self._enable_debug)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    def _enable_debug(self):
+        # 在事件循环线程中执行，同时记下该线程ID用于抓取调用栈
+        self._loop_thread_id = threading.get_ident()
+        self._previous_debug = self.loop.get_debug()
+        self.loop.set_debug(True)
+        self.loop.slow_callback_duration = self.threshold
+
+    def stop(self):
+        """停止看门狗并恢复事件循环原来的调试设置"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(self.threshold + self.interval + 1)
+        self._thread = None
+        logging.getLogger('asyncio').removeHandler(self._handler)
+        self._handler = None
+        if self._previous_debug is not None and not self.loop.is_closed():
+            try:
+                self.loop.call_soon_threadsafe(self.loop.set_debug, self._previous_debug)
+            except RuntimeError:
+                pass
+
+    def _watch(self):
+        while not self._stop.is_set():
+            beat = threading.Event()
+            sent = time.perf_counter()
+            try:
+                self.loop.call_soon_threadsafe(beat.set)
+            except RuntimeError:
+                return  # 事件循环已关闭
+
+            if not beat.wait(self.threshold):
+                stack = self._loop_stack()
+                while not beat.wait(self.interval):
+                    if self._stop.is_set() or self.loop.is_closed():
+                        return
+                self._on_block(time.perf_counter() - sent, stack)
+
+            self._stop.wait(self.interval)
+
+    def _loop_stack(self):
+        """抓取事件循环线程当前的调用栈"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return ''
+        return ''.join(traceback.format_stack(frame, limit=8))
+
+    def _on_block(self, duration, stack):
+        with self._stats_lock:
+            self._stats['blocks'] += 1
+            self._stats['blocked_time'] += duration
+            self._stats['max_block_ms'] = max(self._stats['max_block_ms'], duration * 1000)
+        self.log(f"⚠️ 事件循环被阻塞 {duration * 1000:.0f} ms（阈值 {self.threshold * 1000:.0f} ms），阻塞时的调用栈:\n{stack}")
+
+    def _on_slow_callback(self, message):
+        with self._stats_lock:
+            self._stats['slow_callbacks'] += 1
+        self.log(f"⚠️ 慢回调: {message}")
+
+    def get_stats(self):
+        """获取阻塞统计"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['blocked_time'] = round(stats['blocked_time'], 3)
+        stats['max_block_ms'] = round(stats['max_block_ms'], 1)
+        return stats
+
+
+class LoopLagSampler:
+    """测量事件循环延迟：定期 sleep，记录实际唤醒比预期晚了多少
+
+    与 LoopMonitor 不同，不开启调试模式也不抓调用栈，开销很小，可以在正常运行时使用。
+    start() 需要在事件循环中调用。
+    """
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self._task = None
+        self._stats = {
+            'samples': 0,
+            'lag_ms': 0.0,        # 最近一次的延迟
+            'max_lag_ms': 0.0,
+            'total_lag_ms': 0.0,
+        }
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(time.perf_counter() - started - self.interval, 0) * 1000
+            self._stats['samples'] += 1
+            self._stats['lag_ms'] = lag_ms
+            self._stats['max_lag_ms'] = max(self._stats['max_lag_ms'], lag_ms)
+            self._stats['total_lag_ms'] += lag_ms
+
+    def get_stats(self):
+        """获取延迟统计（毫秒）"""
+        stats = dict(self._stats)
+        stats['avg_lag_ms'] = round(stats['total_lag_ms'] / stats['samples'], 1) if stats['samples'] else 0
+        stats['lag_ms'] = round(stats['lag_ms'], 1)
+        stats['max_lag_ms'] = round(stats['max_lag_ms'], 1)
+        del stats['total_lag_ms']
+        return stats
@@ -11,6 +11,12 @@ import os
 from typing import Dict, List, Optional, Tuple
 from .amap_address_query import AmapAddressQuery
 
+try:
+    # 使用项目统一的连接工厂与读连接池（config.json 中的 database 配置）
+    from db_pool import connect, get_read_connection
+except ImportError:
+    connect = get_read_connection = None
+
 class AddressQuery:
     def __init__(self, db_path: str = None, amap_api_key: str = None):
         """
@@ -48,20 +54,28 @@ class AddressQuery:
         # 初始化数据库表结构（如果需要）
         self._init_database()
     
-    def _get_connection(self):
+    def _get_connection(self, write: bool = False):
         """
-        获取数据库连接（每次使用时创建新连接，解决线程安全问题）
+        获取数据库连接
+        
+        查询使用读连接池中的连接（close() 时归还，线程间复用）；
+        建表和导入数据等写操作使用独立连接。
+        
+        Args:
+            write: 是否需要写操作
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # 使结果可以通过列名访问
-        return conn
+        if write or get_read_connection is None:
+            conn = connect(self.db_path) if connect else sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row  # 使结果可以通过列名访问
+            return conn
+        return get_read_connection(self.db_path, row_factory=sqlite3.Row)
     
     def _init_database(self):
         """
         初始化数据库表结构
         """
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(write=True)
             
             # 检查表是否存在，如果不存在则创建
             cursor = conn.cursor()
@@ -102,7 +116,7 @@ class AddressQuery:
             sql_file_path: SQL文件路径
         """
         try:
-            conn = self._get_connection()
+            conn = self._get_connection(write=True)
             
             with open(sql_file_path, 'r', encoding='utf-8') as f:
                 sql_content = f.read()
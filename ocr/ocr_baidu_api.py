@@ -18,6 +18,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # 导入地址查询模块
 from ocr.address_query import AddressQuery
 
+try:
+    # 使用项目统一的共享HTTP客户端（连接复用、config.json 中的 http 配置）
+    from http_client import get_http_client
+except ImportError:
+    get_http_client = None
+
+
+def _http():
+    """返回共享HTTP客户端，不可用时退回 requests 模块（两者的 get/post 用法相同）"""
+    return get_http_client() if get_http_client else requests
+
 class BaiduLicenseOCRAPI:
     def __init__(self, api_key=None, secret_key=None):
         """
@@ -55,7 +66,7 @@ class BaiduLicenseOCRAPI:
                 "client_id": self.api_key,
                 "client_secret": self.secret_key
             }
-            response = requests.post(url, params=params)
+            response = _http().post(url, params=params)
             result = response.json()
             
             if "access_token" in result:
@@ -77,7 +88,7 @@ class BaiduLicenseOCRAPI:
             str: base64编码的图片数据
         """
         try:
-            response = requests.get(url, timeout=30)
+            response = _http().get(url, timeout=30)
             response.raise_for_status()
             return base64.b64encode(response.content).decode('utf-8')
         except Exception as e:
@@ -141,7 +152,7 @@ class BaiduLicenseOCRAPI:
                 'Content-Type': 'application/x-www-form-urlencoded'
             }
             
-            response = requests.post(url, headers=headers, data=payload)
+            response = _http().post(url, headers=headers, data=payload)
             result = response.json()
             
             if 'words_result' in result:
@@ -208,7 +219,7 @@ class BaiduLicenseOCRAPI:
                 'Content-Type': 'application/x-www-form-urlencoded'
             }
             
-            response = requests.post(url, headers=headers, data=payload)
+            response = _http().post(url, headers=headers, data=payload)
             result = response.json()
             
             if 'words_result' in result:
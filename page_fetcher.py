@@ -0,0 +1,52 @@
+"""
+搜索结果页并发抓取
+
+crawl_suppliers_range / crawl_suppliers_by_category 原来逐页 await，
+同一时间只有一个请求在途。这里提供：
+
+- fetch_pages()  有界并发窗口：最多 max_in_flight 个页面同时在途，
+                 按完成顺序返回结果，一个完成立即补上下一页
+
+请求本身的节奏由 request_pacer.AdaptiveHostPacer 控制。
+页面结果按完成顺序处理，入库依赖 company_id 唯一索引（INSERT OR IGNORE），
+同一页重复处理或乱序处理都不会产生重复数据。
+
+并发参数读取 config.json 的 crawler 配置：
+    "crawler": {"page_concurrency": 4, "max_concurrent_requests": 8}
+"""
+
+import asyncio
+
+
+async def fetch_pages(pages, fetch_page, max_in_flight=4):
+    """并发抓取页面，按完成顺序逐个返回 (页码, 结果, 异常)
+
+    fetch_page(page) 为协程函数；同时在途的页面不超过 max_in_flight。
+    调用方提前结束迭代时，尚未完成的请求会被取消。
+    """
+    page_iter = iter(pages)
+    in_flight = {}
+
+    def start_next():
+        for page in page_iter:
+            in_flight[asyncio.ensure_future(fetch_page(page))] = page
+            return
+
+    try:
+        for _ in range(max(1, max_in_flight)):
+            start_next()
+
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page = in_flight.pop(task)
+                start_next()
+                if task.cancelled():
+                    yield page, None, asyncio.CancelledError()
+                elif task.exception() is not None:
+                    yield page, None, task.exception()
+                else:
+                    yield page, task.result(), None
+    finally:
+        for task in in_flight:
+            task.cancel()
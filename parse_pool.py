@@ -0,0 +1,141 @@
+"""
+页面解析进程池
+
+供应商页面有几百KB，parse_license_page 的正则扫描是纯CPU计算，以前直接在后台事件循环里执行：
+请求并发高时解析和GIL成了上限，解析期间其它请求的网络回调也被推迟。开启进程池后：
+
+- 页面按 UTF-8 编码后交给子进程解析，子进程只传回执照字段和候选图片（几百字节），
+  不把整页HTML传回
+- 事件循环只等待结果，不执行正则扫描
+- 进程池在第一次解析时才启动，进程数默认等于CPU核数
+- get_stats() 统计在途（已提交、未返回）的解析数及其峰值、平均解析耗时
+
+在 config.json 的 crawler 配置中开启：
+    "crawler": {"parse_pool_enabled": true, "parse_pool_size": 0}    # 0 表示CPU核数
+
+    parsed = await parse_page(html)    # 未开启时在当前线程解析，结果与 parse_license_page 相同
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app_config import load_crawler_config
+from license_parser import LicensePage, parse_license_page
+
+
+def parse_html_bytes(data):
+    """子进程中执行：解析页面，返回 (执照字段, 候选图片)"""
+    parsed = parse_license_page(data.decode('utf-8', errors='replace'))
+    return parsed.fields, parsed.images
+
+
+class ParsePool:
+    """在子进程中解析供应商页面"""
+
+    def __init__(self, processes=None):
+        self.processes = processes or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'pending': 0,        # 已提交、未返回的解析数（进程池的队列深度）
+            'max_pending': 0,
+            'parse_time': 0.0,   # 从提交到拿到结果的累计耗时（秒）
+            'bytes': 0,
+        }
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.processes)
+            return self._executor
+
+    async def parse(self, html_content):
+        """在子进程中解析页面，返回 LicensePage"""
+        data = html_content.encode('utf-8') if isinstance(html_content, str) else html_content
+        executor = self._get_executor()
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._stats['bytes'] += len(data)
+            self._stats['pending'] += 1
+            self._stats['max_pending'] = max(self._stats['max_pending'], self._stats['pending'])
+        started = time.perf_counter()
+        success = False
+        try:
+            fields, images = await asyncio.get_running_loop().run_in_executor(executor, parse_html_bytes, data)
+            success = True
+        finally:
+            with self._lock:
+                self._stats['pending'] -= 1
+                self._stats['completed' if success else 'failed'] += 1
+                self._stats['parse_time'] += time.perf_counter() - started
+        return LicensePage(fields, images)
+
+    @property
+    def pending(self):
+        return self._stats['pending']
+
+    def get_stats(self):
+        """获取解析数量、队列深度和耗时统计"""
+        with self._lock:
+            stats = dict(self._stats)
+        finished = stats['completed'] + stats['failed']
+        stats['processes'] = self.processes
+        stats['avg_parse_ms'] = round(stats['parse_time'] * 1000 / finished, 1) if finished else 0
+        stats['parse_time'] = round(stats['parse_time'], 3)
+        return stats
+
+    def format_stats(self):
+        stats = self.get_stats()
+        return (f"解析进程池（{stats['processes']} 个进程）: 完成 {stats['completed']}，失败 {stats['failed']}，"
+                f"在途 {stats['pending']}（峰值 {stats['max_pending']}），平均 {stats['avg_parse_ms']} ms，"
+                f"共 {stats['bytes'] / 1024 / 1024:.2f} MB")
+
+    def close(self):
+        """关闭进程池（等待在途的解析完成）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool():
+    """获取全局共享的解析进程池；配置中未开启时返回 None"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            config = load_crawler_config()
+            if not config['parse_pool_enabled']:
+                return None
+            _pool = ParsePool(config['parse_pool_size'] or None)
+        return _pool
+
+
+async def parse_page(html_content):
+    """解析供应商页面：开启进程池时在子进程中解析，否则在当前线程解析"""
+    pool = get_parse_pool()
+    if pool is None:
+        return parse_license_page(html_content)
+    return await pool.parse(html_content)
+
+
+def close_parse_pool():
+    """关闭全局解析进程池"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(close_parse_pool)
@@ -0,0 +1,203 @@
+"""
+按主机自适应的请求节奏控制
+
+以前的节奏控制分散在各处且固定不变：页面之间随机等待、提取批次之间固定
+等待1秒、逐个提取时随机等待0.5~1秒、请求失败后线性等待2/4/6秒。现在所有
+经过 fetch_with_proxy 的请求、执照图片的探测和下载都先从 AdaptiveHostPacer 领取令牌
+（同步代码用 wait_blocking()，或直接用 paced_get()）：
+
+- 每个主机一个令牌桶，速率上限 max_rate（由 host_min_interval 换算），允许 burst 个突发
+- 收到 429/5xx 或请求出错时速率减半（不低于 min_rate），有 Retry-After 时暂停到指定时间
+- 响应慢于 slow_response_threshold 秒时速率降到 80%
+- 正常响应时每次恢复 max_rate 的 5%，逐步回到上限
+- 重试等待按指数退避加随机抖动，优先使用服务器给出的 Retry-After
+
+速率下降在同一主机上每秒最多生效一次，避免同一批在途请求同时失败时把速率压到底。
+参数读取 config.json 的 crawler 配置：
+    "crawler": {"host_min_interval": 0.2, "host_burst": 2, "host_min_rate": 0.2,
+                "slow_response_threshold": 5.0, "retry_base_delay": 1.0, "retry_max_delay": 30.0}
+"""
+
+import asyncio
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+from app_config import load_crawler_config
+from http_client import get_http_client
+
+BACKOFF_FACTOR = 0.5      # 429/5xx/出错时的速率系数
+SLOW_FACTOR = 0.8         # 慢响应时的速率系数
+RECOVER_RATIO = 0.05      # 每次正常响应恢复的速率（占上限的比例）
+DECREASE_COOLDOWN = 1.0   # 同一主机两次降速的最小间隔（秒）
+MAX_RETRY_AFTER = 60.0    # Retry-After 最多等待（秒）
+
+
+def parse_retry_after(value):
+    """解析 Retry-After 秒数（HTTP日期格式或无法解析时返回 None）"""
+    if value is None:
+        return None
+    try:
+        return min(max(float(value), 0.0), MAX_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostState:
+    __slots__ = ('rate', 'tokens', 'updated', 'paused_until', 'last_decrease',
+                 'requests', 'throttled', 'slow', 'waited')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.tokens = burst
+        self.updated = now
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.requests = 0
+        self.throttled = 0     # 429/5xx/出错次数
+        self.slow = 0          # 慢响应次数
+        self.waited = 0.0      # 累计等待时间（秒）
+
+
+class AdaptiveHostPacer:
+    """按主机的令牌桶，根据响应状态和耗时调整速率"""
+
+    def __init__(self, max_rate=5.0, min_rate=0.2, burst=2, slow_threshold=5.0,
+                 retry_base_delay=1.0, retry_max_delay=30.0):
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.burst = max(1, burst)
+        self.slow_threshold = slow_threshold
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+
+        # wait() 只在持锁时预约令牌，不跨 await 持锁；多个线程/事件循环可以共用
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _state(self, host, now):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.max_rate, self.burst, now)
+        return state
+
+    async def wait(self, url):
+        """等待该URL所在主机的下一个令牌"""
+        delay = self._reserve(url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait_blocking(self, url):
+        """同步等待该URL所在主机的下一个令牌（供线程中的同步请求使用，不要在事件循环中调用）"""
+        delay = self._reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _reserve(self, url):
+        """预约一个令牌，返回需要等待的秒数"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host, now)
+            state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            # 令牌为负表示前面已有请求在排队，按当前速率推算轮到自己的时间
+            state.tokens -= 1
+            delay = -state.tokens / state.rate if state.tokens < 0 else 0.0
+            delay = max(delay, state.paused_until - now)
+            state.requests += 1
+            state.waited += delay
+        return delay
+
+    def record(self, url, status=None, latency=None, error=False, retry_after=None):
+        """记录一次响应，据此调整该主机的速率"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            state = self._state(host, now)
+            if error or status == 429 or (status is not None and status >= 500):
+                state.throttled += 1
+                self._decrease(state, BACKOFF_FACTOR, now)
+                retry_after = parse_retry_after(retry_after)
+                if retry_after:
+                    state.paused_until = max(state.paused_until, now + retry_after)
+            elif latency is not None and latency > self.slow_threshold:
+                state.slow += 1
+                self._decrease(state, SLOW_FACTOR, now)
+            elif status is not None and status < 400:
+                state.rate = min(self.max_rate, state.rate + self.max_rate * RECOVER_RATIO)
+
+    def _decrease(self, state, factor, now):
+        if now - state.last_decrease < DECREASE_COOLDOWN:
+            return
+        state.last_decrease = now
+        state.rate = max(self.min_rate, state.rate * factor)
+        # 丢弃积攒的突发令牌，降速立即生效
+        state.tokens = min(state.tokens, 0.0)
+
+    def retry_delay(self, attempt, retry_after=None):
+        """第 attempt 次（从0开始）失败后的重试等待：指数退避加抖动，有 Retry-After 时优先使用"""
+        retry_after = parse_retry_after(retry_after)
+        if retry_after:
+            return retry_after
+        delay = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        return round(delay * random.uniform(0.5, 1.0), 2)
+
+    def get_stats(self):
+        """获取各主机当前速率和限流统计"""
+        with self._lock:
+            return {
+                host: {
+                    'rate': round(state.rate, 2),
+                    'requests': state.requests,
+                    'throttled': state.throttled,
+                    'slow': state.slow,
+                    'avg_wait_ms': round(state.waited * 1000 / state.requests, 1) if state.requests else 0,
+                }
+                for host, state in self._hosts.items()
+            }
+
+    def format_stats(self):
+        parts = [
+            f"{host} {stats['rate']}/秒（{stats['requests']} 次，限流 {stats['throttled']}，慢响应 {stats['slow']}，"
+            f"平均等待 {stats['avg_wait_ms']} ms）"
+            for host, stats in self.get_stats().items()
+        ]
+        return "请求节奏: " + ("；".join(parts) if parts else "无请求")
+
+
+_pacer = None
+_pacer_lock = threading.Lock()
+
+
+def get_host_pacer():
+    """获取全局共享的主机节奏控制器（按 config.json 的 crawler 配置创建）"""
+    global _pacer
+    with _pacer_lock:
+        if _pacer is None:
+            config = load_crawler_config()
+            min_interval = config['host_min_interval']
+            _pacer = AdaptiveHostPacer(
+                max_rate=1.0 / min_interval if min_interval > 0 else 1000.0,
+                min_rate=config['host_min_rate'],
+                burst=config['host_burst'],
+                slow_threshold=config['slow_response_threshold'],
+                retry_base_delay=config['retry_base_delay'],
+                retry_max_delay=config['retry_max_delay'],
+            )
+        return _pacer
+
+
+def paced_get(url, **kwargs):
+    """按主机节奏发出同步 GET 请求并记录响应（供界面中同步下载执照图片使用）"""
+    pacer = get_host_pacer()
+    pacer.wait_blocking(url)
+    started = time.monotonic()
+    try:
+        response = get_http_client().get(url, **kwargs)
+    except Exception:
+        pacer.record(url, latency=time.monotonic() - started, error=True)
+        raise
+    pacer.record(url, response.status_code, time.monotonic() - started, retry_after=response.headers.get('Retry-After'))
+    return response
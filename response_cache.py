@@ -0,0 +1,221 @@
+"""
+HTTP响应磁盘缓存
+
+以前没有任何响应缓存：改了解析逻辑后重新提取、或者崩溃后重试，所有搜索结果
+和供应商页面都要重新下载。ResponseCache 把成功的响应压缩后存入独立的 SQLite 文件：
+
+- 搜索接口的响应由 fetch_with_proxy 写入，读取时使用较短的 response_cache_api_ttl，
+  增量爬取能看到新上架的供应商
+- 供应商页面在解析出执照信息后才写入（cache_supplier_page），验证码、登录页等
+  返回200但没有内容的页面不会被缓存
+
+- 缓存键是规范化后的URL：去掉每次都会变的参数（build_search_url 里的
+  requestId、startTime），其余参数按名称排序
+- 响应体用 zlib 压缩，超过 ttl 秒视为过期
+- 缓存总大小超过 max_mb 时按最近访问时间淘汰，直到降到上限的 90%
+- 三种模式：use（读写缓存）、refresh（不读缓存、重新下载后写入）、bypass（完全不用缓存）
+- get_stats() 统计命中率、过期数、写入数、淘汰数和节省的下载量
+
+SQLite 读写是同步的，协程中使用 get_async/put_async（在线程池中执行），不阻塞事件循环。
+参数读取 config.json 的 crawler 配置：
+    "crawler": {"response_cache_mode": "use", "response_cache_path": "http_cache.db",
+                "response_cache_ttl": 86400, "response_cache_api_ttl": 600, "response_cache_max_mb": 512}
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from app_config import load_crawler_config
+
+CACHE_MODES = ('use', 'refresh', 'bypass')
+
+# 每次请求都会变化、不影响响应内容的URL参数
+VOLATILE_PARAMS = frozenset({'requestId', 'startTime'})
+
+EVICT_TARGET = 0.9     # 淘汰到上限的多少
+COMPRESS_LEVEL = 6
+
+
+def canonicalize_url(url):
+    """规范化URL：协议和主机转小写，去掉易变参数和片段，其余参数按名称排序"""
+    parsed = urlparse(url)
+    params = sorted((key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                    if key not in VOLATILE_PARAMS)
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path or '/', '', urlencode(params), ''))
+
+
+def cache_key(url):
+    return hashlib.sha1(canonicalize_url(url).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """按规范化URL缓存压缩后的响应体"""
+
+    def __init__(self, path='http_cache.db', ttl=86400, max_mb=512, mode='use'):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.mode = mode if mode in CACHE_MODES else 'use'
+
+        # 同一连接在线程池的多个线程中使用，所有访问都在锁内
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                raw_size INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)')
+        self._total_size = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,         # 找到但已过期
+            'stores': 0,
+            'evictions': 0,
+            'bytes_saved': 0,     # 命中时省下的下载量（未压缩大小）
+        }
+
+    def reads_enabled(self, mode=None):
+        return (mode or self.mode) == 'use'
+
+    def writes_enabled(self, mode=None):
+        return (mode or self.mode) != 'bypass'
+
+    def get(self, url, ttl=None, mode=None):
+        """读取未过期的缓存响应体，没有时返回 None"""
+        if not self.reads_enabled(mode):
+            return None
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT body, raw_size, stored_at FROM responses WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self._stats['misses'] += 1
+                return None
+            body, raw_size, stored_at = row
+            if now - stored_at > (self.ttl if ttl is None else ttl):
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            self._conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+            self._stats['hits'] += 1
+            self._stats['bytes_saved'] += raw_size
+        return zlib.decompress(body)
+
+    def put(self, url, body, mode=None):
+        """写入响应体（bytes），写入后超过大小上限时淘汰最久未访问的条目"""
+        if not self.writes_enabled(mode) or body is None:
+            return
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        compressed = zlib.compress(body, COMPRESS_LEVEL)
+        if len(compressed) > self.max_bytes:
+            return
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._conn.execute('''
+                INSERT INTO responses (key, url, body, raw_size, size, stored_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    url = excluded.url, body = excluded.body, raw_size = excluded.raw_size,
+                    size = excluded.size, stored_at = excluded.stored_at, accessed_at = excluded.accessed_at
+            ''', (key, canonicalize_url(url), compressed, len(body), len(compressed), now, now))
+            self._total_size += len(compressed) - (old[0] if old else 0)
+            self._stats['stores'] += 1
+            if self._total_size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """按最近访问时间淘汰，直到总大小降到上限的 EVICT_TARGET（持锁调用）"""
+        target = self.max_bytes * EVICT_TARGET
+        rows = self._conn.execute('SELECT key, size FROM responses ORDER BY accessed_at').fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._total_size <= target:
+                break
+            evicted.append((key,))
+            self._total_size -= size
+        self._conn.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        self._stats['evictions'] += len(evicted)
+
+    async def get_async(self, url, ttl=None, mode=None):
+        if not self.reads_enabled(mode):
+            return None
+        return await asyncio.to_thread(self.get, url, ttl, mode)
+
+    async def put_async(self, url, body, mode=None):
+        if not self.writes_enabled(mode):
+            return
+        await asyncio.to_thread(self.put, url, body, mode)
+
+    def purge_expired(self):
+        """删除所有过期条目，返回删除数量"""
+        with self._lock:
+            cutoff = time.time() - self.ttl
+            removed = self._conn.execute('SELECT COALESCE(SUM(size), 0), COUNT(*) FROM responses WHERE stored_at < ?', (cutoff,)).fetchone()
+            self._conn.execute('DELETE FROM responses WHERE stored_at < ?', (cutoff,))
+            self._total_size -= removed[0]
+            return removed[1]
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._total_size = 0
+
+    def get_stats(self):
+        """获取命中率和缓存大小统计"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+            stats['size_mb'] = round(self._total_size / 1024 / 1024, 2)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] * 100 / lookups, 1) if lookups else 0
+        stats['mode'] = self.mode
+        return stats
+
+    def format_stats(self):
+        stats = self.get_stats()
+        return (f"响应缓存（{stats['mode']}）: 命中 {stats['hits']}/{stats['hits'] + stats['misses']}（{stats['hit_rate']}%），"
+                f"过期 {stats['expired']}，写入 {stats['stores']}，淘汰 {stats['evictions']}，"
+                f"节省下载 {stats['bytes_saved'] / 1024 / 1024:.2f} MB；共 {stats['entries']} 条 {stats['size_mb']} MB")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """获取全局共享的响应缓存（按 config.json 的 crawler 配置创建）"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            config = load_crawler_config()
+            _cache = ResponseCache(
+                path=config['response_cache_path'],
+                ttl=config['response_cache_ttl'],
+                max_mb=config['response_cache_max_mb'],
+                mode=config['response_cache_mode'],
+            )
+        return _cache
@@ -0,0 +1,78 @@
+"""
+数据库列表分页查询
+
+供应商列表按 (created_at, id) 倒序显示。以前每次翻页都 LIMIT ? OFFSET ?，
+页码越大扫描越多；现在以当前页的首行/末行为锚点做键集分页，翻页耗时与页码无关：
+
+- next/prev       以当前页末行/首行的 (created_at, id) 为锚点，向后/向前取一页
+- current         以当前页首行为锚点刷新当前页（新插入的供应商不会把当前页挤走）
+- first/last      从两端直接取（末页倒序取最后几行）
+- jump            输入页码跳转：锚点只知道当前页的位置，到任意第 N 页必须数过前面的行，
+                  这里仍用 OFFSET，但从离目标页更近的一端数（后半部分的页倒序取），
+                  最多扫描一半的行
+
+created_at 相同的行按 id 区分，行值比较 (created_at, id) < (?, ?) 保证不重复、不遗漏。
+
+    rows, first_key, last_key = fetch_supplier_page(cursor, filter_sql, 'next', page, page_size, total, first_key, last_key)
+"""
+
+# 数据库列表查询的字段（末尾的created_at用于键集分页）
+SUPPLIER_LIST_COLUMNS = "id, company_name, action_url, license_extracted, category_id, category_name, is_used, ocr_recognition_status, created_at"
+
+PAGE_NAVIGATIONS = ('first', 'next', 'prev', 'current', 'last', 'jump')
+
+
+def page_count(total_count, page_size):
+    return max(1, (total_count + page_size - 1) // page_size)
+
+
+def fetch_supplier_page(cursor, filter_sql, nav, page, page_size, total_count, first_key=None, last_key=None):
+    """查询列表的第 page 页，返回 (行列表, 首行键, 末行键)
+
+    nav 为 PAGE_NAVIGATIONS 之一；first_key/last_key 是上一次查询返回的当前页首行/末行的
+    (created_at, id)，缺少锚点时按页码定位。total_count 为过滤条件下的总数（末页和跳转时使用）。
+    """
+    if page <= 1:
+        nav = 'first'
+
+    conditions = [filter_sql] if filter_sql else []
+    params = []
+    descending = True
+    limit = page_size
+    offset = 0
+
+    if nav == 'next' and last_key:
+        conditions.append("(created_at, id) < (?, ?)")
+        params.extend(last_key)
+    elif nav == 'prev' and first_key:
+        conditions.append("(created_at, id) > (?, ?)")
+        params.extend(first_key)
+        descending = False
+    elif nav == 'current' and first_key:
+        conditions.append("(created_at, id) <= (?, ?)")
+        params.extend(first_key)
+    elif nav != 'first':
+        # 末页、页码跳转或没有锚点：按页码定位，后半部分的页从末尾倒序数
+        page = min(page, page_count(total_count, page_size))
+        skip = (page - 1) * page_size
+        limit = min(page_size, total_count - skip)
+        if nav == 'last' or skip > total_count // 2:
+            descending = False
+            offset = max(0, total_count - skip - limit)
+        else:
+            offset = skip
+
+    where_clause = " WHERE " + " AND ".join(f"({condition})" for condition in conditions) if conditions else ""
+    order = "DESC" if descending else "ASC"
+    cursor.execute(
+        f"SELECT {SUPPLIER_LIST_COLUMNS} FROM suppliers{where_clause} "
+        f"ORDER BY created_at {order}, id {order} LIMIT ? OFFSET ?",
+        params + [max(limit, 1), offset]
+    )
+    rows = cursor.fetchall()
+    if not descending:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+    return rows, (rows[0][-1], rows[0][0]), (rows[-1][-1], rows[-1][0])
@@ -0,0 +1,169 @@
+"""
+供应商指标数值化
+
+接口返回的评分、准时发货率、成交笔数、成交额、金牌年限、员工人数都是展示文本
+（如 "4.8/5.0"、"98.5%"、"1,200+"、"US$ 1M - 5M"、"5 yrs"、"51-100 人"），
+入库时同时解析为数值字段，便于按范围筛选和排序：
+
+    review_score_value       评分
+    on_time_shipping_rate    准时发货率（百分数）
+    transaction_count_value  近6个月成交笔数
+    transaction_gmv_min/max  近6个月成交额区间（无上限时max为NULL）
+    gold_years_value         金牌供应商年限
+    employees_min/max        员工人数区间（无上限时max为NULL）
+
+已有数据的回填：run_backfill() 把解析函数注册为 SQLite 函数，按ID分段执行
+UPDATE ... SET 字段 = 函数(原文本)，整列在数据库内批量计算，不逐行读回Python。
+也可以直接运行本文件：python supplier_metrics.py [数据库路径]
+"""
+
+import re
+import sys
+
+# 数值单位（英文缩写、英文单词、中文）
+_UNIT_MULTIPLIERS = {
+    'k': 1e3, 'thousand': 1e3, '千': 1e3,
+    'm': 1e6, 'million': 1e6, '百万': 1e6,
+    'b': 1e9, 'billion': 1e9,
+    '万': 1e4, '亿': 1e8,
+}
+
+_NUMBER_RE = re.compile(r'(\d+(?:,\d{3})*(?:\.\d+)?)\s*(thousand|million|billion|百万|[kmb万亿千](?![a-z]))?', re.IGNORECASE)
+
+# 表示"以下"和"以上"的写法
+_BELOW_WORDS = ('below', 'less than', 'under', 'fewer than', '以下', '少于', '低于')
+_ABOVE_WORDS = ('above', 'over', 'more than', '+', '以上', '超过')
+
+
+def _numbers(text):
+    """提取文本中的所有数值（已换算单位）"""
+    values = []
+    for number, unit in _NUMBER_RE.findall(text):
+        value = float(number.replace(',', ''))
+        if unit:
+            value *= _UNIT_MULTIPLIERS[unit.lower()]
+        values.append(value)
+    return values
+
+
+def _text(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def parse_number(value):
+    """解析第一个数值，如 "4.8/5.0" -> 4.8、"5 yrs" -> 5.0，无法解析返回 None"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    numbers = _numbers(_text(value))
+    return numbers[0] if numbers else None
+
+
+def parse_count(value):
+    """解析计数，如 "1,200+" -> 1200、"1.2K" -> 1200"""
+    number = parse_number(value)
+    return int(number) if number is not None else None
+
+
+def parse_percent(value):
+    """解析百分比，如 "98.5%" -> 98.5；小数形式 "0.985" 换算为 98.5"""
+    text = _text(value)
+    number = parse_number(value)
+    if number is None:
+        return None
+    if '%' not in text and 0 < number <= 1:
+        number *= 100
+    return round(number, 2)
+
+
+def parse_range(value):
+    """解析区间，返回 (下限, 上限)，无上限时上限为 None
+
+    "51 - 100 staff" -> (51, 100)，"US$ 1M+" -> (1000000, None)，
+    "Below US$1 Million" -> (0, 1000000)，"1000人以上" -> (1000, None)
+    """
+    text = _text(value)
+    numbers = _numbers(text)
+    if not numbers:
+        return None, None
+    lowered = text.lower()
+    if len(numbers) >= 2:
+        return min(numbers[0], numbers[1]), max(numbers[0], numbers[1])
+    if any(word in lowered for word in _BELOW_WORDS):
+        return 0.0, numbers[0]
+    if any(word in lowered for word in _ABOVE_WORDS):
+        return numbers[0], None
+    return numbers[0], numbers[0]
+
+
+def _range_bound(value, index, as_int=False):
+    bound = parse_range(value)[index]
+    if bound is None:
+        return None
+    return int(bound) if as_int else bound
+
+
+# 数值字段 -> (原文本字段, 解析函数)，入库和回填共用
+METRIC_COLUMNS = {
+    'review_score_value': ('review_score', parse_number),
+    'on_time_shipping_rate': ('company_on_time_shipping', parse_percent),
+    'transaction_count_value': ('transaction_count_6months', parse_count),
+    'transaction_gmv_min': ('transaction_gmv_6months_text', lambda value: _range_bound(value, 0)),
+    'transaction_gmv_max': ('transaction_gmv_6months_text', lambda value: _range_bound(value, 1)),
+    'gold_years_value': ('gold_years', parse_count),
+    'employees_min': ('total_employees_text', lambda value: _range_bound(value, 0, as_int=True)),
+    'employees_max': ('total_employees_text', lambda value: _range_bound(value, 1, as_int=True)),
+}
+
+
+def supplier_metric_values(supplier):
+    """按 METRIC_COLUMNS 的顺序返回供应商字典的数值字段"""
+    return tuple(parse(supplier.get(source)) for source, parse in METRIC_COLUMNS.values())
+
+
+def register_metric_functions(conn):
+    """把解析函数注册为 SQLite 函数 metric_<字段名>(原文本)"""
+    for column, (_source, parse) in METRIC_COLUMNS.items():
+        conn.create_function(f'metric_{column}', 1, parse, deterministic=True)
+
+
+def backfill_metrics(conn, start_id=None, end_id=None):
+    """在数据库内批量计算数值字段（需在写事务中调用），返回更新行数"""
+    register_metric_functions(conn)
+    assignments = ', '.join(f'{column} = metric_{column}({source})' for column, (source, _parse) in METRIC_COLUMNS.items())
+    where_clause, params = '', ()
+    if start_id is not None and end_id is not None:
+        where_clause, params = ' WHERE id BETWEEN ? AND ?', (start_id, end_id)
+    return conn.execute(f'UPDATE suppliers SET {assignments}{where_clause}', params).rowcount
+
+
+def run_backfill(db_path, chunk_size=5000, log_callback=None):
+    """通过写线程分段回填全部供应商的数值字段，每段一个写命令，避免长时间占用写锁"""
+    from db_pool import get_read_connection
+    from db_writer import get_writer
+
+    conn = get_read_connection(db_path)
+    try:
+        min_id, max_id = conn.execute('SELECT MIN(id), MAX(id) FROM suppliers').fetchone()
+    finally:
+        conn.close()
+    if min_id is None:
+        return 0
+
+    writer = get_writer(db_path)
+    futures = [
+        writer.submit(backfill_metrics, start, min(start + chunk_size - 1, max_id))
+        for start in range(min_id, max_id + 1, chunk_size)
+    ]
+    updated = 0
+    for future in futures:
+        updated += future.result()
+        if log_callback:
+            log_callback(f"供应商指标回填进度: {updated} 条", "INFO")
+    return updated
+
+
+if __name__ == '__main__':
+    target = sys.argv[1] if len(sys.argv) > 1 else 'alibaba_supplier_data.db'
+    print(f"已回填 {run_backfill(target, log_callback=lambda message, level: print(message))} 条供应商指标")
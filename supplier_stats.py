@@ -0,0 +1,69 @@
+"""
+供应商状态计数
+
+supplier_stats 表按 (维度, 取值) 保存供应商数量，由 suppliers 表上的触发器
+（见 db_migrations.migration_003_supplier_stats）在插入、更新、删除时维护，
+GUI 和 check_db.py 读取计数不再对 suppliers 做 COUNT(*) 扫描。
+
+维度：
+- all               全部供应商（value 为空字符串）
+- license_extracted 是否已提取执照（'0' / '1'）
+- extract_state     pending（未提取且未跳过）/ recognized（已提取且OCR完成）/ other
+- skip_extraction   是否跳过提取（'0' / '1'）
+- ocr_status        ocr_recognition_status 的取值
+- is_used           是否已使用（'0' / '1'）
+- category_id       分类ID（无分类为空字符串）
+"""
+
+# 各维度取值的SQL表达式（row 为 NEW / OLD / suppliers），触发器与重建共用
+STAT_DIMENSIONS = [
+    ('all', "''"),
+    ('license_extracted', "CAST(COALESCE({row}.license_extracted, 0) AS TEXT)"),
+    ('extract_state', """CASE
+        WHEN COALESCE({row}.license_extracted, 0) = 0 AND COALESCE({row}.skip_extraction, 0) = 0 THEN 'pending'
+        WHEN {row}.license_extracted = 1 AND {row}.ocr_recognition_status IN ('success', 'completed') THEN 'recognized'
+        ELSE 'other' END"""),
+    ('skip_extraction', "CAST(COALESCE({row}.skip_extraction, 0) AS TEXT)"),
+    ('ocr_status', "COALESCE({row}.ocr_recognition_status, 'pending')"),
+    ('is_used', "CAST(COALESCE({row}.is_used, 0) AS TEXT)"),
+    ('category_id', "COALESCE(CAST({row}.category_id AS TEXT), '')"),
+]
+
+# 影响计数的字段，UPDATE 触发器只在这些字段变化时执行
+STAT_COLUMNS = ['license_extracted', 'skip_extraction', 'ocr_recognition_status', 'is_used', 'category_id']
+
+
+def stats_upsert_sql(row, sign):
+    """生成把一行计入（sign=1）或移出（sign=-1）计数的语句"""
+    values = ",\n            ".join(f"('{dimension}', {expr.format(row=row)}, {sign})" for dimension, expr in STAT_DIMENSIONS)
+    return f'''
+        INSERT INTO supplier_stats (dimension, value, count)
+        VALUES
+            {values}
+        ON CONFLICT(dimension, value) DO UPDATE SET count = count + excluded.count;'''
+
+
+def rebuild_supplier_stats(conn):
+    """根据 suppliers 表重新计算全部计数（需在写事务中调用）"""
+    conn.execute('DELETE FROM supplier_stats')
+    for dimension, expr in STAT_DIMENSIONS:
+        value_expr = expr.format(row='suppliers')
+        conn.execute(f'''
+            INSERT INTO supplier_stats (dimension, value, count)
+            SELECT '{dimension}', {value_expr}, COUNT(*) FROM suppliers GROUP BY 2
+        ''')
+
+
+def get_supplier_stats(conn):
+    """读取全部计数，返回 {(维度, 取值): 数量}"""
+    rows = conn.execute('SELECT dimension, value, count FROM supplier_stats WHERE count > 0').fetchall()
+    return {(dimension, value): count for dimension, value, count in rows}
+
+
+def get_supplier_count(conn, dimension, value=''):
+    """读取单个计数（不存在时为0）"""
+    row = conn.execute(
+        'SELECT count FROM supplier_stats WHERE dimension = ? AND value = ?',
+        (dimension, str(value))
+    ).fetchone()
+    return row[0] if row else 0
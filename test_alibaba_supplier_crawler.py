@@ -0,0 +1,55 @@
+"""
+爬虫入库测试：整页供应商的新增/跳过统计和写入失败
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from alibaba_supplier_crawler import AlibabaSupplierCrawler
+from db_writer import get_writer
+
+
+@pytest.fixture
+def crawler(db_path):
+    # 不调用 __init__：默认数据库路径和分类文件都是工作目录下的文件
+    crawler = AlibabaSupplierCrawler.__new__(AlibabaSupplierCrawler)
+    crawler.db_path = db_path
+    return crawler
+
+
+def _supplier(company_id, name=None, keyword='测试'):
+    return {'company_id': company_id, 'company_name': name or f'供应商{company_id}',
+            'action_url': f'https://example.com/{company_id}', 'keyword': keyword}
+
+
+def _company_names(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return dict(conn.execute('SELECT company_id, company_name FROM suppliers'))
+    finally:
+        conn.close()
+
+
+def test_save_page_counts_new_and_existing(crawler, db_path):
+    assert asyncio.run(crawler.save_suppliers_page([_supplier('1'), _supplier('2')])) == (2, 0)
+
+    page = [_supplier('2', '新名称'), _supplier('3'), _supplier('1'), _supplier('4')]
+    assert asyncio.run(crawler.save_suppliers_page(page)) == (2, 2)
+    # 跳过重复时不覆盖已有记录
+    assert _company_names(db_path) == {'1': '供应商1', '2': '供应商2', '3': '供应商3', '4': '供应商4'}
+
+
+def test_save_page_refreshes_existing_without_skip(crawler, db_path):
+    asyncio.run(crawler.save_suppliers_page([_supplier('1')]))
+
+    assert asyncio.run(crawler.save_suppliers_page([_supplier('1', '新名称'), _supplier('2')], skip_duplicates=False)) == (1, 1)
+    assert _company_names(db_path) == {'1': '新名称', '2': '供应商2'}
+
+
+def test_save_page_failure_is_raised(crawler, db_path):
+    get_writer(db_path).execute('DROP TABLE suppliers')
+
+    with pytest.raises(sqlite3.OperationalError):
+        asyncio.run(crawler.save_suppliers_page([_supplier('1')]))
@@ -0,0 +1,123 @@
+"""
+爬取工作单元测试：继续或重新开始上一轮、失败次数上限、收缩范围后跳过剩余页面
+"""
+
+import asyncio
+import sqlite3
+
+from crawl_frontier import CrawlFrontier, make_run_id
+
+
+def _frontier(db_path, max_attempts=3):
+    return CrawlFrontier(db_path, 'keyword', ['led', 'lamp'], 1, 3, max_attempts=max_attempts)
+
+
+def _statuses(frontier, target):
+    conn = sqlite3.connect(frontier.db_path)
+    try:
+        return dict(conn.execute(
+            'SELECT page, status FROM crawl_frontier WHERE run_id = ? AND target = ? ORDER BY page',
+            (frontier.run_id, target)))
+    finally:
+        conn.close()
+
+
+async def _complete_all(frontier, skip=()):
+    for target in frontier.targets:
+        for page in range(frontier.start_page, frontier.end_page + 1):
+            if (target, page) not in skip:
+                await frontier.claim(target, page)
+                await frontier.complete(target, page)
+
+
+def test_run_id_ignores_target_order():
+    assert make_run_id('keyword', ['led', 'lamp'], 1, 3) == make_run_id('keyword', ['lamp', 'led'], 1, 3)
+    assert make_run_id('keyword', ['led', 'lamp'], 1, 3) != make_run_id('keyword', ['led', 'lamp'], 1, 4)
+
+
+def test_unfinished_run_is_resumed(db_path):
+    async def main():
+        frontier = _frontier(db_path)
+        assert await frontier.plan() is False
+        await frontier.claim('led', 1)
+        await frontier.complete('led', 1)
+        await frontier.claim('led', 2)   # 崩溃时停在 in_progress
+
+        resumed = _frontier(db_path)
+        assert await resumed.plan() is True
+        assert resumed.finished_pages('led') == {1}
+        assert resumed.finished_pages('lamp') == set()
+        assert _statuses(resumed, 'led') == {1: 'done', 2: 'in_progress', 3: 'pending'}
+
+    asyncio.run(main())
+
+
+def test_finished_run_restarts(db_path):
+    async def main():
+        frontier = _frontier(db_path)
+        await frontier.plan()
+        await _complete_all(frontier)
+
+        restarted = _frontier(db_path)
+        assert await restarted.plan() is False
+        assert restarted.finished_count == 0
+        assert _statuses(restarted, 'led') == {1: 'pending', 2: 'pending', 3: 'pending'}
+
+    asyncio.run(main())
+
+
+def test_unit_given_up_after_max_attempts(db_path):
+    async def main():
+        frontier = _frontier(db_path, max_attempts=2)
+        await frontier.plan()
+        await _complete_all(frontier, skip={('lamp', 3)})
+        await frontier.claim('lamp', 3)
+        await frontier.fail('lamp', 3, RuntimeError('超时'))
+
+        # 失败次数未达上限：继续上一轮，只剩这一页
+        retry = _frontier(db_path, max_attempts=2)
+        assert await retry.plan() is True
+        assert retry.finished_pages('lamp') == {1, 2}
+        await retry.claim('lamp', 3)
+        await retry.fail('lamp', 3, RuntimeError('超时'))
+
+        # 达到上限后视为结束，不再阻止新一轮
+        restarted = _frontier(db_path, max_attempts=2)
+        assert await restarted.plan() is False
+        assert _statuses(restarted, 'lamp') == {1: 'pending', 2: 'pending', 3: 'pending'}
+
+    asyncio.run(main())
+
+
+def test_finish_skips_pages_after_last_page(db_path):
+    async def main():
+        frontier = _frontier(db_path)
+        await frontier.plan()
+        await frontier.claim('led', 1)
+        await frontier.complete('led', 1)
+        await frontier.claim('led', 2)
+        await frontier.fail('led', 2)
+        await frontier.finish('led', 1)
+        assert _statuses(frontier, 'led') == {1: 'done', 2: 'skipped', 3: 'skipped'}
+
+        # 停止后保留未完成的单元，下次继续
+        frontier.stop()
+        await frontier.finish('lamp', 0)
+        assert await frontier.claim('lamp', 1) is False
+        assert set(_statuses(frontier, 'lamp').values()) == {'pending'}
+
+        resumed = _frontier(db_path)
+        assert await resumed.plan() is True
+        assert resumed.finished_pages('led') == {1, 2, 3}
+
+    asyncio.run(main())
+
+
+def test_plan_with_last_pages_limits_units(db_path):
+    async def main():
+        frontier = _frontier(db_path)
+        await frontier.plan({'led': 2, 'lamp': 1})
+        assert _statuses(frontier, 'led') == {1: 'pending', 2: 'pending'}
+        assert _statuses(frontier, 'lamp') == {1: 'pending'}
+
+    asyncio.run(main())
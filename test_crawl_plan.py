@@ -0,0 +1,38 @@
+"""
+页数规划测试：增量爬取只在页码连续的已知页面达到 stop_pages 时停止
+"""
+
+from crawl_plan import KnownPageTracker, PageRange, page_count_from_total
+
+
+def test_stops_after_contiguous_known_pages():
+    tracker = KnownPageTracker(['a', 'b', 'c'], stop_pages=2)
+    assert tracker.add_page(1, ['a', 'new']) == (1, None)
+    assert tracker.add_page(2, ['a', 'b']) == (0, None)
+    assert tracker.add_page(3, ['c']) == (0, 4)
+
+
+def test_out_of_order_pages_stop_only_when_gap_is_filled():
+    tracker = KnownPageTracker(['a', 'b'], stop_pages=3)
+    # 并发抓取时页面完成顺序不定：不连续的已知页面不触发停止
+    assert tracker.add_page(5, ['a']) == (0, None)
+    assert tracker.add_page(3, ['b']) == (0, None)
+    assert tracker.add_page(4, ['x']) == (1, None)
+    assert tracker.add_page(7, ['a']) == (0, None)
+    assert tracker.add_page(6, ['b']) == (0, 8)
+
+
+def test_empty_pages_do_not_count_as_known():
+    tracker = KnownPageTracker(['a'], stop_pages=2)
+    assert tracker.add_page(1, []) == (0, None)
+    assert tracker.add_page(2, [None, '']) == (0, None)
+    assert tracker.add_page(3, ['a']) == (0, None)
+    assert tracker.add_page(4, [1]) == (1, None)
+
+
+def test_page_range_shrinks_and_skips_finished_pages():
+    pages = PageRange(1, 10, skip={2})
+    assert pages.clamp(page_count_from_total(81)) is True
+    pages.stop_before(4)
+    assert list(pages) == [1, 3]
+    assert pages.clamp(20) is False
@@ -0,0 +1,96 @@
+"""
+数据库迁移测试：旧库重复供应商的合并、提取重试时间的回填
+"""
+
+import sqlite3
+
+import pytest
+
+from db_migrations import migration_001_base_schema, run_migrations
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:', isolation_level=None)
+    yield conn
+    conn.close()
+
+
+def _make_legacy_db(conn):
+    """迁移机制引入之前的旧库：有基础表，没有 company_id 唯一索引"""
+    migration_001_base_schema(conn)
+    conn.execute('DROP INDEX idx_suppliers_company_id')
+
+
+def _add_supplier(conn, company_id, company_name, **values):
+    columns = ['company_id', 'company_name'] + list(values)
+    cursor = conn.execute(f"INSERT INTO suppliers ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                          [company_id, company_name] + list(values.values()))
+    return cursor.lastrowid
+
+
+def test_merge_duplicates_keeps_newest_values_and_status(conn):
+    _make_legacy_db(conn)
+    old_id = _add_supplier(conn, '1001', '旧名称', save_path='/p/old', license_extracted=1)
+    _add_supplier(conn, '1001', '新名称', review_score='4.8', license_extracted=0)
+
+    run_migrations(conn)
+
+    rows = conn.execute('''
+        SELECT id, company_name, save_path, review_score, license_extracted FROM suppliers WHERE company_id = '1001'
+    ''').fetchall()
+    assert rows == [(old_id, '新名称', '/p/old', '4.8', 1)]
+
+
+def test_merge_repoints_child_rows(conn):
+    _make_legacy_db(conn)
+    keep_id = _add_supplier(conn, '1001', 'A')
+    duplicate_id = _add_supplier(conn, '1001', 'A')
+    conn.execute("INSERT INTO licenses (supplier_id, license_url) VALUES (?, 'http://img/1.jpg')", (duplicate_id,))
+    conn.execute("INSERT INTO license_info (supplier_id, registration_no) VALUES (?, 'R1')", (duplicate_id,))
+    conn.execute('''
+        INSERT INTO company_registration (profile_id, supplier_id, registration_number, company_name)
+        VALUES ('p', ?, 'R1', 'A')
+    ''', (duplicate_id,))
+
+    run_migrations(conn)
+
+    assert conn.execute('SELECT supplier_id FROM licenses').fetchall() == [(keep_id,)]
+    assert conn.execute('SELECT supplier_id FROM license_info').fetchall() == [(keep_id,)]
+    assert conn.execute('SELECT CAST(supplier_id AS INTEGER) FROM company_registration').fetchall() == [(keep_id,)]
+
+
+def test_missing_company_ids_are_not_merged(conn):
+    _make_legacy_db(conn)
+    for name in ('空1', '空2'):
+        _add_supplier(conn, None, name)
+    for name in ('空串1', '空串2'):
+        _add_supplier(conn, '', name)
+
+    run_migrations(conn)
+
+    names = [row[0] for row in conn.execute('SELECT company_name FROM suppliers WHERE company_id IS NULL ORDER BY id')]
+    assert names == ['空1', '空2', '空串1', '空串2']
+    assert conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_suppliers_company_id'").fetchone()
+
+
+def test_retry_backfill_for_existing_failures(conn):
+    _make_legacy_db(conn)
+    last_attempt = '2024-01-01 00:00:00'
+    for company_id, failures in (('f1', 1), ('f3', 3), ('f10', 10)):
+        _add_supplier(conn, company_id, company_id, extraction_failed_count=failures, last_extraction_attempt=last_attempt)
+    _add_supplier(conn, 'skipped', '已跳过', extraction_failed_count=2, skip_extraction=1, last_extraction_attempt=last_attempt)
+    _add_supplier(conn, 'extracted', '已提取', extraction_failed_count=1, license_extracted=1, last_extraction_attempt=last_attempt)
+    _add_supplier(conn, 'never_failed', '未失败', last_extraction_attempt=last_attempt)
+    _add_supplier(conn, 'no_attempt', '无尝试时间', extraction_failed_count=2)
+
+    run_migrations(conn)
+
+    delays = dict(conn.execute('''
+        SELECT company_id, CAST(strftime('%s', next_attempt_at) - strftime('%s', last_extraction_attempt) AS INTEGER)
+        FROM suppliers
+    '''))
+    # 600 * 2^(失败次数-1) 秒，最多一天；跳过、已提取、未失败和没有尝试时间的不回填
+    assert delays == {'f1': 600, 'f3': 2400, 'f10': 86400,
+                      'skipped': None, 'extracted': None, 'never_failed': None, 'no_attempt': None}
@@ -0,0 +1,54 @@
+"""
+全文搜索测试：trigram 索引上的中文子串、短关键词退回 LIKE、注册信息命中和索引同步
+"""
+
+import sqlite3
+
+import pytest
+
+from db_migrations import run_migrations
+from db_search import has_fulltext_index, search_registration_ids, search_supplier_ids
+
+pytestmark = pytest.mark.skipif(sqlite3.sqlite_version_info < (3, 34, 0), reason='SQLite 不支持trigram分词')
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:', isolation_level=None)
+    run_migrations(conn)
+    conn.executemany(
+        'INSERT INTO suppliers (id, company_id, company_name, license_extracted) VALUES (?, ?, ?, ?)',
+        [(1, '1', '深圳市华强电子有限公司', 1),
+         (2, '2', '广州白云电子科技有限公司', 0),
+         (3, '3', 'Shenzhen Huaqiang Trading Co.', 0)])
+    conn.execute(
+        "INSERT INTO company_registration (profile_id, supplier_id, registration_number, company_name, registered_address, legal_representative) "
+        "VALUES ('p2', '2', 'R2', '广州白云电子科技有限公司', '广东省深圳市南山区科技园', '张三')")
+    assert has_fulltext_index(conn)
+    yield conn
+    conn.close()
+
+
+def test_cjk_substring_uses_trigram_index(conn):
+    assert search_supplier_ids(conn, '华强电子') == [1]
+    # 名称和注册地址都能命中，公司名称命中排在前面
+    assert search_supplier_ids(conn, '深圳市') == [1, 2]
+    assert search_supplier_ids(conn, '深圳市', 'license_extracted = 0') == [2]
+    assert search_registration_ids(conn, '南山区') == [1]
+
+
+def test_short_keywords_fall_back_to_like(conn):
+    # LIKE 结果按创建时间排序，这里创建时间相同，只比较集合
+    assert sorted(search_supplier_ids(conn, '深圳')) == [1, 2]
+    assert search_supplier_ids(conn, '张三') == [2]
+    assert search_supplier_ids(conn, '%') == []
+    assert search_supplier_ids(conn, 'Co') == [3]
+
+
+def test_index_follows_supplier_updates_and_deletes(conn):
+    conn.execute("UPDATE suppliers SET company_name = '东莞长安五金厂' WHERE id = 1")
+    assert search_supplier_ids(conn, '华强电子') == []
+    assert search_supplier_ids(conn, '长安五金') == [1]
+
+    conn.execute('DELETE FROM suppliers WHERE id = 3')
+    assert search_supplier_ids(conn, 'huaqiang') == []
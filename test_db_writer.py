@@ -0,0 +1,80 @@
+"""
+单写线程测试：批量提交、单条命令回滚、异步异常和关闭时落盘
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from db_writer import DatabaseWriter
+
+
+@pytest.fixture
+def writer(tmp_path):
+    path = str(tmp_path / 'writer.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT UNIQUE)')
+    conn.commit()
+    conn.close()
+    # 时间窗口放大，保证测试中提交的命令落在同一批次
+    writer = DatabaseWriter(path, batch_window=0.2)
+    yield writer
+    writer.close()
+
+
+def _names(writer):
+    conn = sqlite3.connect(writer.db_path)
+    try:
+        return [row[0] for row in conn.execute('SELECT name FROM items ORDER BY id')]
+    finally:
+        conn.close()
+
+
+def _insert(conn, name):
+    conn.execute('INSERT INTO items (name) VALUES (?)', (name,))
+    return name
+
+
+def _insert_then_fail(conn, name):
+    conn.execute('INSERT INTO items (name) VALUES (?)', (name,))
+    raise ValueError('命令失败')
+
+
+def test_failing_command_rolls_back_only_its_savepoint(writer):
+    first = writer.submit(_insert, 'a')
+    failing = writer.submit(_insert_then_fail, 'b')
+    last = writer.submit(_insert, 'c')
+
+    assert first.result(5) == 'a'
+    with pytest.raises(ValueError):
+        failing.result(5)
+    assert last.result(5) == 'c'
+    assert _names(writer) == ['a', 'c']
+    stats = writer.get_stats()
+    assert stats['commits'] == 1
+    assert stats['writes'] == 2
+    assert stats['failed'] == 1
+
+
+def test_run_async_propagates_exceptions(writer):
+    async def main():
+        assert await writer.run_async(_insert, 'a') == 'a'
+        with pytest.raises(sqlite3.IntegrityError):
+            await writer.run_async(_insert, 'a')
+        with pytest.raises(ValueError):
+            await writer.run_async(_insert_then_fail, 'b')
+
+    asyncio.run(main())
+    assert _names(writer) == ['a']
+
+
+def test_close_flushes_pending_commands(writer):
+    futures = [writer.submit(_insert, f'item{i}') for i in range(50)]
+    writer.close()
+
+    assert all(future.done() for future in futures)
+    assert [future.result() for future in futures] == [f'item{i}' for i in range(50)]
+    assert _names(writer) == [f'item{i}' for i in range(50)]
+    with pytest.raises(RuntimeError):
+        writer.submit(_insert, 'late')
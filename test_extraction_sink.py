@@ -0,0 +1,84 @@
+"""
+提取结果汇集器测试：失败后的重试时间、自动跳过和批次提交
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from db_writer import get_writer
+from extraction_sink import EXTRACTION_QUEUE_CONDITION, ExtractionResultSink, RetryPolicy
+
+
+@pytest.fixture
+def sink(db_path):
+    get_writer(db_path).executemany(
+        "INSERT INTO suppliers (company_id, company_name, category_id, category_name) VALUES (?, ?, 'c1', '分类')",
+        [('1', '供应商1'), ('2', '供应商2')])
+    sink = ExtractionResultSink(db_path, max_batch=50, flush_interval=0.05, max_failures=2,
+                                retry_policy=RetryPolicy(base_delay=600, max_delay=86400, jitter=0))
+    yield sink
+    sink.close()
+
+
+def _query(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def _queue(db_path):
+    return [row[0] for row in _query(db_path, f'SELECT company_id FROM suppliers WHERE {EXTRACTION_QUEUE_CONDITION} ORDER BY company_id')]
+
+
+def _move_retry_time_to_past(db_path, company_id):
+    get_writer(db_path).execute(
+        "UPDATE suppliers SET next_attempt_at = datetime('now', '-1 seconds') WHERE company_id = ?", (company_id,))
+
+
+def test_failed_supplier_waits_for_next_attempt(sink, db_path):
+    assert sink.add_failure('1').result(5) is False
+
+    assert _queue(db_path) == ['2']
+    (delay,) = _query(db_path, '''
+        SELECT CAST(strftime('%s', next_attempt_at) - strftime('%s', last_extraction_attempt) AS INTEGER)
+        FROM suppliers WHERE company_id = '1'
+    ''')[0]
+    assert delay == 600
+
+    _move_retry_time_to_past(db_path, '1')
+    assert _queue(db_path) == ['1', '2']
+
+
+def test_supplier_skipped_after_max_failures(sink, db_path):
+    assert sink.add_failure('1').result(5) is False
+    _move_retry_time_to_past(db_path, '1')
+    assert sink.add_failure('1').result(5) is True
+
+    assert _query(db_path, "SELECT extraction_failed_count, skip_extraction FROM suppliers WHERE company_id = '1'") == [(2, 1)]
+    _move_retry_time_to_past(db_path, '1')
+    assert _queue(db_path) == ['2']
+
+
+def test_add_result_async_resolves_after_commit(sink, db_path):
+    sink.flush_interval = 30   # 只在手动 flush 时提交
+    licenses = [{'name': 'a.jpg', 'type': 'img', 'url': 'http://img/a.jpg', 'fileId': 'a'}]
+
+    async def main():
+        task = asyncio.create_task(sink.add_result_async('1', licenses, {'registration_no': 'R1'}))
+        await asyncio.sleep(0.1)
+        assert not task.done()
+        assert _query(db_path, "SELECT license_extracted FROM suppliers WHERE company_id = '1'") == [(0,)]
+
+        sink.flush()
+        category = await asyncio.wait_for(task, 5)
+        # 完成时结果已落盘
+        assert _query(db_path, "SELECT license_extracted FROM suppliers WHERE company_id = '1'") == [(1,)]
+        assert _query(db_path, "SELECT license_url FROM licenses WHERE supplier_id = '1'") == [('http://img/a.jpg',)]
+        return category
+
+    assert asyncio.run(main()) == ('c1', '分类')
+    assert _queue(db_path) == ['2']
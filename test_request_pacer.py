@@ -0,0 +1,97 @@
+"""
+主机节奏控制测试：令牌桶等待、429/503 降速与 Retry-After 暂停、正常响应后恢复（使用假时钟）
+"""
+
+import pytest
+
+import request_pacer
+from request_pacer import AdaptiveHostPacer
+
+URL = 'https://www.alibaba.com/search?page=1'
+
+
+class FakeClock:
+    """替换 request_pacer 中的 time 模块：sleep 只推进时钟"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(request_pacer, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def pacer(clock):
+    return AdaptiveHostPacer(max_rate=5.0, min_rate=0.5, burst=2, slow_threshold=5.0)
+
+
+def _rate(pacer):
+    return pacer.get_stats()['www.alibaba.com']['rate']
+
+
+def test_token_bucket_allows_burst_then_spaces_requests(pacer, clock):
+    assert [pacer._reserve(URL) for _ in range(4)] == pytest.approx([0.0, 0.0, 0.2, 0.4])
+
+    # 排队的请求用完后，空闲期间最多积攒 burst 个令牌
+    clock.sleep(10)
+    assert [pacer._reserve(URL) for _ in range(3)] == pytest.approx([0.0, 0.0, 0.2])
+    # 不同主机各自一个令牌桶
+    assert pacer._reserve('https://sc04.alicdn.com/a.jpg') == 0.0
+
+
+def test_wait_blocking_sleeps_until_token(pacer, clock):
+    for _ in range(3):
+        pacer.wait_blocking(URL)
+    assert clock.now == pytest.approx(1000.2)
+
+
+@pytest.mark.parametrize('status', [429, 503])
+def test_throttled_response_backs_off_and_honours_retry_after(pacer, clock, status):
+    pacer.record(URL, status, retry_after='3')
+    assert _rate(pacer) == 2.5
+    assert pacer._reserve(URL) == pytest.approx(3.0)
+
+    # 冷却期内的其他失败不再降速，过后继续减半直到下限
+    pacer.record(URL, status)
+    assert _rate(pacer) == 2.5
+    for _ in range(5):
+        clock.sleep(1.0)
+        pacer.record(URL, status)
+    assert _rate(pacer) == 0.5
+    assert pacer.get_stats()['www.alibaba.com']['throttled'] == 7
+
+
+def test_retry_after_is_capped(pacer, clock):
+    pacer.record(URL, 429, retry_after='3600')
+    assert pacer._reserve(URL) == pytest.approx(request_pacer.MAX_RETRY_AFTER)
+    assert pacer.retry_delay(0, retry_after='3600') == request_pacer.MAX_RETRY_AFTER
+
+
+def test_success_recovers_rate_gradually(pacer, clock):
+    pacer.record(URL, 503)
+    pacer.record(URL, 200, latency=0.1)
+    assert _rate(pacer) == 2.75
+    for _ in range(20):
+        pacer.record(URL, 200, latency=0.1)
+    assert _rate(pacer) == 5.0
+
+
+def test_slow_response_reduces_rate(pacer, clock):
+    pacer.record(URL, 200, latency=6.0)
+    assert _rate(pacer) == 4.0
+    assert pacer.get_stats()['www.alibaba.com']['slow'] == 1
+
+
+def test_retry_delay_backs_off_exponentially(pacer):
+    for attempt, ceiling in [(0, 1.0), (1, 2.0), (3, 8.0), (10, 30.0)]:
+        assert ceiling / 2 <= pacer.retry_delay(attempt) <= ceiling
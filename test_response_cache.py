@@ -0,0 +1,97 @@
+"""
+响应缓存测试：TTL过期、单次调用的 ttl、按访问时间淘汰和URL规范化（使用假时钟）
+"""
+
+import os
+
+import pytest
+
+import response_cache
+from response_cache import EVICT_TARGET, ResponseCache, cache_key, canonicalize_url
+
+URL = 'https://www.alibaba.com/search/api/supplierTextSearch?query=led&page=1'
+
+
+class FakeClock:
+    """替换 response_cache 中的 time 模块"""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'http_cache.db'), ttl=100, max_mb=1)
+    yield cache
+    cache.close()
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put(URL, '页面内容')
+    clock.advance(100)
+    assert cache.get(URL) == '页面内容'.encode('utf-8')
+
+    clock.advance(1)
+    assert cache.get(URL) is None
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['expired']) == (1, 1, 1)
+
+    assert cache.purge_expired() == 1
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_per_call_ttl_overrides_default(cache, clock):
+    cache.put(URL, b'api')
+    clock.advance(50)
+    assert cache.get(URL, ttl=10) is None
+    assert cache.get(URL) == b'api'
+    clock.advance(100)
+    assert cache.get(URL, ttl=1000) == b'api'
+
+
+def test_modes(cache):
+    cache.put(URL, b'old')
+    cache.put(URL, b'new', mode='refresh')
+    assert cache.get(URL, mode='refresh') is None
+    cache.put(URL, b'ignored', mode='bypass')
+    assert cache.get(URL) == b'new'
+
+
+def test_evicts_least_recently_accessed_down_to_target(tmp_path, clock):
+    # 随机内容基本无法压缩，每条约3KB，上限约10KB
+    cache = ResponseCache(str(tmp_path / 'http_cache.db'), ttl=100, max_mb=0.01)
+    try:
+        urls = [f'https://example.com/page{i}' for i in range(4)]
+        for url in urls[:3]:
+            cache.put(url, os.urandom(3000))
+            clock.advance(1)
+        cache.get(urls[0])   # 第一条刚访问过，最久未访问的是第二条
+        clock.advance(1)
+        cache.put(urls[3], os.urandom(3000))
+
+        stats = cache.get_stats()
+        assert stats['evictions'] == 1
+        assert [cache.get(url) is not None for url in urls] == [True, False, True, True]
+        assert cache._total_size <= cache.max_bytes * EVICT_TARGET
+    finally:
+        cache.close()
+
+
+def test_canonicalize_url_drops_volatile_params():
+    url = 'HTTPS://WWW.Alibaba.com/search?query=led&requestId=abc&page=2&startTime=1700000000#top'
+    assert canonicalize_url(url) == 'https://www.alibaba.com/search?page=2&query=led'
+    assert cache_key(url) == cache_key('https://www.alibaba.com/search?page=2&query=led&requestId=xyz')
+    assert cache_key(url) != cache_key('https://www.alibaba.com/search?page=3&query=led')
@@ -0,0 +1,88 @@
+"""
+数据库列表分页测试：created_at 相同时的键集翻页、前后翻页和页码跳转
+"""
+
+import sqlite3
+
+import pytest
+
+from supplier_list import fetch_supplier_page, page_count
+
+PAGE_SIZE = 3
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = sqlite3.connect(db_path)
+    # 11 行，每 4 行同一个 created_at：翻页锚点经常落在并列的行中间
+    conn.executemany(
+        "INSERT INTO suppliers (company_id, company_name, created_at, license_extracted) VALUES (?, ?, ?, ?)",
+        [(str(i), f'供应商{i}', f'2024-01-0{1 + i // 4} 00:00:00', i % 2) for i in range(11)])
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _expected_ids(conn, filter_sql=''):
+    where = f' WHERE {filter_sql}' if filter_sql else ''
+    return [row[0] for row in conn.execute(f'SELECT id FROM suppliers{where} ORDER BY created_at DESC, id DESC')]
+
+
+def _ids(rows):
+    return [row[0] for row in rows]
+
+
+def _pages(ids):
+    return [ids[start:start + PAGE_SIZE] for start in range(0, len(ids), PAGE_SIZE)]
+
+
+@pytest.mark.parametrize('filter_sql', ['', 'license_extracted = 1'])
+def test_next_and_prev_walk_all_pages_with_tied_created_at(conn, filter_sql):
+    expected = _pages(_expected_ids(conn, filter_sql))
+    total = sum(len(page) for page in expected)
+    cursor = conn.cursor()
+
+    rows, first_key, last_key = fetch_supplier_page(cursor, filter_sql, 'first', 1, PAGE_SIZE, total)
+    walked = [_ids(rows)]
+    for page in range(2, len(expected) + 1):
+        rows, first_key, last_key = fetch_supplier_page(cursor, filter_sql, 'next', page, PAGE_SIZE, total, first_key, last_key)
+        walked.append(_ids(rows))
+    assert walked == expected
+
+    back = [walked[-1]]
+    for page in range(len(expected) - 1, 0, -1):
+        rows, first_key, last_key = fetch_supplier_page(cursor, filter_sql, 'prev', page, PAGE_SIZE, total, first_key, last_key)
+        back.append(_ids(rows))
+    assert back[::-1] == expected
+
+
+def test_current_page_stays_put_when_rows_are_added(conn):
+    expected = _pages(_expected_ids(conn))
+    cursor = conn.cursor()
+    _, first_key, last_key = fetch_supplier_page(cursor, '', 'first', 1, PAGE_SIZE, 11)
+    _, first_key, last_key = fetch_supplier_page(cursor, '', 'next', 2, PAGE_SIZE, 11, first_key, last_key)
+
+    conn.execute("INSERT INTO suppliers (company_id, company_name, created_at) VALUES ('new', '新供应商', '2024-02-01 00:00:00')")
+    rows, _, _ = fetch_supplier_page(cursor, '', 'current', 2, PAGE_SIZE, 12, first_key, last_key)
+    assert _ids(rows) == expected[1]
+
+
+@pytest.mark.parametrize('nav', ['jump', 'last', 'next', 'prev', 'current'])
+def test_page_number_lookup_matches_full_listing(conn, nav):
+    # 没有锚点时按页码定位，前半部分和后半部分的页都要与完整排序一致
+    expected = _pages(_expected_ids(conn))
+    cursor = conn.cursor()
+    for page in range(1, len(expected) + 1):
+        if nav == 'last' and page != page_count(11, PAGE_SIZE):
+            continue
+        rows, first_key, last_key = fetch_supplier_page(cursor, '', nav, page, PAGE_SIZE, 11)
+        assert _ids(rows) == expected[page - 1]
+        assert first_key[1] == rows[0][0] and last_key[1] == rows[-1][0]
+
+
+def test_empty_list(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        assert fetch_supplier_page(conn.cursor(), '', 'last', 1, PAGE_SIZE, 0) == ([], None, None)
+    finally:
+        conn.close()
@@ -0,0 +1,72 @@
+"""
+状态计数测试：supplier_stats 触发器在插入、更新、删除后与全表重算一致
+"""
+
+import sqlite3
+
+import pytest
+
+from db_migrations import run_migrations
+from supplier_stats import get_supplier_count, get_supplier_stats, rebuild_supplier_stats
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(':memory:', isolation_level=None)
+    run_migrations(conn)
+    conn.executemany(
+        'INSERT INTO suppliers (company_id, company_name, category_id, license_extracted, skip_extraction, ocr_recognition_status) '
+        'VALUES (?, ?, ?, ?, ?, ?)',
+        [('1', '供应商1', 'c1', 0, 0, None),
+         ('2', '供应商2', 'c1', 1, 0, 'success'),
+         ('3', '供应商3', 'c2', 1, 0, 'error'),
+         ('4', '供应商4', None, 0, 1, None)])
+    yield conn
+    conn.close()
+
+
+def _assert_consistent(conn):
+    """触发器维护的计数应与按 suppliers 全表重算的结果相同"""
+    maintained = get_supplier_stats(conn)
+    conn.execute('SAVEPOINT rebuild')
+    rebuild_supplier_stats(conn)
+    rebuilt = get_supplier_stats(conn)
+    conn.execute('ROLLBACK TO rebuild')
+    conn.execute('RELEASE rebuild')
+    assert maintained == rebuilt
+
+
+def test_insert_counts(conn):
+    _assert_consistent(conn)
+    assert get_supplier_count(conn, 'all') == 4
+    assert get_supplier_count(conn, 'extract_state', 'pending') == 1
+    assert get_supplier_count(conn, 'extract_state', 'recognized') == 1
+    assert get_supplier_count(conn, 'ocr_status', 'pending') == 2
+    assert get_supplier_count(conn, 'category_id', '') == 1
+
+
+def test_update_moves_counts_between_values(conn):
+    conn.execute("UPDATE suppliers SET license_extracted = 1, ocr_recognition_status = 'completed' WHERE company_id = '1'")
+    conn.execute("UPDATE suppliers SET is_used = 1, category_id = 'c2' WHERE company_id IN ('2', '3')")
+    conn.execute("UPDATE suppliers SET skip_extraction = 0 WHERE company_id = '4'")
+    # 不影响计数的字段变化不应改变计数
+    conn.execute("UPDATE suppliers SET company_name = '新名称' WHERE company_id = '1'")
+
+    _assert_consistent(conn)
+    assert get_supplier_count(conn, 'extract_state', 'recognized') == 2
+    assert get_supplier_count(conn, 'extract_state', 'pending') == 1
+    assert get_supplier_count(conn, 'is_used', '1') == 2
+    assert get_supplier_count(conn, 'category_id', 'c1') == 1
+    assert get_supplier_count(conn, 'skip_extraction', '1') == 0
+
+
+def test_delete_removes_counts(conn):
+    conn.execute("DELETE FROM suppliers WHERE company_id IN ('2', '4')")
+
+    _assert_consistent(conn)
+    assert get_supplier_count(conn, 'all') == 2
+    assert get_supplier_count(conn, 'ocr_status', 'success') == 0
+    assert get_supplier_count(conn, 'skip_extraction', '1') == 0
+
+    conn.execute('DELETE FROM suppliers')
+    assert get_supplier_stats(conn) == {}